@@ -0,0 +1,432 @@
+from typing import Any, Callable, Dict, Hashable, List, Mapping, Optional, Sequence, Tuple, Union
+from itertools import chain
+from pathlib import Path
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+import rule_table
+from dataset_cache import read_csv_cached
+from scoring import (
+    calculate_accept_score,
+    calculate_integrated_login_score,
+    calculate_referer_score,
+    calculate_sec_fetch_score,
+    get_ua_features,
+    get_group_name,
+    SCORE_COMPONENTS,
+)
+
+# ==============================================================================
+# 1. 컬럼 규약
+# ==============================================================================
+# 새 로그인 헤더 컬럼 (risk_score_log.txt 의 JSON 키와 동일한 이름)
+LOGIN_COLUMNS: List[str] = [
+    'ip', 'user_agent', 'accept', 'accept_language', 'referer',
+    'sec_fetch_site', 'sec_fetch_mode', 'sec_fetch_dest', 'sec_fetch_user',
+]
+HISTORY_COLUMNS: List[str] = ['ip_history', 'ua_history', 'lang_history']
+SCORE_COLUMNS: List[str] = SCORE_COMPONENTS
+
+# CSV 파일마다 다른 헤더 이름 -> 표준 컬럼 이름
+COLUMN_ALIASES: Dict[str, str] = {
+    'sec-fetch-site': 'sec_fetch_site',
+    'sec-fetch-mode': 'sec_fetch_mode',
+    'sec-fetch-dest': 'sec_fetch_dest',
+    'sec-fetch-user': 'sec_fetch_user',
+}
+
+DATA_DIR = Path(__file__).resolve().parent.parent / '사용자계정'
+HEADER_DATA_FILE = DATA_DIR / '사용자계정2' / 'login_header_data.csv'
+HISTORY_DATA_FILE = DATA_DIR / 'web_service_accounts_login.csv'
+
+Columns = Union[pd.DataFrame, Mapping[str, Sequence[Any]]]
+
+
+def normalize_login_columns(frame: pd.DataFrame) -> pd.DataFrame:
+    """CSV 헤더 이름을 표준 컬럼 이름으로 바꾸고, 없는 헤더 컬럼은 None 으로 채웁니다."""
+    frame = frame.rename(columns=COLUMN_ALIASES)
+    for column in LOGIN_COLUMNS:
+        if column not in frame.columns:
+            frame[column] = None
+    return frame
+
+
+def build_user_histories(
+        history_frame: pd.DataFrame,
+        user_column: str = 'id'
+) -> Dict[str, Tuple[List[str], List[str], List[str]]]:
+    """과거 로그인 기록 표를 사용자별 (IP, UA, Language) 기록 리스트로 묶습니다."""
+    histories: Dict[str, Tuple[List[str], List[str], List[str]]] = {}
+    rows = zip(history_frame[user_column], history_frame['ip'],
+               history_frame['user_agent'], history_frame['accept_language'])
+    for user, ip, ua, language in rows:
+        ips, uas, languages = histories.setdefault(user, ([], [], []))
+        ips.append(ip)
+        uas.append(ua)
+        languages.append(language)
+    return histories
+
+
+def attach_histories(
+        logins: pd.DataFrame,
+        histories: Mapping[str, Tuple[List[str], List[str], List[str]]],
+        user_column: str = 'userid'
+) -> pd.DataFrame:
+    """로그인 표의 각 행에 해당 사용자의 기록 리스트를 ip_history/ua_history/lang_history 로 붙입니다."""
+    empty: Tuple[List[str], List[str], List[str]] = ([], [], [])
+    per_row = [histories.get(user, empty) for user in logins[user_column]]
+    logins = logins.copy()
+    for position, column in enumerate(HISTORY_COLUMNS):
+        logins[column] = [entry[position] for entry in per_row]
+    return logins
+
+
+# ==============================================================================
+# 2. 벡터화 보조 함수
+# ==============================================================================
+
+def _factorize(values: Sequence[Hashable]) -> Tuple[np.ndarray, List[Hashable]]:
+    """
+    값을 정수 코드와 고유값 리스트로 바꿉니다.
+    pandas.factorize 는 None 과 NaN 을 같은 결측값으로 합치지만 스칼라 함수는 둘을 다르게 취급하므로,
+    결측값 행만 따로 dict 로 코드를 매깁니다.
+    """
+    values = np.asarray(values, dtype=object).reshape(-1)
+    codes, uniques = pd.factorize(values)
+    uniques = list(uniques)
+    missing = np.flatnonzero(codes < 0)
+    if len(missing):
+        index: Dict[int, int] = {}
+        for position in missing:
+            value = values[position]
+            code = index.get(id(value))
+            if code is None:
+                code = index[id(value)] = len(uniques)
+                uniques.append(value)
+            codes[position] = code
+    return codes.astype(np.int64, copy=False), uniques
+
+
+def _score_unique(function: Callable[..., int], *columns: Sequence[Any]) -> np.ndarray:
+    """
+    사용자 기록과 무관한 점수는 고유한 입력 조합마다 스칼라 함수를 한 번만 호출해 행 전체로 펼칩니다.
+    스칼라 함수를 그대로 쓰므로 결과가 항상 동일합니다.
+    """
+    factorized = [_factorize(column) for column in columns]
+    # 컬럼별 코드를 하나의 조합 코드로 합치고, 조합마다 처음 나온 행의 값으로 스칼라 함수를 부릅니다.
+    size = len(factorized[0][0])
+    inverse = np.zeros(size, dtype=np.int64)
+    for codes, uniques in factorized:
+        inverse = pd.factorize(inverse * len(uniques) + codes)[0]
+    first = np.empty(inverse.max() + 1 if size else 0, dtype=np.int64)
+    first[inverse[::-1]] = np.arange(size - 1, -1, -1)
+    table = np.fromiter(
+        (function(*(uniques[codes[row]] for codes, uniques in factorized)) for row in first),
+        dtype=np.int64, count=len(first)
+    )
+    return table[inverse]
+
+
+def _flatten_histories(histories: Sequence[Optional[Sequence[Any]]]) -> Tuple[np.ndarray, List[Any]]:
+    """행별 기록 리스트를 (소유 행 번호 배열, 평탄화된 값 리스트) 로 펼칩니다."""
+    histories = [history if history is not None else [] for history in histories]
+    lengths = np.array(list(map(len, histories)), dtype=np.int64)
+    owner = np.repeat(np.arange(len(histories), dtype=np.int64), lengths)
+    return owner, list(chain.from_iterable(histories))
+
+
+def _factorize_with_history(
+        new_values: Sequence[Any],
+        flat_history: List[Any]
+) -> Tuple[np.ndarray, np.ndarray, List[Hashable]]:
+    """새 값과 기록 값을 같은 코드 공간으로 변환합니다. (새 값 코드, 기록 값 코드, 고유값) 을 반환합니다."""
+    values = np.empty(len(new_values) + len(flat_history), dtype=object)
+    values[:len(new_values)] = list(new_values)
+    values[len(new_values):] = flat_history
+    codes, uniques = _factorize(values)
+    return codes[:len(new_values)], codes[len(new_values):], uniques
+
+
+def _pairwise_relations(owner: np.ndarray, pair_relations: np.ndarray, size: int) -> np.ndarray:
+    """
+    (행, 기록) 쌍의 관계 비트를 행별로 OR 합니다. 기록이 없는 행은 0 입니다.
+    결과를 규칙의 관계 비트 표(ip_relation_scores 등)로 인덱싱하면 행별 최대 점수가 됩니다.
+    """
+    result = np.zeros(size, dtype=np.int64)
+    if len(owner):
+        np.bitwise_or.at(result, owner, pair_relations)
+    return result
+
+
+# ==============================================================================
+# 3. 항목별 배치 점수
+# ==============================================================================
+
+def batch_ip_scores(
+        new_ips: Sequence[Any],
+        ip_histories: Sequence[Optional[Sequence[Any]]],
+        rules: Optional[rule_table.CompiledRules] = None
+) -> np.ndarray:
+    """calculate_dynamic_ip_score_final_country 의 배치 버전."""
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    size = len(new_ips)
+    owner, flat = _flatten_histories(ip_histories)
+
+    new_codes, prev_codes, unique_ips = _factorize_with_history(new_ips, flat)
+
+    # 고유 IP 마다 한 번만 규칙의 그룹 코드를 구합니다 (악성 판정용). 그룹 이름은 스칼라 경로와 같은
+    # 캐시(get_group_name)로 조회하며, 네 조각으로 나뉘지 않는 IP 는 -1 입니다.
+    group_codes, other_group = rules.group_codes, rules.other_group
+    groups = np.fromiter(
+        (group_codes.get(get_group_name(ip_address), other_group)
+         if isinstance(ip_address, str) and ip_address.count('.') == 3 else -1 for ip_address in unique_ips),
+        dtype=np.int64, count=len(unique_ips)
+    )
+    valid = groups >= 0
+
+    # 옥텟과 그룹 이름 코드는 기록과 비교되는 IP 에만 필요합니다 (기록 없는 로그인이 대부분이면 작은 집합).
+    octets = np.full((len(unique_ips), 4), -1, dtype=np.int64)
+    names = np.full(len(unique_ips), -1, dtype=np.int64)
+    pair_new = new_codes[owner]
+    compared = np.unique(np.concatenate([pair_new, prev_codes]))
+    compared = compared[valid[compared]]
+    if len(compared):
+        octet_index: Dict[str, int] = {}
+        name_index: Dict[str, int] = {}
+        octets[compared] = np.array(
+            [[octet_index.setdefault(part, len(octet_index)) for part in unique_ips[code].split('.')]
+             for code in compared.tolist()],
+            dtype=np.int64
+        )
+        names[compared] = [name_index.setdefault(get_group_name(unique_ips[code]), len(name_index))
+                           for code in compared.tolist()]
+
+    # 관계 비트: 1 국가 그룹 간, 2 그 밖의 그룹 변경, 4 같은 그룹 A 옥텟, 8 B 옥텟, 16 C/D 옥텟 (rule_table.IP_RELATIONS)
+    # A 옥텟이 다르면 규칙의 그룹 관계 표(ip_group_relation[이전][새])를 쓰되, other_group 끼리는 이름이 다를 때 그룹 변경
+    group_relation = np.asarray(rules.ip_group_relation, dtype=np.int64)
+    pair_new_group, pair_prev_group = groups[pair_new], groups[prev_codes]
+    diff = octets[pair_new] != octets[prev_codes]
+    other_renamed = (pair_new_group == other_group) & (pair_prev_group == other_group) & \
+        (names[pair_new] != names[prev_codes])
+    pair_relations = np.where(
+        diff[:, 0], np.where(other_renamed, 2, group_relation[pair_prev_group, pair_new_group]),
+        np.where(diff[:, 1], 8, np.where(diff[:, 2] | diff[:, 3], 16, 0))
+    )
+    pair_relations[~valid[prev_codes]] = 0
+
+    relations = _pairwise_relations(owner, pair_relations, size)
+    scores = np.asarray(rules.ip_relation_scores, dtype=np.int64)[relations]
+    new_valid = valid[new_codes]
+    scores[~new_valid] = 0
+    scores[new_valid & np.asarray(rules.ip_malicious_by_code, dtype=bool)[groups[new_codes]]] = rules.ip_malicious
+    return scores
+
+
+def batch_ua_scores(
+        new_uas: Sequence[Any],
+        ua_histories: Sequence[Optional[Sequence[Any]]],
+        rules: Optional[rule_table.CompiledRules] = None
+) -> np.ndarray:
+    """calculate_dynamic_ua_score 의 배치 버전."""
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    size = len(new_uas)
+    owner, flat = _flatten_histories(ua_histories)
+
+    new_codes, prev_codes, unique_uas = _factorize_with_history(new_uas, flat)
+
+    # 고유 UA 마다 한 번만 파싱합니다.
+    feature_index: Dict[str, int] = {}
+    features = np.array(
+        [[feature_index.setdefault(value, len(feature_index))
+          for value in (parsed['os'], parsed['browser'], parsed['version'])]
+         for parsed in map(get_ua_features, unique_uas)],
+        dtype=np.int64
+    ).reshape(-1, 3)
+    bot = feature_index.get('Bot', -1)
+    none = feature_index.get('None', -1)
+
+    pair_new = new_codes[owner]
+    pair_prev = prev_codes
+    prev_os = features[pair_prev, 0]
+    os_diff = features[pair_new, 0] != prev_os
+    detail_diff = (features[pair_new, 1] != features[pair_prev, 1]) | \
+                  (features[pair_new, 2] != features[pair_prev, 2])
+    # 관계 비트: 1 OS 변경, 2 같은 OS 에서 브라우저/버전 변경 (rule_table.UA_RELATIONS)
+    pair_relations = np.where(os_diff, 1, np.where(detail_diff, 2, 0))
+    pair_relations[(prev_os == none) | (prev_os == bot)] = 0
+
+    relations = _pairwise_relations(owner, pair_relations, size)
+    scores = np.asarray(rules.ua_relation_scores, dtype=np.int64)[relations]
+    new_os = features[new_codes, 0]
+    scores[new_os == none] = rules.ua_missing
+    scores[new_os == bot] = rules.ua_bot
+    return scores
+
+
+def batch_language_scores(
+        new_languages: Sequence[Any],
+        language_histories: Sequence[Optional[Sequence[Any]]],
+        rules: Optional[rule_table.CompiledRules] = None
+) -> np.ndarray:
+    """calculate_dynamic_language_score 의 배치 버전."""
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    size = len(new_languages)
+    owner, flat = _flatten_histories(language_histories)
+
+    new_codes, prev_codes, unique_languages = _factorize_with_history(new_languages, flat)
+
+    has_history = np.bincount(owner, minlength=size) > 0
+    seen = np.bincount(owner[new_codes[owner] == prev_codes], minlength=size) > 0
+    return np.where(has_history & ~seen, rules.lang_change, 0).astype(np.int64)
+
+
+def batch_referer_scores(
+        new_referers: Sequence[Any],
+        rules: Optional[rule_table.CompiledRules] = None
+) -> np.ndarray:
+    """calculate_referer_score 의 배치 버전."""
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    return _score_unique(lambda referer: calculate_referer_score(referer, rules), new_referers)
+
+
+def batch_accept_scores(
+        new_accepts: Sequence[Any],
+        new_uas: Sequence[Any],
+        rules: Optional[rule_table.CompiledRules] = None
+) -> np.ndarray:
+    """calculate_accept_score 의 배치 버전."""
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    return _score_unique(lambda accept, ua: calculate_accept_score(accept, ua, None, rules), new_accepts, new_uas)
+
+
+def batch_sec_fetch_scores(
+        new_uas: Sequence[Any],
+        sites: Sequence[Any],
+        modes: Sequence[Any],
+        dests: Sequence[Any],
+        rules: Optional[rule_table.CompiledRules] = None
+) -> np.ndarray:
+    """calculate_sec_fetch_score 의 배치 버전 (Sec-Fetch-User 는 점수에 쓰이지 않습니다)."""
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    return _score_unique(
+        lambda ua, site, mode, dest: calculate_sec_fetch_score(ua, site, mode, dest, None, None, rules),
+        new_uas, sites, modes, dests
+    )
+
+
+# ==============================================================================
+# 4. 통합 배치 점수
+# ==============================================================================
+
+def score_login_batch(
+        logins: Columns,
+        user_ip_history: Optional[Sequence[Optional[Sequence[str]]]] = None,
+        user_ua_history: Optional[Sequence[Optional[Sequence[str]]]] = None,
+        user_language_history: Optional[Sequence[Optional[Sequence[str]]]] = None
+) -> Dict[str, np.ndarray]:
+    """
+    여러 로그인을 한 번에 점수화합니다.
+    logins 는 DataFrame 이거나 LOGIN_COLUMNS 키를 가진 컬럼 매핑이며, 기록 인자를 생략하면
+    logins 의 ip_history/ua_history/lang_history 컬럼을 사용합니다.
+    반환값은 SCORE_COLUMNS 와 total_score 를 키로 하는 NumPy 배열 dict 이며,
+    각 행은 calculate_integrated_login_score 와 동일한 값을 가집니다.
+    """
+    if isinstance(logins, pd.DataFrame):
+        logins = normalize_login_columns(logins)
+
+    def column(name: str) -> List[Any]:
+        if name not in logins:
+            return [None] * size
+        return np.asarray(logins[name], dtype=object).tolist()
+
+    size = len(logins[LOGIN_COLUMNS[0]])
+    histories = [user_ip_history, user_ua_history, user_language_history]
+    histories = [history if history is not None else column(name)
+                 for history, name in zip(histories, HISTORY_COLUMNS)]
+
+    # 배치 전체를 같은 규칙으로 점수화합니다 (도중에 규칙이 교체돼도 섞이지 않음).
+    rules = rule_table.ACTIVE_RULES
+    uas = column('user_agent')
+    result = {
+        'ip_score': batch_ip_scores(column('ip'), histories[0], rules),
+        'ua_score': batch_ua_scores(uas, histories[1], rules),
+        'lang_score': batch_language_scores(column('accept_language'), histories[2], rules),
+        'referer_score': batch_referer_scores(column('referer'), rules),
+        'accept_score': batch_accept_scores(column('accept'), uas, rules),
+        'sec_fetch_score': batch_sec_fetch_scores(
+            uas, column('sec_fetch_site'), column('sec_fetch_mode'), column('sec_fetch_dest'), rules
+        ),
+    }
+    result['total_score'] = sum(result[name] for name in SCORE_COLUMNS)
+    return result
+
+
+def score_login_rows(logins: pd.DataFrame) -> np.ndarray:
+    """비교용 기준 구현: 행마다 calculate_integrated_login_score 를 호출합니다."""
+    logins = normalize_login_columns(logins)
+    return np.fromiter(
+        (calculate_integrated_login_score(
+            row.ip, row.user_agent, row.accept, row.accept_language, row.referer,
+            row.sec_fetch_site, row.sec_fetch_mode, row.sec_fetch_dest, row.sec_fetch_user,
+            row.ip_history, row.ua_history, row.lang_history
+        ) for row in logins.itertuples(index=False)),
+        dtype=np.int64, count=len(logins)
+    )
+
+
+# ==============================================================================
+# 5. 벤치마크
+# ==============================================================================
+
+def run_benchmark(header_file: Path, history_file: Path, repeat: int = 3) -> Dict[str, float]:
+    """
+    헤더 데이터셋을 행 단위/배치로 각각 점수화해 결과 일치 여부와 소요 시간을 비교합니다.
+    두 경로는 UA 파싱/IP 그룹 캐시를 공유하며, repeat 번 중 가장 빠른 값(캐시가 데워진 상태)을 비교합니다.
+    """
+    histories = build_user_histories(read_csv_cached(history_file), user_column='id')
+    logins = attach_histories(read_csv_cached(header_file), histories)
+
+    def best_of(function: Callable[[], Any]) -> Tuple[float, Any]:
+        timings, value = [], None
+        for _ in range(repeat):
+            start = time.perf_counter()
+            value = function()
+            timings.append(time.perf_counter() - start)
+        return min(timings), value
+
+    row_time, row_totals = best_of(lambda: score_login_rows(logins))
+    batch_time, batch_result = best_of(lambda: score_login_batch(logins))
+
+    if not np.array_equal(row_totals, batch_result['total_score']):
+        mismatches = np.flatnonzero(row_totals != batch_result['total_score'])
+        raise AssertionError(f"배치 점수가 스칼라 점수와 다릅니다: {len(mismatches)}건 (첫 행 {mismatches[0]})")
+
+    return {
+        'rows': float(len(logins)),
+        'row_seconds': row_time,
+        'batch_seconds': batch_time,
+        'speedup': row_time / batch_time if batch_time else float('inf'),
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="행 단위 점수화와 배치 점수화의 결과/속도를 비교합니다.")
+    parser.add_argument('--headers', type=Path, default=HEADER_DATA_FILE, help="새 로그인 헤더 CSV")
+    parser.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="사용자별 과거 로그인 CSV")
+    parser.add_argument('--repeat', type=int, default=3, help="측정 반복 횟수 (최솟값 사용)")
+    args = parser.parse_args()
+
+    report = run_benchmark(args.headers, args.history, args.repeat)
+    print(f"행 수: {int(report['rows'])}")
+    print(f"행 단위: {report['row_seconds'] * 1000:.1f} ms")
+    print(f"배치:    {report['batch_seconds'] * 1000:.1f} ms")
+    print(f"속도 향상: {report['speedup']:.1f}배 (결과 일치)")
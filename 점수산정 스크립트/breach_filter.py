@@ -0,0 +1,247 @@
+from typing import Iterable, Iterator, List, Optional, Sequence, Tuple
+from pathlib import Path
+import argparse
+import csv
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+
+import numpy as np
+
+# ==============================================================================
+# 1. 파일 형식
+# ==============================================================================
+# 유출 자격 증명 목록을 평문 대신 Bloom 필터 비트 배열로 디스크에 저장하고, 점수 계산 시 mmap 으로 조회합니다.
+# 파일을 통째로 읽지 않으므로 여는 데 시간이 들지 않고, 실제로 조회된 페이지만 메모리에 올라갑니다.
+#   헤더 (64바이트): 매직, 형식 버전, 비트 수 m, 해시 수 k, 항목 수, 목표 오탐률
+#   본문: m 비트 (바이트 내 최하위 비트부터)
+# 항목은 (계정, 비밀번호) 쌍과 비밀번호 단독 두 종류이며, 접두어로 구분해 같은 비트 배열에 넣습니다.
+BREACH_FILTER_MAGIC = b'BRCHBLM1'
+BREACH_FILTER_VERSION = 1
+BREACH_HEADER = struct.Struct('<8sIQIQd20x')
+BREACH_DEFAULT_FP_RATE = 0.001
+BREACH_CHUNK_SIZE = 200_000
+
+DATA_DIR = Path(__file__).resolve().parent.parent / '사용자계정'
+BREACH_SOURCE_FILES: List[Path] = [
+    DATA_DIR / 'attack_accounts.csv',
+    DATA_DIR / '사용자계정2' / 'attack_accounts.csv',
+]
+BREACH_FILTER_FILE = Path(__file__).resolve().parent / '.dataset_cache' / 'breach_filter.bloom'
+
+# 유출 목록 적중 시 점수
+BREACH_CREDENTIAL_SCORE = 5  # 계정과 비밀번호 쌍이 그대로 유출 목록에 있음
+BREACH_PASSWORD_SCORE = 2  # 비밀번호만 유출 목록에 있음
+
+
+def credential_key(user_id: str, password: str) -> bytes:
+    return b'C\x00' + user_id.encode('utf-8', 'surrogatepass') + b'\x00' + password.encode('utf-8', 'surrogatepass')
+
+
+def password_key(password: str) -> bytes:
+    return b'P\x00' + password.encode('utf-8', 'surrogatepass')
+
+
+def _hash_pair(key: bytes) -> Tuple[int, int]:
+    """이중 해싱용 64비트 해시 두 개. 두 번째 값은 홀수로 만들어 모든 위치를 고르게 돌게 합니다."""
+    digest = hashlib.blake2b(key, digest_size=16).digest()
+    return int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+
+
+def optimal_parameters(entries: int, fp_rate: float) -> Tuple[int, int]:
+    """항목 수와 목표 오탐률에 맞는 (비트 수, 해시 수). 10억 항목 / 0.1% 는 약 1.8 GB 입니다."""
+    entries = max(1, entries)
+    bits = max(64, int(math.ceil(-entries * math.log(fp_rate) / (math.log(2) ** 2))))
+    hashes = max(1, int(round(bits / entries * math.log(2))))
+    return bits, hashes
+
+
+# ==============================================================================
+# 2. 조회
+# ==============================================================================
+
+class BreachFilter:
+    """
+    mmap 으로 연 Bloom 필터. contains 는 해시 한 번과 비트 k 개 확인뿐이라 수 마이크로초 안에 끝납니다.
+    False 는 확실히 목록에 없음, True 는 목록에 있거나 오탐(확률 약 fp_rate)입니다.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = Path(path)
+        with open(self.path, 'rb') as file:
+            self.buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, self.bits, self.hashes, self.entries, self.fp_rate = \
+            BREACH_HEADER.unpack_from(self.buffer, 0)
+        if magic != BREACH_FILTER_MAGIC or version != BREACH_FILTER_VERSION:
+            self.buffer.close()
+            raise ValueError(f"{path}: 유출 자격 증명 필터 파일이 아닙니다.")
+        if len(self.buffer) < BREACH_HEADER.size + (self.bits + 7) // 8:
+            self.buffer.close()
+            raise ValueError(f"{path}: 필터 파일이 잘렸습니다.")
+
+    def close(self) -> None:
+        self.buffer.close()
+
+    def __enter__(self) -> 'BreachFilter':
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+    def contains(self, key: bytes) -> bool:
+        first, step = _hash_pair(key)
+        buffer, bits, offset = self.buffer, self.bits, BREACH_HEADER.size
+        position, step = first % bits, step % bits
+        for _ in range(self.hashes):
+            if not buffer[offset + (position >> 3)] & (1 << (position & 7)):
+                return False
+            position = (position + step) % bits
+        return True
+
+    def contains_credential(self, user_id: str, password: str) -> bool:
+        return self.contains(credential_key(user_id, password))
+
+    def contains_password(self, password: str) -> bool:
+        return self.contains(password_key(password))
+
+
+def calculate_breach_score(breach_filter: Optional[BreachFilter], user_id: Optional[str], password: Optional[str]) -> int:
+    """
+    로그인 자격 증명이 유출 목록에 있으면 점수를 반환합니다. 필터가 없거나 비밀번호가 비어 있으면 0점.
+    (계정, 비밀번호) 쌍 적중이 비밀번호 단독 적중보다 우선합니다.
+    """
+    if breach_filter is None or not password:
+        return 0
+    if user_id and breach_filter.contains_credential(user_id, password):
+        return BREACH_CREDENTIAL_SCORE
+    if breach_filter.contains_password(password):
+        return BREACH_PASSWORD_SCORE
+    return 0
+
+
+# ==============================================================================
+# 3. 대량 생성
+# ==============================================================================
+
+def _bit_positions(firsts: List[int], seconds: List[int], hashes: int, bits: int) -> np.ndarray:
+    """BreachFilter.contains 와 같은 순서로 항목들의 비트 위치 (first + i * step) mod bits 를 계산합니다."""
+    modulus = np.uint64(bits)
+    position = np.asarray(firsts, dtype=np.uint64) % modulus
+    step = np.asarray(seconds, dtype=np.uint64) % modulus
+    positions = np.empty((hashes, len(position)), dtype=np.uint64)
+    for index in range(hashes):
+        positions[index] = position
+        position = (position + step) % modulus  # 두 값 모두 bits 미만이므로 uint64 를 넘지 않음
+    return positions.reshape(-1)
+
+
+def read_credential_rows(paths: Sequence[Path]) -> Iterator[Tuple[str, str]]:
+    """계정 CSV 들을 한 줄씩 읽어 (계정, 비밀번호) 를 생성합니다. 계정 컬럼은 userid 또는 id 입니다."""
+    for path in paths:
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.DictReader(file)
+            account = next((name for name in ('userid', 'id') if name in (reader.fieldnames or [])), None)
+            if account is None or 'password' not in (reader.fieldnames or []):
+                raise ValueError(f"{path}: userid/id 와 password 컬럼이 필요합니다.")
+            for row in reader:
+                yield row[account], row['password']
+
+
+def _entry_keys(credentials: Iterable[Tuple[str, str]]) -> Iterator[bytes]:
+    for user_id, password in credentials:
+        if password:
+            yield credential_key(user_id, password)
+            yield password_key(password)
+
+
+def build_breach_filter(
+        sources: Sequence[Path],
+        output: Path,
+        fp_rate: float = BREACH_DEFAULT_FP_RATE,
+        expected_entries: Optional[int] = None,
+        chunk_size: int = BREACH_CHUNK_SIZE
+) -> BreachFilter:
+    """
+    원본 CSV 를 스트리밍으로 읽어 Bloom 필터 파일을 만듭니다.
+    expected_entries 를 생략하면 원본을 한 번 더 읽어 항목 수를 셉니다 (자격 증명 한 건당 항목 2개).
+    해시는 chunk_size 개씩 모아 NumPy 로 비트 위치를 계산하므로 메모리 사용량은 원본 크기와 무관합니다.
+    중복 항목도 그대로 세므로 실제 오탐률은 목표보다 낮거나 같습니다.
+    """
+    if expected_entries is None:
+        expected_entries = sum(2 for _, password in read_credential_rows(sources) if password)
+    bits, hashes = optimal_parameters(expected_entries, fp_rate)
+    size = BREACH_HEADER.size + (bits + 7) // 8
+
+    output = Path(output)
+    output.parent.mkdir(parents=True, exist_ok=True)
+    temporary = output.with_name(f"{output.name}.tmp-{os.getpid()}")
+    with open(temporary, 'wb') as file:
+        file.truncate(size)
+    array = np.memmap(temporary, dtype=np.uint8, mode='r+', offset=BREACH_HEADER.size, shape=((bits + 7) // 8,))
+
+    entries = 0
+
+    def flush(firsts: List[int], seconds: List[int]) -> None:
+        positions = _bit_positions(firsts, seconds, hashes, bits)
+        np.bitwise_or.at(array, positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8))
+
+    firsts: List[int] = []
+    seconds: List[int] = []
+    for key in _entry_keys(read_credential_rows(sources)):
+        first, second = _hash_pair(key)
+        firsts.append(first)
+        seconds.append(second)
+        entries += 1
+        if len(firsts) >= chunk_size:
+            flush(firsts, seconds)
+            firsts, seconds = [], []
+    if firsts:
+        flush(firsts, seconds)
+    array.flush()
+    del array
+
+    with open(temporary, 'r+b') as file:
+        file.write(BREACH_HEADER.pack(BREACH_FILTER_MAGIC, BREACH_FILTER_VERSION, bits, hashes, entries, fp_rate))
+    os.replace(temporary, output)
+    return BreachFilter(output)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="유출 자격 증명 Bloom 필터 생성/조회")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    build = subcommands.add_parser('build', help="계정 CSV 들로 필터 파일 생성")
+    build.add_argument('sources', type=Path, nargs='*', default=BREACH_SOURCE_FILES, help="userid/id, password 컬럼 CSV")
+    build.add_argument('--fp-rate', type=float, default=BREACH_DEFAULT_FP_RATE, help="목표 오탐률")
+    build.add_argument('--expected', type=int, help="예상 항목 수 (생략 시 원본을 한 번 더 읽어 셈)")
+    check = subcommands.add_parser('check', help="자격 증명 한 건 조회")
+    check.add_argument('user_id')
+    check.add_argument('password')
+    bench = subcommands.add_parser('bench', help="조회 지연과 실제 오탐률 측정")
+    bench.add_argument('--samples', type=int, default=100_000)
+    for command in (build, check, bench):
+        command.add_argument('--filter', type=Path, default=BREACH_FILTER_FILE, help="필터 파일 경로")
+    args = parser.parse_args()
+
+    if args.command == 'build':
+        start = time.perf_counter()
+        result = build_breach_filter(args.sources, args.filter, args.fp_rate, args.expected)
+        print(f"{args.filter}: 항목 {result.entries:,}개, {result.bits / 8 / 2 ** 20:,.2f} MiB, "
+              f"해시 {result.hashes}개, {time.perf_counter() - start:.2f}s")
+    elif args.command == 'check':
+        with BreachFilter(args.filter) as breach:
+            print(f"계정+비밀번호: {breach.contains_credential(args.user_id, args.password)}, "
+                  f"비밀번호: {breach.contains_password(args.password)}, "
+                  f"점수: {calculate_breach_score(breach, args.user_id, args.password)}")
+    else:
+        with BreachFilter(args.filter) as breach:
+            members = list(read_credential_rows(BREACH_SOURCE_FILES))[:args.samples]
+            missed = sum(not breach.contains_credential(user_id, password) for user_id, password in members)
+            start = time.perf_counter()
+            false_positives = sum(breach.contains_credential('bench-user', f"not-leaked-{index}")
+                                  for index in range(args.samples))
+            elapsed = time.perf_counter() - start
+            print(f"구성원 누락 {missed}건 (항상 0), 비구성원 오탐 {false_positives / args.samples:.4%} "
+                  f"(목표 {breach.fp_rate:.4%}), 조회 {elapsed / args.samples * 1e6:.2f} us/건")
@@ -0,0 +1,409 @@
+from typing import Any, Dict, List, Optional, Tuple
+from array import array
+from pathlib import Path
+import argparse
+import hashlib
+import math
+import random
+import threading
+import time
+
+import numpy as np
+
+# ==============================================================================
+# 1. 헤더 지문
+# ==============================================================================
+# IP 를 바꿔 가며 여러 계정을 시도하는 분산 공격은 요청 하나하나의 점수가 낮지만,
+# 같은 도구가 보내는 UA/Accept/Accept-Language/Sec-Fetch 조합은 계정과 IP 가 바뀌어도 그대로입니다.
+# 이 조합을 64비트 지문으로 만들어 "한 지문이 최근 몇 개 계정, 몇 개 /16 대역에서 쓰였는가" 를 셉니다.
+CAMPAIGN_WINDOW_SECONDS = 600
+CAMPAIGN_BUCKET_SECONDS = 60
+CAMPAIGN_SKETCH_WIDTH = 4096  # 2의 거듭제곱
+CAMPAIGN_SKETCH_DEPTH = 4
+CAMPAIGN_TOP_K = 256
+CAMPAIGN_HLL_PRECISION = 6  # 지문당 고유 개수 추정 레지스터 2^6 = 64개 (오차 약 13%)
+# (지표, 윈도우 내 고유 개수 임계값, 점수)
+CAMPAIGN_RULES: List[Tuple[str, int, int]] = [
+    ('accounts', 100, 3),
+    ('subnet16', 30, 2),
+]
+CAMPAIGN_MAX_SCORE = 5
+
+_MASK64 = (1 << 64) - 1
+_INVERSE_POWERS = [2.0 ** -rank for rank in range(65)]
+
+
+def _hash64(value: str) -> int:
+    return int.from_bytes(hashlib.blake2b(value.encode('utf-8', 'surrogatepass'), digest_size=8).digest(), 'little')
+
+
+def header_fingerprint(
+        ua: Optional[str],
+        accept: Optional[str],
+        accept_language: Optional[str],
+        sec_fetch_site: Optional[str],
+        sec_fetch_mode: Optional[str],
+        sec_fetch_dest: Optional[str],
+        sec_fetch_user: Optional[str]
+) -> int:
+    """
+    헤더 조합의 64비트 지문. 없는 헤더(None)와 빈 문자열은 같은 값으로 취급합니다.
+    문자열이 아닌 값(JSON 본문의 숫자, 배열 등)은 str() 로 바꿔 지문에 넣습니다.
+    """
+    parts = (ua, accept, accept_language, sec_fetch_site, sec_fetch_mode, sec_fetch_dest, sec_fetch_user)
+    return _hash64('\x1f'.join('' if part is None else str(part) for part in parts))
+
+
+def subnet16_of(ip_address: Any) -> Optional[str]:
+    if not isinstance(ip_address, str) or ip_address.count('.') != 3:
+        return None
+    return ip_address[:ip_address.find('.', ip_address.find('.') + 1)]
+
+
+# ==============================================================================
+# 2. 고정 메모리 스케치
+# ==============================================================================
+
+class SlidingCountMinSketch:
+    """
+    시간 버킷별 count-min 표를 고리 모양으로 보관하는 슬라이딩 윈도우 빈도 추정기.
+    표 크기가 (버킷 수 x depth x width) 로 고정이므로 키가 아무리 많아도 메모리는 늘지 않으며,
+    추정값은 실제 횟수 이상입니다 (과대 추정만 있음).
+    표는 array 로 보관해 요청마다의 갱신은 원소 접근만 하고, 버킷 만료 시의 전체 뺄셈은 NumPy 뷰로 처리합니다.
+    (버킷 표는 int32, 윈도우 합계 표는 int64)
+    """
+
+    def __init__(
+            self,
+            width: int = CAMPAIGN_SKETCH_WIDTH,
+            depth: int = CAMPAIGN_SKETCH_DEPTH,
+            window_seconds: float = CAMPAIGN_WINDOW_SECONDS,
+            bucket_seconds: float = CAMPAIGN_BUCKET_SECONDS,
+            seed: int = 0x5EED
+    ) -> None:
+        if width & (width - 1):
+            raise ValueError("width 는 2의 거듭제곱이어야 합니다.")
+        self.bucket_seconds = bucket_seconds
+        self.span = max(1, int(round(window_seconds / bucket_seconds)))
+        self.shift = 64 - (width.bit_length() - 1)
+        # 행 r 의 열 c 는 평탄화된 위치 r * width + c
+        self.offsets = [row * width for row in range(depth)]
+        self.slots = [array('i', bytes(4 * depth * width)) for _ in range(self.span)]
+        self.window = array('q', bytes(8 * depth * width))
+        rng = random.Random(seed)
+        self.multipliers = [rng.getrandbits(64) | 1 for _ in range(depth)]
+        self.current: Optional[int] = None
+
+    def _positions(self, key: int) -> List[int]:
+        # 행마다 다른 홀수를 곱하는 multiply-shift 해시
+        shift = self.shift
+        return [offset + (((key * multiplier) & _MASK64) >> shift)
+                for offset, multiplier in zip(self.offsets, self.multipliers)]
+
+    def advance(self, bucket: int) -> None:
+        """bucket 까지 시간을 진행시키며 윈도우 밖으로 밀려난 버킷 표를 비웁니다. 과거 시각은 무시합니다."""
+        if self.current is None:
+            self.current = bucket
+            return
+        if bucket <= self.current:
+            return
+        window = np.frombuffer(self.window, dtype=np.int64)
+        for expired in range(self.current + 1, min(bucket, self.current + self.span) + 1):
+            slot = np.frombuffer(self.slots[expired % self.span], dtype=np.int32)
+            window -= slot
+            slot[:] = 0
+        self.current = bucket
+
+    def add(self, key: int, now: float, amount: int = 1) -> int:
+        """키의 횟수를 더하고 윈도우 내 추정 횟수를 반환합니다."""
+        self.advance(int(now // self.bucket_seconds))
+        slot = self.slots[self.current % self.span]
+        window = self.window
+        estimate = None
+        for position in self._positions(key):
+            slot[position] += amount
+            count = window[position] = window[position] + amount
+            if estimate is None or count < estimate:
+                estimate = count
+        return estimate
+
+    def estimate(self, key: int, now: float) -> int:
+        self.advance(int(now // self.bucket_seconds))
+        return min(self.window[position] for position in self._positions(key))
+
+    def memory_bytes(self) -> int:
+        return sum(len(slot) * slot.itemsize for slot in self.slots) + len(self.window) * self.window.itemsize
+
+
+class SlidingHyperLogLog:
+    """
+    시간 버킷별 HyperLogLog 레지스터. 윈도우 안의 버킷 레지스터를 최댓값으로 합쳐 고유 개수를 추정합니다.
+    메모리는 (버킷 수 + 1) x 2^precision 바이트로 고정입니다.
+    합친 레지스터와 그 2^-rank 합, 0 인 레지스터 수를 갱신하며 보관하므로 추정은 상수 시간이고,
+    버킷이 바뀔 때만 다시 합칩니다.
+    """
+
+    __slots__ = ('precision', 'registers', 'slot_buckets', 'merged', 'merged_bucket', 'inverse_sum', 'zeros')
+
+    def __init__(self, span: int, precision: int = CAMPAIGN_HLL_PRECISION) -> None:
+        self.precision = precision
+        self.registers = [bytearray(1 << precision) for _ in range(span)]
+        self.slot_buckets = [-1] * span
+        self.merged = bytearray(1 << precision)
+        self.merged_bucket = -1
+        self.inverse_sum = float(1 << precision)
+        self.zeros = 1 << precision
+
+    def _merge(self, bucket: int) -> None:
+        """bucket 기준 윈도우 안의 버킷 레지스터를 다시 합칩니다."""
+        span = len(self.slot_buckets)
+        live = [registers for registers, slot_bucket in zip(self.registers, self.slot_buckets)
+                if slot_bucket > bucket - span]
+        self.merged = bytearray(map(max, *live)) if len(live) > 1 else \
+            bytearray(live[0]) if live else bytearray(1 << self.precision)
+        self.merged_bucket = bucket
+        self.inverse_sum = sum(_INVERSE_POWERS[rank] for rank in self.merged)
+        self.zeros = self.merged.count(0)
+
+    def add(self, hashed: int, bucket: int) -> None:
+        if bucket != self.merged_bucket:
+            self._merge(bucket)
+        slot = bucket % len(self.slot_buckets)
+        if self.slot_buckets[slot] != bucket:
+            self.registers[slot] = bytearray(1 << self.precision)
+            self.slot_buckets[slot] = bucket
+        index = hashed & ((1 << self.precision) - 1)
+        rank = (64 - self.precision) - (hashed >> self.precision).bit_length() + 1
+        registers = self.registers[slot]
+        if rank > registers[index]:
+            registers[index] = rank
+            previous = self.merged[index]
+            if rank > previous:
+                self.merged[index] = rank
+                self.inverse_sum += _INVERSE_POWERS[rank] - _INVERSE_POWERS[previous]
+                self.zeros -= previous == 0
+
+    def estimate(self, bucket: int) -> float:
+        if bucket != self.merged_bucket:
+            self._merge(bucket)
+        size = len(self.merged)
+        raw = 0.7213 / (1 + 1.079 / size) * size * size / self.inverse_sum
+        # 작은 값은 선형 계수로 보정
+        return size * math.log(size / self.zeros) if raw <= 2.5 * size and self.zeros else raw
+
+    def memory_bytes(self) -> int:
+        return (len(self.registers) + 1) << self.precision
+
+
+class _TrackedFingerprint:
+    """상위 지문 하나의 최근 추정 횟수와 고유 계정/대역 추정기."""
+
+    __slots__ = ('count', 'last_bucket', 'accounts', 'subnet16')
+
+    def __init__(self, span: int, precision: int) -> None:
+        self.count = 0
+        self.last_bucket = 0
+        self.accounts = SlidingHyperLogLog(span, precision)
+        self.subnet16 = SlidingHyperLogLog(span, precision)
+
+
+# ==============================================================================
+# 3. 캠페인 탐지기
+# ==============================================================================
+
+class CampaignDetector:
+    """
+    헤더 지문별 시도 횟수를 count-min 스케치로 세고, 횟수 상위 top_k 지문만 고유 계정 수/고유 /16 대역 수를
+    HyperLogLog 로 추적합니다. 추적 중인 지문이 가득 차면 새 지문의 추정 횟수가 가장 적은 추적 지문보다 클 때만
+    그 지문을 밀어내므로, 공격자가 지문을 무한히 바꿔도 메모리는 고정입니다.
+    고유 개수는 지문이 추적되기 시작한 시점부터 셉니다.
+    정상 사용자도 흔한 브라우저 조합을 공유하므로 임계값은 사이트의 평소 트래픽에 맞춰 조정해야 합니다.
+    """
+
+    def __init__(
+            self,
+            rules: Optional[List[Tuple[str, int, int]]] = None,
+            window_seconds: float = CAMPAIGN_WINDOW_SECONDS,
+            bucket_seconds: float = CAMPAIGN_BUCKET_SECONDS,
+            width: int = CAMPAIGN_SKETCH_WIDTH,
+            depth: int = CAMPAIGN_SKETCH_DEPTH,
+            top_k: int = CAMPAIGN_TOP_K,
+            precision: int = CAMPAIGN_HLL_PRECISION,
+            max_score: int = CAMPAIGN_MAX_SCORE
+    ) -> None:
+        self.rules = rules if rules is not None else CAMPAIGN_RULES
+        self.max_score = max_score
+        self.bucket_seconds = bucket_seconds
+        self.sketch = SlidingCountMinSketch(width, depth, window_seconds, bucket_seconds)
+        self.span = self.sketch.span
+        self.top_k = top_k
+        self.precision = precision
+        self.tracked: Dict[int, _TrackedFingerprint] = {}
+        self.admission_floor = 0
+        self.expired_through = None
+        self.lock = threading.Lock()
+
+    def _expire(self, bucket: int) -> None:
+        """윈도우 동안 한 번도 보이지 않은 추적 지문을 제거합니다 (버킷이 바뀔 때만)."""
+        if self.expired_through == bucket:
+            return
+        self.expired_through = bucket
+        oldest = bucket - self.span
+        for fingerprint in [key for key, entry in self.tracked.items() if entry.last_bucket <= oldest]:
+            del self.tracked[fingerprint]
+        self.admission_floor = 0
+
+    def _admit(self, fingerprint: int, count: int) -> Optional[_TrackedFingerprint]:
+        if len(self.tracked) >= self.top_k:
+            if count <= self.admission_floor:
+                return None
+            victim, entry = min(self.tracked.items(), key=lambda item: item[1].count)
+            if count <= entry.count:
+                self.admission_floor = entry.count
+                return None
+            del self.tracked[victim]
+        entry = self.tracked[fingerprint] = _TrackedFingerprint(self.span, self.precision)
+        return entry
+
+    def observe_fingerprint(
+            self,
+            fingerprint: int,
+            ip_address: Any,
+            user_id: Optional[str],
+            now: Optional[float] = None
+    ) -> Tuple[int, List[str]]:
+        """지문으로 시도 한 건을 기록하고 (캠페인 점수, 사유 목록) 을 반환합니다."""
+        now = time.time() if now is None else now
+        bucket = int(now // self.bucket_seconds)
+        with self.lock:
+            count = self.sketch.add(fingerprint, now)
+            self._expire(bucket)
+            entry = self.tracked.get(fingerprint)
+            if entry is None:
+                entry = self._admit(fingerprint, count)
+                if entry is None:
+                    return 0, []
+            entry.count = count
+            entry.last_bucket = bucket
+
+            if user_id:
+                entry.accounts.add(_hash64(str(user_id)), bucket)
+            subnet = subnet16_of(ip_address)
+            if subnet is not None:
+                entry.subnet16.add(_hash64(subnet), bucket)
+
+            distinct = {'accounts': entry.accounts.estimate(bucket), 'subnet16': entry.subnet16.estimate(bucket)}
+
+        score = 0
+        reasons = []
+        for metric, threshold, points in self.rules:
+            if distinct[metric] >= threshold:
+                score += points
+                reasons.append(f"동일 헤더 조합 다중 {'계정' if metric == 'accounts' else '/16 대역'} "
+                               f"시도 (약 {int(distinct[metric])}개)")
+        return min(score, self.max_score), reasons
+
+    def observe(
+            self,
+            ip_address: Any,
+            user_id: Optional[str],
+            ua: Optional[str],
+            accept: Optional[str],
+            accept_language: Optional[str],
+            sec_fetch_site: Optional[str],
+            sec_fetch_mode: Optional[str],
+            sec_fetch_dest: Optional[str],
+            sec_fetch_user: Optional[str],
+            now: Optional[float] = None
+    ) -> Tuple[int, List[str]]:
+        """로그인 시도 한 건의 헤더로 지문을 만들어 observe_fingerprint 를 호출합니다."""
+        fingerprint = header_fingerprint(ua, accept, accept_language, sec_fetch_site, sec_fetch_mode,
+                                         sec_fetch_dest, sec_fetch_user)
+        return self.observe_fingerprint(fingerprint, ip_address, user_id, now)
+
+    def memory_bytes(self) -> int:
+        """스케치와 추적 지문이 차지하는 배열 메모리 (top_k 개가 모두 찼을 때의 상한은 고정)."""
+        return self.sketch.memory_bytes() + sum(
+            entry.accounts.memory_bytes() + entry.subnet16.memory_bytes() for entry in self.tracked.values()
+        )
+
+
+# ==============================================================================
+# 4. 모의 실험
+# ==============================================================================
+
+def simulate(
+        benign_rows: List[Dict[str, Any]],
+        benign_seconds: float,
+        attack_attempts: int,
+        attack_seconds: float,
+        random_fingerprints: int = 0,
+        seed: int = 7
+) -> Dict[str, Any]:
+    """
+    정상 로그인(헤더 데이터 행을 benign_seconds 동안 고르게 분산)과, 같은 헤더로 IP 와 계정을 바꿔 가며
+    attack_seconds 동안 시도하는 캠페인을 섞어 재생합니다.
+    random_fingerprints 만큼 매번 다른 UA 로 보내는 요청을 추가해 지문 폭주 시 메모리를 확인합니다.
+    """
+    rng = random.Random(seed)
+    events = []
+    for index, row in enumerate(benign_rows):
+        events.append((index * benign_seconds / max(1, len(benign_rows)), 'benign', row))
+    attack_headers = {
+        'user_agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+                      'Chrome/129.0.0.0 Safari/537.36',
+        'accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
+        'accept_language': 'en-US,en;q=0.9',
+        'sec_fetch_site': 'same-origin', 'sec_fetch_mode': 'navigate', 'sec_fetch_dest': 'document',
+        'sec_fetch_user': '?1',
+    }
+    attack_start = benign_seconds / 2
+    for index in range(attack_attempts):
+        ip = '.'.join(str(rng.randrange(1, 255)) for _ in range(4))
+        events.append((attack_start + index * attack_seconds / max(1, attack_attempts), 'attack',
+                       dict(attack_headers, ip=ip, userid=f"victim{index}")))
+    for index in range(random_fingerprints):
+        events.append((rng.uniform(0, benign_seconds), 'noise',
+                       dict(attack_headers, user_agent=f"noise/{index}", ip='10.0.0.1', userid=f"n{index}")))
+    events.sort(key=lambda event: event[0])
+
+    detector = CampaignDetector()
+    flagged = {'benign': 0, 'attack': 0, 'noise': 0}
+    totals = {'benign': 0, 'attack': 0, 'noise': 0}
+    peak_memory = 0
+    started = time.perf_counter()
+    for position, (now, kind, row) in enumerate(events):
+        score, _ = detector.observe(
+            row.get('ip'), row.get('userid'), row.get('user_agent'), row.get('accept'), row.get('accept_language'),
+            row.get('sec_fetch_site'), row.get('sec_fetch_mode'), row.get('sec_fetch_dest'), row.get('sec_fetch_user'),
+            now
+        )
+        totals[kind] += 1
+        flagged[kind] += score > 0
+        if position % 1000 == 0:
+            peak_memory = max(peak_memory, detector.memory_bytes())
+    elapsed = time.perf_counter() - started
+    return {'totals': totals, 'flagged': flagged, 'peak_memory_bytes': peak_memory,
+            'tracked': len(detector.tracked), 'micros_per_event': elapsed / max(1, len(events)) * 1e6}
+
+
+if __name__ == '__main__':
+    from batch_scoring import HEADER_DATA_FILE
+    from login_load_test import read_replay_rows
+
+    parser = argparse.ArgumentParser(description="헤더 지문 기반 분산 계정 공격(캠페인) 탐지 모의 실험")
+    parser.add_argument('--rows', type=Path, default=HEADER_DATA_FILE, help="정상 로그인 헤더 데이터 CSV")
+    parser.add_argument('--benign-hours', type=float, default=24.0, help="정상 로그인을 분산할 시간")
+    parser.add_argument('--attack-attempts', type=int, default=2000, help="캠페인 시도 수")
+    parser.add_argument('--attack-minutes', type=float, default=10.0, help="캠페인 지속 시간")
+    parser.add_argument('--random-fingerprints', type=int, default=50000, help="매번 다른 지문으로 보내는 요청 수")
+    args = parser.parse_args()
+
+    report = simulate(read_replay_rows(args.rows), args.benign_hours * 3600, args.attack_attempts,
+                      args.attack_minutes * 60, args.random_fingerprints)
+    for kind in ('benign', 'attack', 'noise'):
+        total = report['totals'][kind]
+        print(f"{kind:<7} {total:>7}건 중 캠페인 점수 부여 {report['flagged'][kind]:>6}건 "
+              f"({report['flagged'][kind] / max(1, total):.1%})")
+    print(f"최대 메모리 {report['peak_memory_bytes'] / 1024:,.0f} KiB, 추적 지문 {report['tracked']}개, "
+          f"{report['micros_per_event']:.1f} us/건")
@@ -0,0 +1,345 @@
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+from pathlib import Path
+import argparse
+import ast
+import time
+
+import numpy as np
+import pandas as pd
+
+# ==============================================================================
+# 1. 헤더 분포 (공격스크립트/attack_script.py)
+# ==============================================================================
+# attack_script.py 는 import 하면 바로 로그인 요청을 보내므로, 소스를 ast 로 읽어 분포 상수만 꺼냅니다.
+# 이 모듈은 파일만 쓰며 네트워크 요청을 보내지 않습니다.
+ATTACK_SCRIPT_FILE = Path(__file__).resolve().parent.parent / '공격스크립트' / 'attack_script.py'
+DISTRIBUTION_NAMES: Sequence[str] = (
+    'USER_AGENTS', 'ACCEPT_HEADERS_BY_BROWSER', 'ALL_ACCEPT_VALUES', 'LOCATION_DATA', 'locations', 'weights',
+    'NORMAL_REFERERS', 'NORMAL_SEC_FETCH_SETS', 'ATTACK_REFERERS', 'ATTACK_SEC_FETCH_SETS',
+)
+CORPUS_DIR = Path(__file__).resolve().parent / '.dataset_cache' / 'corpus'
+
+# 생성 파일 형식: 과거 기록은 web_service_accounts_login.csv, 로그인은 login_header_data.csv 와 같은 컬럼에
+# 시각(timestamp)과 라벨(label: 1 = 공격, scenario) 을 덧붙입니다.
+HISTORY_COLUMNS: List[str] = ['id', 'password', 'ip', 'user_agent', 'referer', 'accept_language']
+LOGIN_COLUMNS: List[str] = [
+    'userid', 'password', 'ip', 'accept_language', 'referer', 'user_agent', 'accept',
+    'sec-fetch-site', 'sec-fetch-mode', 'sec-fetch-user', 'sec-fetch-dest', 'timestamp', 'label', 'scenario',
+]
+
+# 시나리오 비율과 세부 확률 (공격 트래픽의 확률은 attack_script.py 의 값과 같습니다)
+CORPUS_ATTACK_RATIO = 0.05  # 전체 로그인 중 공격 비율
+CORPUS_TRAVEL_RATIO = 0.03  # 정상 로그인 중 평소와 다른 지역에서 접속하는 비율
+CORPUS_NEW_DEVICE_RATIO = 0.05  # 정상 로그인 중 평소와 다른 브라우저로 접속하는 비율
+CORPUS_LEAKED_RATIO = 0.02  # 공격 중 실제 비밀번호를 맞힌 비율 (크리덴셜 스터핑 성공)
+ATTACK_MATCHING_ACCEPT_RATIO = 0.85
+ATTACK_NORMAL_REFERER_RATIO = 0.9
+ATTACK_NORMAL_SEC_FETCH_RATIO = 0.95
+
+CORPUS_START_TIME = 1760400000.0  # 2025-10-14 00:00:00 UTC
+CORPUS_REQUESTS_PER_SECOND = 200.0
+CORPUS_CHUNK_SIZE = 500_000
+CORPUS_SEED = 20251014
+
+PASSWORD_ALPHABET = np.frombuffer(
+    b'abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789!@#$%^&*()_+', dtype=np.uint8
+)
+PASSWORD_LENGTH = 8
+OCTETS = np.array([str(value) for value in range(256)], dtype=object)
+
+
+def load_attack_distributions(path: Path = ATTACK_SCRIPT_FILE) -> Dict[str, Any]:
+    """attack_script.py 의 모듈 수준 리터럴 상수를 실행하지 않고 읽습니다."""
+    tree = ast.parse(Path(path).read_text(encoding='utf-8'), filename=str(path))
+    values: Dict[str, Any] = {}
+    for node in tree.body:
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign) and node.value is not None:
+            targets, value = [node.target], node.value
+        else:
+            continue
+        for target in targets:
+            if isinstance(target, ast.Name) and target.id in DISTRIBUTION_NAMES:
+                values[target.id] = ast.literal_eval(value)
+    missing = [name for name in DISTRIBUTION_NAMES if name not in values]
+    if missing:
+        raise ValueError(f"{path}: 분포 상수({', '.join(missing)})를 찾을 수 없습니다.")
+    return values
+
+
+def browser_type(ua: str) -> str:
+    """ACCEPT_HEADERS_BY_BROWSER 의 키. attack_script.get_browser_type_from_ua 의 의도대로 대소문자 없이 비교합니다."""
+    ua_lower = ua.lower()
+    if 'firefox/' in ua_lower:
+        return 'firefox'
+    if 'chrome/' in ua_lower:
+        return 'chrome'
+    if 'safari/' in ua_lower and 'version/' in ua_lower:
+        return 'safari'
+    return 'none'
+
+
+def _grouped(groups: Sequence[Sequence[Any]]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """그룹별 리스트를 (평탄화된 값, 그룹 시작 위치, 그룹 크기) 로 바꿉니다."""
+    counts = np.array([len(group) for group in groups], dtype=np.int64)
+    offsets = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    values = np.array([value for group in groups for value in group], dtype=object)
+    return values, offsets, counts
+
+
+class CorpusDistributions:
+    """attack_script.py 분포를 벡터화 샘플링용 배열로 바꾼 것. 값이 None 인 헤더는 빈 문자열로 씁니다."""
+
+    def __init__(self, raw: Dict[str, Any]) -> None:
+        def text(values: Sequence[Optional[str]]) -> np.ndarray:
+            return np.array(['' if value is None else value for value in values], dtype=object)
+
+        self.user_agents = text(raw['USER_AGENTS'])
+        browsers = [browser_type(ua) for ua in raw['USER_AGENTS']]
+        self.matching_accepts = text([raw['ACCEPT_HEADERS_BY_BROWSER'][browser] for browser in browsers])
+        self.browser_ua_indices = np.flatnonzero([browser != 'none' for browser in browsers])
+        self.all_accepts = text(raw['ALL_ACCEPT_VALUES'])
+
+        self.locations: List[str] = list(raw['locations'])
+        weights = np.asarray(raw['weights'], dtype=float)
+        self.attack_location_p = weights / weights.sum()
+        benign = np.array([name != 'Malicious' for name in self.locations])
+        self.benign_location_p = np.where(benign, weights, 0) / weights[benign].sum()
+        location_data = [raw['LOCATION_DATA'][name] for name in self.locations]
+        self.prefixes, self.prefix_offsets, self.prefix_counts = _grouped([data['ip_prefixes'] for data in location_data])
+        languages, self.language_offsets, self.language_counts = _grouped([data['languages'] for data in location_data])
+        self.languages = text(languages)
+
+        self.normal_referers = text(raw['NORMAL_REFERERS'])
+        self.attack_referers = text(raw['ATTACK_REFERERS'])
+        self.sec_fetch_sets = {
+            kind: {field: text([entry[field] for entry in raw[name]]) for field in ('site', 'mode', 'user', 'dest')}
+            for kind, name in (('normal', 'NORMAL_SEC_FETCH_SETS'), ('attack', 'ATTACK_SEC_FETCH_SETS'))
+        }
+
+    @classmethod
+    def from_attack_script(cls, path: Path = ATTACK_SCRIPT_FILE) -> 'CorpusDistributions':
+        return cls(load_attack_distributions(path))
+
+
+# ==============================================================================
+# 2. 벡터화 샘플링
+# ==============================================================================
+
+def _pick_in_group(rng: np.random.Generator, offsets: np.ndarray, counts: np.ndarray, groups: np.ndarray) -> np.ndarray:
+    """행마다 자기 그룹 안에서 균등하게 하나를 골라 평탄화 배열의 위치를 반환합니다."""
+    return offsets[groups] + (rng.random(len(groups)) * counts[groups]).astype(np.int64)
+
+
+def _ip_strings(rng: np.random.Generator, prefixes: np.ndarray) -> np.ndarray:
+    """'a.b' 접두어마다 attack_script.py 처럼 뒤 두 자리를 1~254 에서 뽑아 붙입니다."""
+    third = OCTETS[rng.integers(1, 255, len(prefixes))]
+    fourth = OCTETS[rng.integers(1, 255, len(prefixes))]
+    return prefixes + '.' + third + '.' + fourth
+
+
+def _passwords(rng: np.random.Generator, count: int) -> np.ndarray:
+    characters = PASSWORD_ALPHABET[rng.integers(0, len(PASSWORD_ALPHABET), (count, PASSWORD_LENGTH))]
+    return np.ascontiguousarray(characters).view(f'S{PASSWORD_LENGTH}').ravel().astype(str).astype(object)
+
+
+def _chunk_rng(seed: int, stream: int, chunk: int) -> np.random.Generator:
+    """(seed, 스트림, 청크 번호) 마다 독립된 난수 생성기. 같은 seed 와 청크 크기면 같은 파일이 나옵니다."""
+    return np.random.default_rng([seed, stream, chunk])
+
+
+class SyntheticUsers:
+    """
+    가상 사용자 n 명의 고정 속성 (계정, 비밀번호, 거주 지역, 주 IP 접두어, 브라우저, 언어).
+    사용자 수에만 비례하는 배열이므로 생성할 로그인 행 수와 무관하게 메모리가 일정합니다.
+    """
+
+    def __init__(self, distributions: CorpusDistributions, count: int, seed: int = CORPUS_SEED) -> None:
+        rng = _chunk_rng(seed, 0, 0)
+        self.count = count
+        self.user_ids = np.array([f"user{index:08d}" for index in range(count)], dtype=object)
+        self.passwords = _passwords(rng, count)
+        self.locations = rng.choice(len(distributions.locations), count, p=distributions.benign_location_p)
+        self.prefix_indices = _pick_in_group(rng, distributions.prefix_offsets, distributions.prefix_counts, self.locations)
+        self.ua_indices = rng.choice(distributions.browser_ua_indices, count)
+        self.language_indices = _pick_in_group(
+            rng, distributions.language_offsets, distributions.language_counts, self.locations
+        )
+
+
+def generate_histories(
+        distributions: CorpusDistributions,
+        users: SyntheticUsers,
+        per_user: int = 3,
+        seed: int = CORPUS_SEED,
+        chunk_size: int = CORPUS_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """사용자마다 per_user 건의 정상 과거 로그인(주 IP 대역, 평소 브라우저/언어) 을 청크 단위로 생성합니다."""
+    users_per_chunk = max(1, chunk_size // max(1, per_user))
+    for chunk, start in enumerate(range(0, users.count, users_per_chunk)):
+        rng = _chunk_rng(seed, 1, chunk)
+        index = np.repeat(np.arange(start, min(users.count, start + users_per_chunk)), per_user)
+        yield pd.DataFrame({
+            'id': users.user_ids[index],
+            'password': users.passwords[index],
+            'ip': _ip_strings(rng, distributions.prefixes[users.prefix_indices[index]]),
+            'user_agent': distributions.user_agents[users.ua_indices[index]],
+            'referer': distributions.normal_referers[rng.integers(0, len(distributions.normal_referers), len(index))],
+            'accept_language': distributions.languages[users.language_indices[index]],
+        }, columns=HISTORY_COLUMNS)
+
+
+def _benign_logins(rng: np.random.Generator, distributions: CorpusDistributions, users: SyntheticUsers,
+                   count: int) -> Dict[str, np.ndarray]:
+    """평소 환경의 정상 로그인. 일부는 다른 지역(여행)이나 다른 브라우저(새 기기) 에서 접속합니다."""
+    user = rng.integers(0, users.count, count)
+    travel = rng.random(count) < CORPUS_TRAVEL_RATIO
+    locations = np.where(travel, rng.choice(len(distributions.locations), count, p=distributions.benign_location_p),
+                         users.locations[user])
+    prefix = np.where(travel, _pick_in_group(rng, distributions.prefix_offsets, distributions.prefix_counts, locations),
+                      users.prefix_indices[user])
+    language = np.where(travel, _pick_in_group(rng, distributions.language_offsets, distributions.language_counts,
+                                               locations), users.language_indices[user])
+    new_device = rng.random(count) < CORPUS_NEW_DEVICE_RATIO
+    ua = np.where(new_device, rng.choice(distributions.browser_ua_indices, count), users.ua_indices[user])
+    sec_fetch = distributions.sec_fetch_sets['normal']
+    sec_index = rng.integers(0, len(sec_fetch['site']), count)
+    return {
+        'userid': users.user_ids[user],
+        'password': users.passwords[user],
+        'ip': _ip_strings(rng, distributions.prefixes[prefix]),
+        'accept_language': distributions.languages[language],
+        'referer': distributions.normal_referers[rng.integers(0, len(distributions.normal_referers), count)],
+        'user_agent': distributions.user_agents[ua],
+        'accept': distributions.matching_accepts[ua],
+        **{f'sec-fetch-{field}': values[sec_index] for field, values in sec_fetch.items()},
+        'scenario': np.where(travel, 'travel', np.where(new_device, 'new_device', 'benign')).astype(object),
+    }
+
+
+def _attack_logins(rng: np.random.Generator, distributions: CorpusDistributions, users: SyntheticUsers,
+                   count: int) -> Dict[str, np.ndarray]:
+    """attack_script.py 와 같은 확률로 헤더를 고른 크리덴셜 스터핑 시도. 대부분 틀린 비밀번호입니다."""
+    user = rng.integers(0, users.count, count)
+    leaked = rng.random(count) < CORPUS_LEAKED_RATIO
+    locations = rng.choice(len(distributions.locations), count, p=distributions.attack_location_p)
+    prefix = _pick_in_group(rng, distributions.prefix_offsets, distributions.prefix_counts, locations)
+    language = _pick_in_group(rng, distributions.language_offsets, distributions.language_counts, locations)
+    ua = rng.integers(0, len(distributions.user_agents), count)
+    accept = np.where(rng.random(count) < ATTACK_MATCHING_ACCEPT_RATIO, distributions.matching_accepts[ua],
+                      distributions.all_accepts[rng.integers(0, len(distributions.all_accepts), count)])
+    referer = np.where(rng.random(count) < ATTACK_NORMAL_REFERER_RATIO,
+                       distributions.normal_referers[rng.integers(0, len(distributions.normal_referers), count)],
+                       distributions.attack_referers[rng.integers(0, len(distributions.attack_referers), count)])
+    normal_sec = rng.random(count) < ATTACK_NORMAL_SEC_FETCH_RATIO
+    sec_fetch = {}
+    for field in ('site', 'mode', 'user', 'dest'):
+        normal = distributions.sec_fetch_sets['normal'][field]
+        attack = distributions.sec_fetch_sets['attack'][field]
+        sec_fetch[f'sec-fetch-{field}'] = np.where(normal_sec, normal[rng.integers(0, len(normal), count)],
+                                                   attack[rng.integers(0, len(attack), count)])
+    return {
+        'userid': users.user_ids[user],
+        'password': np.where(leaked, users.passwords[user], _passwords(rng, count)),
+        'ip': _ip_strings(rng, distributions.prefixes[prefix]),
+        'accept_language': distributions.languages[language],
+        'referer': referer,
+        'user_agent': distributions.user_agents[ua],
+        'accept': accept,
+        **sec_fetch,
+        'scenario': np.where(leaked, 'stuffing_success', 'stuffing').astype(object),
+    }
+
+
+def generate_logins(
+        distributions: CorpusDistributions,
+        users: SyntheticUsers,
+        rows: int,
+        attack_ratio: float = CORPUS_ATTACK_RATIO,
+        requests_per_second: float = CORPUS_REQUESTS_PER_SECOND,
+        seed: int = CORPUS_SEED,
+        chunk_size: int = CORPUS_CHUNK_SIZE
+) -> Iterator[pd.DataFrame]:
+    """
+    라벨이 붙은 로그인 rows 건을 청크 단위로 생성합니다. 청크 안에서 정상/공격 행을 따로 뽑아 섞고,
+    도착 간격은 지수분포(초당 requests_per_second 건)로 청크를 넘어 이어지는 시각을 붙입니다.
+    """
+    clock = CORPUS_START_TIME
+    for chunk, start in enumerate(range(0, rows, chunk_size)):
+        rng = _chunk_rng(seed, 2, chunk)
+        count = min(chunk_size, rows - start)
+        attacks = int(rng.binomial(count, attack_ratio))
+        benign = _benign_logins(rng, distributions, users, count - attacks)
+        attack = _attack_logins(rng, distributions, users, attacks)
+        order = rng.permutation(count)
+        frame = pd.DataFrame({
+            name: np.concatenate((benign[name], attack[name]))[order]
+            for name in LOGIN_COLUMNS if name in benign
+        })
+        frame['label'] = (order >= count - attacks).astype(np.int8)
+        times = clock + np.cumsum(rng.exponential(1 / requests_per_second, count))
+        clock = float(times[-1]) if count else clock
+        frame['timestamp'] = np.round(times, 3)
+        yield frame[LOGIN_COLUMNS]
+
+
+def _csv_quote(value: str) -> str:
+    if any(character in value for character in ',"\r\n'):
+        return '"' + value.replace('"', '""') + '"'
+    return value
+
+
+def _csv_field(values: pd.Series) -> List[str]:
+    """컬럼을 CSV 필드 문자열로 바꿉니다. 문자열 컬럼은 고유값마다 한 번만 따옴표 처리합니다."""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.astype(str).tolist()
+    codes, uniques = pd.factorize(values.to_numpy())
+    return np.array([_csv_quote(str(value)) for value in uniques], dtype=object)[codes].tolist()
+
+
+def write_chunks(chunks: Iterator[pd.DataFrame], path: Path) -> int:
+    """
+    청크를 하나씩 CSV 에 이어 씁니다. 메모리에는 청크 하나만 있습니다. 쓴 행 수를 반환합니다.
+    결과는 DataFrame.to_csv(index=False) 와 같지만, 반복되는 긴 헤더 값의 따옴표 처리를 고유값 단위로 줄여 약 3배 빠릅니다.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    written = 0
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        for chunk in chunks:
+            if written == 0:
+                file.write(','.join(_csv_quote(str(name)) for name in chunk.columns) + '\n')
+            if len(chunk):
+                file.write('\n'.join(map(','.join, zip(*(_csv_field(chunk[name]) for name in chunk.columns)))) + '\n')
+            written += len(chunk)
+    return written
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="attack_script.py 분포로 대용량 라벨 로그인 데이터셋을 생성합니다 (파일만 씀).")
+    parser.add_argument('--users', type=int, default=100_000, help="가상 사용자 수")
+    parser.add_argument('--rows', type=int, default=1_000_000, help="생성할 로그인 행 수")
+    parser.add_argument('--history-per-user', type=int, default=3, help="사용자별 과거 로그인 수")
+    parser.add_argument('--attack-ratio', type=float, default=CORPUS_ATTACK_RATIO, help="공격 로그인 비율")
+    parser.add_argument('--rate', type=float, default=CORPUS_REQUESTS_PER_SECOND, help="timestamp 의 평균 초당 요청 수")
+    parser.add_argument('--seed', type=int, default=CORPUS_SEED)
+    parser.add_argument('--chunk-size', type=int, default=CORPUS_CHUNK_SIZE, help="한 번에 생성/기록할 행 수")
+    parser.add_argument('--output-dir', type=Path, default=CORPUS_DIR)
+    parser.add_argument('--attack-script', type=Path, default=ATTACK_SCRIPT_FILE, help="분포를 읽을 attack_script.py")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    distributions = CorpusDistributions.from_attack_script(args.attack_script)
+    users = SyntheticUsers(distributions, args.users, args.seed)
+    history_file = args.output_dir / 'history.csv'
+    login_file = args.output_dir / 'logins.csv'
+    history_rows = write_chunks(
+        generate_histories(distributions, users, args.history_per_user, args.seed, args.chunk_size), history_file
+    )
+    login_rows = write_chunks(
+        generate_logins(distributions, users, args.rows, args.attack_ratio, args.rate, args.seed, args.chunk_size),
+        login_file
+    )
+    elapsed = time.perf_counter() - start
+    print(f"{history_file}: {history_rows:,}행")
+    print(f"{login_file}: {login_rows:,}행 | {elapsed:.1f}s ({(history_rows + login_rows) / elapsed:,.0f} 행/s)")
@@ -0,0 +1,421 @@
+from typing import Any, Dict, List, Optional, Tuple
+from array import array
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+import argparse
+import heapq
+import json
+import threading
+import time
+
+from login_event import LoginEvent, LoginEventStore, decode_ip
+from scoring import SCORE_COMPONENTS, determine_security_action, get_group_name, get_group_name_for_int
+
+# ==============================================================================
+# 1. 집계 기준
+# ==============================================================================
+# 관리자 대시보드(관리자/script_1.js) 의 stats / login-logs / attack-distribution 응답을
+# 로그 테이블을 매번 훑는 대신, 점수화된 로그인 이벤트가 들어올 때마다 O(1) 로 갱신하는 카운터에서 만듭니다.
+ACTIONS: List[str] = ['ALLOW_LOGIN', 'REQUIRE_CAPTCHA', 'BLOCK_AND_REDIRECT_MAIN']
+ACTION_STATUS: Dict[str, str] = {
+    'ALLOW_LOGIN': 'normal',
+    'REQUIRE_CAPTCHA': 'suspicious',
+    'BLOCK_AND_REDIRECT_MAIN': 'blocked',
+}
+# 위험 요인별 집계 대상: 헤더 항목 + 호출 측에서 넘기는 상태 기반 항목
+FACTOR_COMPONENTS: List[str] = SCORE_COMPONENTS + ['velocity_score', 'campaign_score', 'breach_score']
+# attack-distribution 응답 키 -> 위험 요인
+DISTRIBUTION_FACTORS: Dict[str, str] = {
+    'ipDistribution': 'ip_score',
+    'userAgentAnomaly': 'ua_score',
+    'refererMismatch': 'referer_score',
+    'languageAnomaly': 'lang_score',
+}
+
+DASHBOARD_RECENT_CAPACITY = 10_000  # 로그인 기록 페이지네이션용 최근 이벤트 수
+DASHBOARD_MAX_IPS = 100_000  # IP 별 집계 최대 키 수 (초과 시 가장 오래 안 보인 IP 부터 제거)
+DASHBOARD_BUCKET_SECONDS = 60
+DASHBOARD_SERIES_BUCKETS = 1440  # 1분 버킷 24시간
+DASHBOARD_CHANGE_WINDOW_SECONDS = 3600  # percentageChanges 비교 구간 (지난 1시간 vs 그 전 1시간)
+DASHBOARD_PAGE_SIZE = 20
+DASHBOARD_MAX_PAGE_SIZE = 200
+
+
+class TimeSeries:
+    """고정 길이 시간 버킷 링. 버킷 번호가 바뀌면 그 칸을 0 으로 비우고 다시 씁니다."""
+
+    FIELDS = ('attempts', 'detected', 'captcha', 'blocked')
+
+    def __init__(self, bucket_seconds: float = DASHBOARD_BUCKET_SECONDS, buckets: int = DASHBOARD_SERIES_BUCKETS) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.buckets = buckets
+        self.bucket_ids = array('q', [-1]) * buckets
+        self.counts = {field: array('I', [0]) * buckets for field in self.FIELDS}
+
+    def _slot(self, bucket: int) -> int:
+        slot = bucket % self.buckets
+        if self.bucket_ids[slot] != bucket:
+            self.bucket_ids[slot] = bucket
+            for counts in self.counts.values():
+                counts[slot] = 0
+        return slot
+
+    def add(self, timestamp: float, action: str) -> None:
+        slot = self._slot(int(timestamp // self.bucket_seconds))
+        self.counts['attempts'][slot] += 1
+        if action != 'ALLOW_LOGIN':
+            self.counts['detected'][slot] += 1
+            self.counts['captcha' if action == 'REQUIRE_CAPTCHA' else 'blocked'][slot] += 1
+
+    def window(self, end: float, seconds: float) -> Dict[str, int]:
+        """(end - seconds, end] 구간 버킷들의 합계."""
+        last = int(end // self.bucket_seconds)
+        first = last - min(self.buckets, max(1, int(round(seconds / self.bucket_seconds)))) + 1
+        totals = dict.fromkeys(self.FIELDS, 0)
+        for bucket in range(first, last + 1):
+            slot = bucket % self.buckets
+            if self.bucket_ids[slot] == bucket:
+                for field, counts in self.counts.items():
+                    totals[field] += counts[slot]
+        return totals
+
+    def points(self, end: float, count: int) -> List[Dict[str, Any]]:
+        """end 가 속한 버킷까지 최근 count 개 버킷을 오래된 순서로 반환합니다."""
+        last = int(end // self.bucket_seconds)
+        points = []
+        for bucket in range(last - min(count, self.buckets) + 1, last + 1):
+            slot = bucket % self.buckets
+            present = self.bucket_ids[slot] == bucket
+            point: Dict[str, Any] = {'time': bucket * self.bucket_seconds}
+            point.update((field, counts[slot] if present else 0) for field, counts in self.counts.items())
+            points.append(point)
+        return points
+
+
+def _percentage_change(current: int, previous: int) -> float:
+    return round((current - previous) / previous * 100, 1) if previous else 0.0
+
+
+# ==============================================================================
+# 2. 증분 집계
+# ==============================================================================
+
+class DashboardAggregates:
+    """
+    점수화된 로그인 이벤트를 받아 대시보드 집계를 갱신합니다. record 는 이벤트당 상수 시간이고,
+    조회는 최근 이벤트 링 크기와 IP 키 한도에만 비례하므로 누적 로그 양과 무관하게 일정합니다.
+    """
+
+    def __init__(
+            self,
+            recent_capacity: int = DASHBOARD_RECENT_CAPACITY,
+            max_ips: int = DASHBOARD_MAX_IPS,
+            bucket_seconds: float = DASHBOARD_BUCKET_SECONDS,
+            series_buckets: int = DASHBOARD_SERIES_BUCKETS
+    ) -> None:
+        self.total_attempts = 0
+        self.action_counts: Dict[str, int] = dict.fromkeys(ACTIONS, 0)
+        self.factor_counts: Dict[str, int] = dict.fromkeys(FACTOR_COMPONENTS, 0)
+        self.detected_factor_counts: Dict[str, int] = dict.fromkeys(FACTOR_COMPONENTS, 0)
+        # 그룹(국가) / IP -> [시도, 탐지, 차단]
+        self.countries: Dict[str, List[int]] = {}
+        self.ips: 'OrderedDict[int, List[float]]' = OrderedDict()
+        self.max_ips = max_ips
+        self.series = TimeSeries(bucket_seconds, series_buckets)
+        self.last_timestamp = 0.0
+
+        # 최근 이벤트: LoginEventStore 와 같은 순서의 점수/조치 배열. 이벤트 번호(seq) 가 커서입니다.
+        self.recent = LoginEventStore(recent_capacity)
+        self.recent_scores = array('h', [0]) * recent_capacity
+        self.recent_actions = array('B', [0]) * recent_capacity
+        self.recent_status_counts: Dict[str, int] = dict.fromkeys(ACTION_STATUS.values(), 0)
+        self.next_seq = 0
+        self.lock = threading.Lock()
+
+    def record(self, event: LoginEvent, scores: Dict[str, int], action: Optional[str] = None) -> None:
+        """
+        점수화된 로그인 한 건을 반영합니다. scores 는 calculate_login_score_breakdown 결과(total_score 포함)이고,
+        action 을 생략하면 total_score 로 determine_security_action 을 적용합니다.
+        """
+        total = int(scores.get('total_score', 0))
+        action = action or determine_security_action(total)
+        detected = action != 'ALLOW_LOGIN'
+        blocked = action == 'BLOCK_AND_REDIRECT_MAIN'
+        group = get_group_name_for_int(event.ip) if event.ip >= 0 else get_group_name(event.ip_address)
+        timestamp = event.timestamp or time.time()
+
+        with self.lock:
+            self.total_attempts += 1
+            self.action_counts[action] = self.action_counts.get(action, 0) + 1
+            for name in FACTOR_COMPONENTS:
+                if scores.get(name):
+                    self.factor_counts[name] += 1
+                    if detected:
+                        self.detected_factor_counts[name] += 1
+
+            country = self.countries.get(group)
+            if country is None:
+                country = self.countries[group] = [0, 0, 0]
+            country[0] += 1
+            country[1] += detected
+            country[2] += blocked
+
+            ip = self.ips.get(event.ip)
+            if ip is None:
+                ip = self.ips[event.ip] = [0, 0, 0, timestamp]
+                if len(self.ips) > self.max_ips:
+                    self.ips.popitem(last=False)
+            else:
+                self.ips.move_to_end(event.ip)
+            ip[0] += 1
+            ip[1] += detected
+            ip[2] += blocked
+            ip[3] = timestamp
+
+            self.series.add(timestamp, action)
+            self.last_timestamp = max(self.last_timestamp, timestamp)
+
+            slot = self.next_seq % self.recent.capacity
+            if len(self.recent) == self.recent.capacity:
+                self.recent_status_counts[ACTION_STATUS[ACTIONS[self.recent_actions[slot]]]] -= 1
+            self.recent.append(event)
+            self.recent_scores[slot] = max(-32768, min(32767, total))
+            self.recent_actions[slot] = ACTIONS.index(action) if action in ACTION_STATUS else 0
+            self.recent_status_counts[ACTION_STATUS.get(action, 'normal')] += 1
+            self.next_seq += 1
+
+    def record_log_record(self, record: Dict[str, Any]) -> None:
+        """
+        risk_score_log 레코드(항목 점수와 total_score 포함) 한 건을 반영합니다.
+        레코드에 기록된 action 이 있으면 총점으로 다시 판정하지 않고 그 조치를 집계합니다.
+        """
+        action = record.get('action')
+        self.record(LoginEvent.from_log_record(record), record, action if isinstance(action, str) else None)
+
+    # ------------------------------------------------------------------
+    # JSON 응답 (관리자/script_1.js 형식)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            now = self.last_timestamp or time.time()
+            current = self.series.window(now, DASHBOARD_CHANGE_WINDOW_SECONDS)
+            previous = self.series.window(now - DASHBOARD_CHANGE_WINDOW_SECONDS, DASHBOARD_CHANGE_WINDOW_SECONDS)
+            detected = self.total_attempts - self.action_counts['ALLOW_LOGIN']
+            return {
+                'totalLoginAttempts': self.total_attempts,
+                'detectedAttacks': detected,
+                'secondaryDefenseCount': self.action_counts['REQUIRE_CAPTCHA'],
+                'actions': dict(self.action_counts),
+                'percentageChanges': {
+                    'totalLoginAttempts': _percentage_change(current['attempts'], previous['attempts']),
+                    'detectedAttacks': _percentage_change(current['detected'], previous['detected']),
+                    'secondaryDefenseCount': _percentage_change(current['captcha'], previous['captcha']),
+                },
+            }
+
+    def attack_distribution(self) -> Dict[str, Any]:
+        """탐지된(허용되지 않은) 로그인에서 위험 요인별 비율(%). 나머지 요인 건수는 factors 에 담습니다."""
+        with self.lock:
+            counts = {key: self.detected_factor_counts[name] for key, name in DISTRIBUTION_FACTORS.items()}
+            factors = dict(self.detected_factor_counts)
+        total = sum(counts.values())
+        result: Dict[str, Any] = {key: round(count / total * 100) if total else 0 for key, count in counts.items()}
+        result['factors'] = factors
+        return result
+
+    def login_logs(
+            self,
+            cursor: Optional[int] = None,
+            limit: int = DASHBOARD_PAGE_SIZE,
+            status_filter: str = 'all'
+    ) -> Dict[str, Any]:
+        """
+        최근 이벤트를 최신순으로 limit 건 반환합니다. cursor 는 이전 응답의 nextCursor 이며 그보다 오래된 이벤트부터 이어집니다.
+        status_filter 는 'all', 'suspicious'(CAPTCHA), 'blocked'(차단) 입니다.
+        """
+        limit = max(1, min(limit, DASHBOARD_MAX_PAGE_SIZE))
+        with self.lock:
+            oldest = self.next_seq - len(self.recent)
+            seq = self.next_seq if cursor is None else max(oldest, min(cursor, self.next_seq))
+            logs = []
+            while seq > oldest and len(logs) < limit:
+                seq -= 1
+                slot = seq % self.recent.capacity
+                status = ACTION_STATUS[ACTIONS[self.recent_actions[slot]]]
+                if status_filter != 'all' and status != status_filter:
+                    continue
+                event = self.recent[seq - oldest]
+                logs.append({
+                    'id': seq,
+                    'time': time.strftime('%H:%M:%S', time.localtime(event.timestamp)),
+                    'timestamp': event.timestamp,
+                    'userId': event.user_id,
+                    'ip': event.ip_address,
+                    'userAgent': event.user_agent,
+                    'referer': event.referer or '-',
+                    'language': event.accept_language,
+                    'riskScore': self.recent_scores[slot],
+                    'status': status,
+                })
+            matching = len(self.recent) if status_filter == 'all' else self.recent_status_counts.get(status_filter, 0)
+            return {
+                'logs': logs,
+                'nextCursor': seq if seq > oldest else None,
+                'totalPages': max(1, -(-matching // limit)),
+            }
+
+    def country_rollup(self) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = [{'country': name, 'attempts': a, 'detected': d, 'blocked': b}
+                    for name, (a, d, b) in self.countries.items()]
+        return sorted(rows, key=lambda row: -row['attempts'])
+
+    def top_ips(self, count: int = 20, by: str = 'detected') -> List[Dict[str, Any]]:
+        """시도(attempts) 또는 탐지(detected) 건수 상위 IP. IP 키 수가 max_ips 로 제한되므로 조회 비용도 일정합니다."""
+        column = {'attempts': 0, 'detected': 1, 'blocked': 2}[by]
+        with self.lock:
+            top = heapq.nlargest(count, self.ips.items(), key=lambda item: item[1][column])
+        return [{'ip': decode_ip(ip), 'attempts': a, 'detected': d, 'blocked': b, 'lastSeen': seen}
+                for ip, (a, d, b, seen) in top]
+
+    def series_points(self, buckets: int = 60) -> List[Dict[str, Any]]:
+        with self.lock:
+            return self.series.points(self.last_timestamp or time.time(), buckets)
+
+
+# ==============================================================================
+# 3. HTTP 인터페이스
+# ==============================================================================
+# GET /api/admin/stats
+# GET /api/admin/login-logs?cursor=&limit=&filter=all|suspicious|blocked
+# GET /api/admin/attack-distribution
+# GET /api/admin/countries
+# GET /api/admin/top-ips?count=&by=attempts|detected|blocked
+# GET /api/admin/series?buckets=
+
+class DashboardHandler(BaseHTTPRequestHandler):
+    """집계 객체는 make_dashboard_server 가 만드는 하위 클래스에 묶어 씁니다."""
+    protocol_version = 'HTTP/1.1'
+    aggregates: Optional[DashboardAggregates] = None
+
+    def do_GET(self) -> None:
+        url = urlparse(self.path)
+        query = {name: values[0] for name, values in parse_qs(url.query).items()}
+        aggregates = self.aggregates
+        try:
+            if url.path == '/api/admin/stats':
+                payload: Any = aggregates.stats()
+            elif url.path == '/api/admin/login-logs':
+                cursor = query.get('cursor')
+                payload = aggregates.login_logs(int(cursor) if cursor else None,
+                                                int(query.get('limit', DASHBOARD_PAGE_SIZE)), query.get('filter', 'all'))
+            elif url.path == '/api/admin/attack-distribution':
+                payload = aggregates.attack_distribution()
+            elif url.path == '/api/admin/countries':
+                payload = aggregates.country_rollup()
+            elif url.path == '/api/admin/top-ips':
+                payload = aggregates.top_ips(int(query.get('count', 20)), query.get('by', 'detected'))
+            elif url.path == '/api/admin/series':
+                payload = aggregates.series_points(int(query.get('buckets', 60)))
+            else:
+                self._reply(404, {"error": "not found"})
+                return
+        except (KeyError, ValueError):
+            self._reply(400, {"error": "bad query"})
+            return
+        self._reply(200, payload)
+
+    def _reply(self, status: int, payload: Any) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+
+def make_dashboard_server(host: str, port: int, aggregates: DashboardAggregates) -> ThreadingHTTPServer:
+    handler = type('BoundDashboardHandler', (DashboardHandler,), {'aggregates': aggregates})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def scored_header_events(rows: Path, history: Path) -> List[Tuple[LoginEvent, Dict[str, int]]]:
+    """헤더 데이터셋을 배치 점수화해 (이벤트, 점수) 목록을 만듭니다. 부하 측정 입력용입니다."""
+    from batch_scoring import attach_histories, build_user_histories, score_login_batch
+    from dataset_cache import read_csv_cached
+
+    logins = attach_histories(read_csv_cached(rows), build_user_histories(read_csv_cached(history)))
+    scores = score_login_batch(logins)
+    records = logins.rename(columns=lambda name: name.replace('-', '_')).astype(object).to_dict('records')
+    names = list(scores)
+    return [(LoginEvent.from_row(record), {name: int(scores[name][index]) for name in names})
+            for index, record in enumerate(records)]
+
+
+def time_queries(aggregates: DashboardAggregates, repeat: int = 20) -> Dict[str, float]:
+    """대시보드가 한 번 열릴 때 호출하는 조회들의 평균 시간(ms)."""
+    queries = {
+        'stats': aggregates.stats,
+        'login-logs': lambda: aggregates.login_logs(status_filter='blocked'),
+        'attack-distribution': aggregates.attack_distribution,
+        'top-ips': aggregates.top_ips,
+    }
+    timings = {}
+    for name, query in queries.items():
+        start = time.perf_counter()
+        for _ in range(repeat):
+            json.dumps(query(), ensure_ascii=False)
+        timings[name] = (time.perf_counter() - start) / repeat * 1000
+    return timings
+
+
+if __name__ == '__main__':
+    from batch_scoring import HEADER_DATA_FILE, HISTORY_DATA_FILE
+    from risk_log_rescoring import LOG_FILE, read_log_records
+
+    parser = argparse.ArgumentParser(description="관리자 대시보드 증분 집계 서버 / 부하 측정")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    serve = subcommands.add_parser('serve', help="위험 점수 로그를 집계하며 대시보드 API 제공")
+    serve.add_argument('log', type=Path, nargs='?', default=LOG_FILE, help="JSON 라인 위험 점수 로그")
+    serve.add_argument('--follow', action='store_true', help="로그에 새 줄이 추가되면 계속 반영")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8090)
+    bench = subcommands.add_parser('bench', help="이벤트 수를 늘려 가며 갱신/조회 시간 측정")
+    bench.add_argument('--events', type=int, default=1_000_000, help="반영할 총 이벤트 수")
+    bench.add_argument('--rows', type=Path, default=HEADER_DATA_FILE, help="헤더 데이터 CSV")
+    bench.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="사용자별 과거 로그인 CSV")
+    args = parser.parse_args()
+
+    aggregates = DashboardAggregates()
+    if args.command == 'serve':
+        def ingest() -> None:
+            for _, record in read_log_records(args.log, follow=args.follow):
+                aggregates.record_log_record(record)
+
+        threading.Thread(target=ingest, daemon=True).start()
+        server = make_dashboard_server(args.host, args.port, aggregates)
+        print(f"대시보드 API: http://{args.host}:{server.server_port}/api/admin/stats")
+        server.serve_forever()
+    else:
+        scored = scored_header_events(args.rows, args.history)
+        checkpoints = [count for count in (10_000, 100_000, 1_000_000, 10_000_000) if count < args.events] + [args.events]
+        recorded = 0
+        record_time = 0.0
+        for checkpoint in checkpoints:
+            start = time.perf_counter()
+            while recorded < checkpoint:
+                event, scores = scored[recorded % len(scored)]
+                event.timestamp = 1760400000.0 + recorded * 0.01
+                aggregates.record(event, scores)
+                recorded += 1
+            record_time += time.perf_counter() - start
+            timings = time_queries(aggregates)
+            print(f"이벤트 {recorded:>10,} | 갱신 {record_time / recorded * 1e6:5.2f} us/건 | " +
+                  ' | '.join(f"{name} {ms:.2f} ms" for name, ms in timings.items()))
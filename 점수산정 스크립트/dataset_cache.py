@@ -0,0 +1,196 @@
+from typing import Any, Dict, List, Optional, Sequence
+from pathlib import Path
+import argparse
+import json
+import os
+import shutil
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from scoring import ip_to_int
+
+# ==============================================================================
+# 1. 캐시 형식
+# ==============================================================================
+# CSV 하나당 캐시 디렉터리 하나를 만듭니다.
+#   meta.json           원본 경로/크기/mtime, 행 수, 컬럼 목록
+#   <번호>.codes.npy     문자열 컬럼의 범주 코드 (int32, 고유값은 <번호>.categories.json)
+#   <번호>.values.npy    숫자 컬럼 값
+#   <번호>.ipint.npy     IP 컬럼의 32비트 정수 값 (정규 표기가 아니면 -1)
+# .npy 파일은 np.load(mmap_mode='r') 로 메모리 매핑하므로 다시 읽을 때 CSV 파싱이 없습니다.
+# 원본 CSV 의 크기나 mtime 이 바뀌면 캐시를 자동으로 다시 만듭니다.
+CACHE_FORMAT_VERSION = 1
+DATASET_CACHE_DIR = Path(__file__).resolve().parent / '.dataset_cache'
+IP_COLUMNS: Sequence[str] = ('ip',)
+
+
+def _source_signature(path: Path) -> Dict[str, Any]:
+    status = os.stat(path)
+    return {'source': str(path), 'size': status.st_size, 'mtime_ns': status.st_mtime_ns}
+
+
+def cache_path_for(source: Path, cache_dir: Path = DATASET_CACHE_DIR) -> Path:
+    """원본 CSV 의 캐시 디렉터리 경로. 같은 파일 이름이 여러 폴더에 있어도 겹치지 않도록 경로 CRC 를 붙입니다."""
+    source = Path(source).resolve()
+    return Path(cache_dir) / f"{source.stem}-{zlib.crc32(str(source).encode('utf-8')):08x}"
+
+
+class ColumnarDataset:
+    """
+    메모리 매핑된 컬럼형 캐시 하나.
+    문자열 컬럼은 (코드 배열, 고유값 배열), 숫자 컬럼은 값 배열로 보관하며, 필요할 때만 DataFrame 으로 바꿉니다.
+    """
+
+    def __init__(self, directory: Path, meta: Dict[str, Any]) -> None:
+        self.directory = directory
+        self.meta = meta
+        self.rows: int = meta['rows']
+        self.columns: List[str] = [column['name'] for column in meta['columns']]
+        self.codes: Dict[str, np.ndarray] = {}
+        self.categories: Dict[str, np.ndarray] = {}
+        self.values: Dict[str, np.ndarray] = {}
+        self.ip_ints: Dict[str, np.ndarray] = {}
+
+        for number, column in enumerate(meta['columns']):
+            name = column['name']
+            if column['kind'] == 'category':
+                self.codes[name] = np.load(directory / f"{number}.codes.npy", mmap_mode='r')
+                with open(directory / f"{number}.categories.json", 'r', encoding='utf-8') as file:
+                    self.categories[name] = np.asarray(json.load(file), dtype=object)
+            else:
+                self.values[name] = np.load(directory / f"{number}.values.npy", mmap_mode='r')
+            if column.get('ip'):
+                self.ip_ints[name] = np.load(directory / f"{number}.ipint.npy", mmap_mode='r')
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str) -> np.ndarray:
+        """컬럼을 원래 값의 배열로 반환합니다. 문자열 컬럼은 object 배열입니다."""
+        if name in self.codes:
+            return self.categories[name][self.codes[name]]
+        return np.asarray(self.values[name])
+
+    def frame(self, columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """DataFrame 으로 바꿉니다. 문자열 컬럼은 category dtype 이며, 값은 pd.read_csv(keep_default_na=False) 와 같습니다."""
+        data = {}
+        for name in columns or self.columns:
+            if name in self.codes:
+                data[name] = pd.Categorical.from_codes(
+                    np.asarray(self.codes[name]), categories=pd.Index(self.categories[name], dtype=object)
+                )
+            else:
+                data[name] = np.asarray(self.values[name])
+        return pd.DataFrame(data, index=pd.RangeIndex(self.rows))
+
+
+# ==============================================================================
+# 2. 캐시 생성 / 적재
+# ==============================================================================
+
+def build_cache(source: Path, directory: Path, ip_columns: Sequence[str] = IP_COLUMNS) -> Dict[str, Any]:
+    """CSV 를 한 번 파싱해 컬럼형 캐시를 만듭니다. 임시 디렉터리에 쓴 뒤 교체하므로 중간에 실패해도 캐시가 깨지지 않습니다."""
+    signature = _source_signature(source)
+    frame = pd.read_csv(source, keep_default_na=False)
+
+    temporary = directory.with_name(f"{directory.name}.tmp-{os.getpid()}")
+    shutil.rmtree(temporary, ignore_errors=True)
+    temporary.mkdir(parents=True)
+
+    columns = []
+    for number, name in enumerate(frame.columns):
+        series = frame[name]
+        column: Dict[str, Any] = {'name': name}
+        if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+            column['kind'] = 'values'
+            np.save(temporary / f"{number}.values.npy", series.to_numpy())
+        else:
+            column['kind'] = 'category'
+            codes, uniques = pd.factorize(series.to_numpy(dtype=object))
+            np.save(temporary / f"{number}.codes.npy", codes.astype(np.int32))
+            with open(temporary / f"{number}.categories.json", 'w', encoding='utf-8') as file:
+                json.dump([str(value) for value in uniques], file, ensure_ascii=False)
+            if name in ip_columns:
+                # 고유 IP 마다 한 번만 변환해 행 전체로 펼칩니다.
+                unique_ints = np.fromiter(
+                    (-1 if value is None else value for value in map(ip_to_int, uniques)),
+                    dtype=np.int64, count=len(uniques)
+                )
+                column['ip'] = True
+                np.save(temporary / f"{number}.ipint.npy", unique_ints[codes])
+        columns.append(column)
+
+    meta = {'version': CACHE_FORMAT_VERSION, **signature, 'rows': len(frame), 'columns': columns}
+    with open(temporary / 'meta.json', 'w', encoding='utf-8') as file:
+        json.dump(meta, file, ensure_ascii=False)
+
+    shutil.rmtree(directory, ignore_errors=True)
+    os.replace(temporary, directory)
+    return meta
+
+
+def _read_meta(directory: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with open(directory / 'meta.json', 'r', encoding='utf-8') as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def load_dataset(
+        source: Path,
+        cache_dir: Path = DATASET_CACHE_DIR,
+        ip_columns: Sequence[str] = IP_COLUMNS,
+        rebuild: bool = False
+) -> ColumnarDataset:
+    """
+    CSV 의 컬럼형 캐시를 메모리 매핑해 반환합니다.
+    캐시가 없거나 원본의 크기/mtime 또는 캐시 형식이 달라졌으면 먼저 다시 만듭니다.
+    """
+    source = Path(source).resolve()
+    directory = cache_path_for(source, cache_dir)
+    signature = _source_signature(source)
+    meta = None if rebuild else _read_meta(directory)
+    if meta is None or meta.get('version') != CACHE_FORMAT_VERSION or \
+            any(meta.get(key) != value for key, value in signature.items()):
+        meta = build_cache(source, directory, ip_columns)
+    return ColumnarDataset(directory, meta)
+
+
+def read_csv_cached(source: Path, cache_dir: Path = DATASET_CACHE_DIR) -> pd.DataFrame:
+    """pd.read_csv(source, keep_default_na=False) 대신 쓰는 캐시 적재 함수. 문자열 컬럼은 category dtype 입니다."""
+    return load_dataset(source, cache_dir).frame()
+
+
+if __name__ == '__main__':
+    from batch_scoring import HEADER_DATA_FILE, HISTORY_DATA_FILE
+
+    parser = argparse.ArgumentParser(description="CSV 데이터셋의 컬럼형 캐시를 만들고 CSV 파싱과 적재 시간을 비교합니다.")
+    parser.add_argument('sources', type=Path, nargs='*', default=[HEADER_DATA_FILE, HISTORY_DATA_FILE], help="CSV 파일")
+    parser.add_argument('--cache-dir', type=Path, default=DATASET_CACHE_DIR, help="캐시 디렉터리")
+    parser.add_argument('--rebuild', action='store_true', help="원본이 바뀌지 않았어도 캐시를 다시 만듦")
+    args = parser.parse_args()
+
+    for path in args.sources:
+        start = time.perf_counter()
+        load_dataset(path, args.cache_dir, rebuild=args.rebuild)
+        prepare_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        csv_frame = pd.read_csv(path, keep_default_na=False)
+        csv_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        cached_frame = read_csv_cached(path, args.cache_dir)
+        cached_time = time.perf_counter() - start
+
+        same = all(
+            np.array_equal(csv_frame[name].to_numpy(dtype=object), cached_frame[name].to_numpy(dtype=object))
+            for name in csv_frame.columns
+        ) and list(csv_frame.columns) == list(cached_frame.columns)
+        print(f"{path.name}: {len(cached_frame)}행 | 준비 {prepare_time * 1000:.1f} ms | "
+              f"read_csv {csv_time * 1000:.1f} ms | 캐시 적재 {cached_time * 1000:.1f} ms | "
+              f"{'값 일치' if same else '값 불일치'}")
@@ -0,0 +1,376 @@
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+from array import array
+from datetime import datetime
+from pathlib import Path
+import argparse
+import csv
+import sys
+import threading
+import time
+import tracemalloc
+
+from scoring import calculate_login_score_breakdown, ip_to_int
+
+# ==============================================================================
+# 1. 심볼 테이블
+# ==============================================================================
+# UA, Accept, Language, Referer, Sec-Fetch, 계정 값은 종류가 적고 같은 값이 반복되므로
+# 공용 테이블에 한 번만 저장하고 이벤트에는 작은 정수 코드만 둡니다. 코드 0 은 헤더 없음(None) 입니다.
+
+class SymbolTable:
+    """문자열 <-> 정수 코드 변환표. 같은 값의 코드는 같은 int 객체를 공유하므로 이벤트마다 추가 메모리가 들지 않습니다."""
+
+    __slots__ = ('codes', 'values', 'lock')
+
+    def __init__(self) -> None:
+        self.codes: Dict[str, int] = {}
+        self.values: List[Optional[str]] = [None]
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def intern(self, value: Any) -> int:
+        if value is None:
+            return 0
+        if not isinstance(value, str):
+            value = str(value)
+        code = self.codes.get(value)
+        if code is None:
+            with self.lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = len(self.values)
+                    self.values.append(value)
+                    self.codes[value] = code
+        return code
+
+    def value(self, code: int) -> Optional[str]:
+        return self.values[code]
+
+
+# 필드별 공용 심볼 테이블. 'ip' 는 정수로 바꿀 수 없는 IP 표기("01.2.3.4", IPv6 등) 를 보관합니다.
+SYMBOLS: Dict[str, SymbolTable] = {
+    name: SymbolTable() for name in ('ip', 'user_id', 'user_agent', 'accept', 'accept_language', 'referer', 'sec_fetch')
+}
+USER_IDS = SYMBOLS['user_id']
+USER_AGENTS = SYMBOLS['user_agent']
+ACCEPTS = SYMBOLS['accept']
+LANGUAGES = SYMBOLS['accept_language']
+REFERERS = SYMBOLS['referer']
+SEC_FETCH_VALUES = SYMBOLS['sec_fetch']
+IP_TEXTS = SYMBOLS['ip']
+
+NO_IP = -1  # IP 없음 (None)
+
+
+def encode_ip(ip_address: Any) -> int:
+    """정규 표기 IPv4 는 32비트 정수로, 그 외 표기는 -(심볼 코드 + 1) 로 바꿉니다. None 은 NO_IP."""
+    if ip_address is None:
+        return NO_IP
+    ip_int = ip_to_int(ip_address)
+    if ip_int is not None:
+        return ip_int
+    return -IP_TEXTS.intern(ip_address) - 1
+
+
+def decode_ip(ip: int) -> Optional[str]:
+    if ip >= 0:
+        return f"{ip >> 24}.{(ip >> 16) & 0xFF}.{(ip >> 8) & 0xFF}.{ip & 0xFF}"
+    return IP_TEXTS.value(-ip - 1)
+
+
+# ==============================================================================
+# 2. 로그인 이벤트
+# ==============================================================================
+# 필드 이름(user_agent, sec_fetch_site 등) 은 batch_scoring.LOGIN_COLUMNS 와 같으며, 속성으로 원래 문자열을 돌려줍니다.
+
+class LoginEvent:
+    """
+    로그인 한 건. IP 는 정수, 나머지 헤더와 계정은 SYMBOLS 의 코드로 보관합니다.
+    문자열 dict 한 행보다 수 배 작고, 같은 값의 문자열을 이벤트마다 따로 들고 있지 않습니다.
+    """
+
+    __slots__ = ('ip', 'user_code', 'ua_code', 'accept_code', 'language_code', 'referer_code',
+                 'site_code', 'mode_code', 'dest_code', 'fetch_user_code', 'timestamp')
+
+    def __init__(
+            self,
+            ip_address: Optional[str],
+            user_id: Optional[str],
+            user_agent: Optional[str],
+            accept: Optional[str],
+            accept_language: Optional[str],
+            referer: Optional[str],
+            sec_fetch_site: Optional[str],
+            sec_fetch_mode: Optional[str],
+            sec_fetch_dest: Optional[str],
+            sec_fetch_user: Optional[str],
+            timestamp: float = 0.0
+    ) -> None:
+        self.ip = encode_ip(ip_address)
+        self.user_code = USER_IDS.intern(user_id)
+        self.ua_code = USER_AGENTS.intern(user_agent)
+        self.accept_code = ACCEPTS.intern(accept)
+        self.language_code = LANGUAGES.intern(accept_language)
+        self.referer_code = REFERERS.intern(referer)
+        self.site_code = SEC_FETCH_VALUES.intern(sec_fetch_site)
+        self.mode_code = SEC_FETCH_VALUES.intern(sec_fetch_mode)
+        self.dest_code = SEC_FETCH_VALUES.intern(sec_fetch_dest)
+        self.fetch_user_code = SEC_FETCH_VALUES.intern(sec_fetch_user)
+        self.timestamp = float(timestamp)
+
+    @classmethod
+    def from_codes(cls, codes: Sequence[int], timestamp: float) -> 'LoginEvent':
+        """(ip, user_code, ua_code, ..., fetch_user_code) 코드 열로 이벤트를 복원합니다. LoginEventStore 가 사용합니다."""
+        event = cls.__new__(cls)
+        (event.ip, event.user_code, event.ua_code, event.accept_code, event.language_code, event.referer_code,
+         event.site_code, event.mode_code, event.dest_code, event.fetch_user_code) = codes
+        event.timestamp = timestamp
+        return event
+
+    def codes(self) -> Tuple[int, ...]:
+        return (self.ip, self.user_code, self.ua_code, self.accept_code, self.language_code, self.referer_code,
+                self.site_code, self.mode_code, self.dest_code, self.fetch_user_code)
+
+    # ------------------------------------------------------------------
+    # 원래 값
+
+    @property
+    def ip_address(self) -> Optional[str]:
+        return decode_ip(self.ip)
+
+    @property
+    def user_id(self) -> Optional[str]:
+        return USER_IDS.values[self.user_code]
+
+    @property
+    def user_agent(self) -> Optional[str]:
+        return USER_AGENTS.values[self.ua_code]
+
+    @property
+    def accept(self) -> Optional[str]:
+        return ACCEPTS.values[self.accept_code]
+
+    @property
+    def accept_language(self) -> Optional[str]:
+        return LANGUAGES.values[self.language_code]
+
+    @property
+    def referer(self) -> Optional[str]:
+        return REFERERS.values[self.referer_code]
+
+    @property
+    def sec_fetch_site(self) -> Optional[str]:
+        return SEC_FETCH_VALUES.values[self.site_code]
+
+    @property
+    def sec_fetch_mode(self) -> Optional[str]:
+        return SEC_FETCH_VALUES.values[self.mode_code]
+
+    @property
+    def sec_fetch_dest(self) -> Optional[str]:
+        return SEC_FETCH_VALUES.values[self.dest_code]
+
+    @property
+    def sec_fetch_user(self) -> Optional[str]:
+        return SEC_FETCH_VALUES.values[self.fetch_user_code]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ip': self.ip_address, 'user_id': self.user_id, 'user_agent': self.user_agent, 'accept': self.accept,
+            'accept_language': self.accept_language, 'referer': self.referer,
+            'sec_fetch_site': self.sec_fetch_site, 'sec_fetch_mode': self.sec_fetch_mode,
+            'sec_fetch_dest': self.sec_fetch_dest, 'sec_fetch_user': self.sec_fetch_user,
+            'timestamp': self.timestamp,
+        }
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, LoginEvent):
+            return NotImplemented
+        return self.codes() == other.codes() and self.timestamp == other.timestamp
+
+    def __repr__(self) -> str:
+        return f"LoginEvent({self.user_id!r}, {self.ip_address!r}, {self.timestamp!r})"
+
+    # ------------------------------------------------------------------
+    # 변환
+
+    @classmethod
+    def from_row(cls, row: Mapping[str, Any], timestamp: Optional[float] = None) -> 'LoginEvent':
+        """
+        CSV 한 행(csv.DictReader / DataFrame 레코드) 으로 만듭니다.
+        계정 컬럼은 userid, id, user_id 중 하나이고, sec-fetch-* 표기도 허용합니다. 시각은 timestamp 컬럼(초) 입니다.
+        """
+        def get(name: str) -> Any:
+            value = row.get(name)
+            return row.get(name.replace('_', '-')) if value is None else value
+
+        user_id = next((row[name] for name in ('userid', 'id', 'user_id') if row.get(name) is not None), None)
+        if timestamp is None:
+            timestamp = float(row.get('timestamp') or 0.0)
+        return cls(get('ip'), user_id, get('user_agent'), get('accept'), get('accept_language'), get('referer'),
+                   get('sec_fetch_site'), get('sec_fetch_mode'), get('sec_fetch_dest'), get('sec_fetch_user'), timestamp)
+
+    @classmethod
+    def from_log_record(cls, record: Mapping[str, Any]) -> 'LoginEvent':
+        """risk_score_log 의 JSON 레코드로 만듭니다. 시각은 'YYYY-MM-DD HH:MM:SS' (서버 현지 시각) 입니다."""
+        try:
+            timestamp = datetime.strptime(record.get('timestamp') or '', '%Y-%m-%d %H:%M:%S').timestamp()
+        except (TypeError, ValueError):
+            timestamp = 0.0
+        return cls(record.get('ip'), record.get('user_id', record.get('userid')), record.get('user_agent'),
+                   record.get('accept'), record.get('accept_language'), record.get('referer'),
+                   record.get('sec_fetch_site'), record.get('sec_fetch_mode'), record.get('sec_fetch_dest'),
+                   record.get('sec_fetch_user'), timestamp)
+
+
+def read_csv_events(path: Path) -> Iterator[LoginEvent]:
+    """CSV 를 한 줄씩 읽어 LoginEvent 로 생성합니다 (파일 전체를 올리지 않음)."""
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file):
+            yield LoginEvent.from_row(row)
+
+
+# ==============================================================================
+# 3. 점수 계산
+# ==============================================================================
+
+def event_histories(events: Iterable[LoginEvent]) -> Tuple[List[str], List[str], List[str]]:
+    """과거 이벤트들을 점수 함수의 (IP, UA, Language) 기록 리스트로 바꿉니다."""
+    ips: List[str] = []
+    uas: List[str] = []
+    languages: List[str] = []
+    for event in events:
+        ips.append(event.ip_address)
+        uas.append(event.user_agent)
+        languages.append(event.accept_language)
+    return ips, uas, languages
+
+
+def calculate_event_score_breakdown(
+        event: LoginEvent,
+        user_ip_history: List[str],
+        user_ua_history: List[str],
+        user_language_history: List[str],
+        velocity_score: int = 0,
+        campaign_score: int = 0,
+        breach_score: int = 0
+) -> Dict[str, int]:
+    """calculate_login_score_breakdown 의 헤더 인자 9개 대신 LoginEvent 를 받습니다. 결과는 같습니다."""
+    return calculate_login_score_breakdown(
+        event.ip_address, event.user_agent, event.accept, event.accept_language, event.referer,
+        event.sec_fetch_site, event.sec_fetch_mode, event.sec_fetch_dest, event.sec_fetch_user,
+        user_ip_history, user_ua_history, user_language_history, velocity_score, campaign_score, breach_score
+    )
+
+
+# ==============================================================================
+# 4. 배열 기반 이벤트 저장소
+# ==============================================================================
+# 이벤트 객체도 만들지 않고 필드별 array 에 코드만 보관하는 고정 용량 링 버퍼입니다 (이벤트당 약 52바이트).
+# 최근 이벤트 수백만 건을 기록/속도 검사용으로 유지할 때 사용합니다.
+EVENT_CODE_TYPES: Sequence[str] = ('q', 'I', 'I', 'I', 'I', 'I', 'I', 'I', 'I', 'I')
+
+
+class LoginEventStore:
+    """최근 capacity 건의 LoginEvent 를 열 단위 array 로 보관합니다. 가득 차면 가장 오래된 이벤트부터 덮어씁니다."""
+
+    def __init__(self, capacity: int) -> None:
+        self.capacity = capacity
+        self.columns = [array(typecode, bytes(array(typecode).itemsize * capacity)) for typecode in EVENT_CODE_TYPES]
+        self.timestamps = array('d', bytes(8 * capacity))
+        self.start = 0
+        self.size = 0
+        self.lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def append(self, event: LoginEvent) -> None:
+        with self.lock:
+            if self.size < self.capacity:
+                slot = (self.start + self.size) % self.capacity
+                self.size += 1
+            else:
+                slot = self.start
+                self.start = (self.start + 1) % self.capacity
+            for column, code in zip(self.columns, event.codes()):
+                column[slot] = code
+            self.timestamps[slot] = event.timestamp
+
+    def __getitem__(self, index: int) -> LoginEvent:
+        """index 0 이 가장 오래된 이벤트, -1 이 가장 최근 이벤트입니다."""
+        if index < 0:
+            index += self.size
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        slot = (self.start + index) % self.capacity
+        return LoginEvent.from_codes([column[slot] for column in self.columns], self.timestamps[slot])
+
+    def __iter__(self) -> Iterator[LoginEvent]:
+        for index in range(self.size):
+            yield self[index]
+
+    def memory_bytes(self) -> int:
+        return sum(column.itemsize * len(column) for column in self.columns) + 8 * len(self.timestamps)
+
+
+def symbol_memory_bytes() -> int:
+    """공용 심볼 테이블이 보관한 고유 문자열의 대략적인 크기. 이벤트 수와 무관하게 고유값 수에만 비례합니다."""
+    return sum(sys.getsizeof(value) for table in SYMBOLS.values() for value in table.values if value is not None)
+
+
+if __name__ == '__main__':
+    from batch_scoring import HEADER_DATA_FILE, HISTORY_DATA_FILE
+    from login_load_test import load_histories_csv
+
+    parser = argparse.ArgumentParser(description="CSV 로그인 행을 dict / LoginEvent / LoginEventStore 로 보관할 때의 메모리를 비교합니다.")
+    parser.add_argument('rows', type=Path, nargs='?', default=HEADER_DATA_FILE, help="로그인 CSV")
+    parser.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="점수 일치 확인용 과거 로그인 CSV")
+    parser.add_argument('--limit', type=int, default=1_000_000, help="읽을 최대 행 수")
+    args = parser.parse_args()
+
+    def measure(build: Any) -> Tuple[Any, int]:
+        tracemalloc.start()
+        result = build()
+        used = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        return result, used
+
+    def read_rows() -> List[Dict[str, str]]:
+        with open(args.rows, 'r', encoding='utf-8', newline='') as file:
+            return [row for _, row in zip(range(args.limit), csv.DictReader(file))]
+
+    rows, row_bytes = measure(read_rows)
+    events, event_bytes = measure(lambda: [LoginEvent.from_row(row) for row in rows])
+    start = time.perf_counter()
+    for row in rows:
+        LoginEvent.from_row(row)
+    convert_time = time.perf_counter() - start
+
+    def fill_store() -> LoginEventStore:
+        store = LoginEventStore(len(events))
+        for event in events:
+            store.append(event)
+        return store
+
+    store, store_bytes = measure(fill_store)
+    count = max(1, len(rows))
+    print(f"{len(rows):,}행 | 변환 {convert_time / count * 1e6:.2f} us/건 | 공용 심볼 {symbol_memory_bytes() / 1024:,.0f} KiB")
+    print(f"dict 행         {row_bytes / count:8.0f} B/건")
+    print(f"LoginEvent      {event_bytes / count:8.0f} B/건 ({row_bytes / max(1, event_bytes):.1f}배 작음)")
+    print(f"LoginEventStore {store_bytes / count:8.0f} B/건 ({row_bytes / max(1, store_bytes):.1f}배 작음)")
+
+    histories = load_histories_csv(args.history)
+    empty: Tuple[List[str], List[str], List[str]] = ([], [], [])
+    mismatched = 0
+    for row, event, stored in zip(rows, events, store):
+        history = histories.get(row.get('userid'), empty)
+        expected = calculate_login_score_breakdown(
+            row.get('ip'), row.get('user_agent'), row.get('accept'), row.get('accept_language'), row.get('referer'),
+            row.get('sec-fetch-site'), row.get('sec-fetch-mode'), row.get('sec-fetch-dest'), row.get('sec-fetch-user'),
+            *history
+        )
+        mismatched += expected != calculate_event_score_breakdown(event, *history) or stored != event
+    print(f"점수 불일치 {mismatched}건")
@@ -0,0 +1,309 @@
+from typing import Any, Dict, Iterator, List, Mapping, Optional, Tuple
+from collections import Counter
+from http.client import HTTPConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlencode, urlparse
+import argparse
+import json
+import math
+import threading
+import time
+
+from batch_scoring import COLUMN_ALIASES, HEADER_DATA_FILE, HISTORY_DATA_FILE, build_user_histories
+from breach_filter import BreachFilter, calculate_breach_score
+from dataset_cache import read_csv_cached
+from campaign import CampaignDetector
+from scoring import calculate_login_score_breakdown, determine_security_action
+from shadow_scoring import RuleSet, ShadowScorer, load_rules, print_stats
+from velocity import VelocityTracker
+
+# ==============================================================================
+# 1. 로컬 대체 로그인 서버
+# ==============================================================================
+# backend/login.php 의 응답 형식을 흉내 내되, DB 대신 메모리의 사용자 기록과 scoring.py 로 판정합니다.
+# 비밀번호는 검증하지 않으므로 점수 판정 경로의 지연시간만 측정합니다.
+Histories = Mapping[str, Tuple[List[str], List[str], List[str]]]
+EMPTY_HISTORY: Tuple[List[str], List[str], List[str]] = ([], [], [])
+
+# 요청 헤더 -> scoring.py 인자 (attack_script.py 는 클라이언트 IP 를 X-Forwarded-For 로 보냅니다)
+REQUEST_HEADERS: Dict[str, str] = {
+    'user_agent': 'User-Agent',
+    'accept': 'Accept',
+    'accept_language': 'Accept-Language',
+    'referer': 'Referer',
+    'sec_fetch_site': 'Sec-Fetch-Site',
+    'sec_fetch_mode': 'Sec-Fetch-Mode',
+    'sec_fetch_dest': 'Sec-Fetch-Dest',
+    'sec_fetch_user': 'Sec-Fetch-User',
+}
+
+
+def load_histories_csv(path: Path, user_column: str = 'id') -> Dict[str, Tuple[List[str], List[str], List[str]]]:
+    """사용자별 과거 로그인 기록 CSV 를 컬럼형 캐시로 읽어 (IP, UA, Language) 기록 리스트로 묶습니다."""
+    return build_user_histories(read_csv_cached(path), user_column=user_column)
+
+
+class StandInLoginHandler(BaseHTTPRequestHandler):
+    """POST /login.php 를 받아 점수와 보안 조치를 JSON 으로 응답합니다."""
+
+    protocol_version = 'HTTP/1.1'  # keep-alive 로 연결 재사용
+    disable_nagle_algorithm = True  # 헤더/본문 분할 전송 시 Nagle + 지연 ACK 로 40ms 씩 늘어나는 것 방지
+    histories: Histories = {}
+    velocity: VelocityTracker = VelocityTracker()
+    campaign: CampaignDetector = CampaignDetector()
+    breach: Optional[BreachFilter] = None
+    shadow: Optional[ShadowScorer] = None  # 있으면 후보 규칙도 함께 평가 (집행은 현재 규칙)
+
+    def do_GET(self) -> None:
+        """GET /shadow: 섀도 점수기의 판정 차이 통계."""
+        if urlparse(self.path).path == '/shadow' and self.shadow is not None:
+            self._reply(self.shadow.stats())
+        else:
+            self._reply({"success": False, "message": "not found"}, status=404)
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get('Content-Length') or 0)
+        form = parse_qs(self.rfile.read(length).decode('utf-8'))
+        user_id = (form.get('loginId') or [''])[0]
+        password = (form.get('password') or [''])[0]
+        if not user_id or not password:
+            self._reply({"success": False, "message": "아이디와 비밀번호를 입력해주세요."})
+            return
+
+        forwarded = self.headers.get('X-Forwarded-For')
+        new_ip = forwarded.split(',')[0].strip() if forwarded else self.client_address[0]
+        headers = {name: self.headers.get(header, '') for name, header in REQUEST_HEADERS.items()}
+        ip_history, ua_history, language_history = self.histories.get(user_id, EMPTY_HISTORY)
+
+        start = time.perf_counter()
+        velocity_score, _ = self.velocity.observe(new_ip, user_id)
+        campaign_score, _ = self.campaign.observe(
+            new_ip, user_id, headers['user_agent'], headers['accept'], headers['accept_language'],
+            headers['sec_fetch_site'], headers['sec_fetch_mode'], headers['sec_fetch_dest'], headers['sec_fetch_user']
+        )
+        breach_score = calculate_breach_score(self.breach, user_id, password)
+        login_args = (
+            new_ip, headers['user_agent'], headers['accept'], headers['accept_language'], headers['referer'],
+            headers['sec_fetch_site'], headers['sec_fetch_mode'], headers['sec_fetch_dest'], headers['sec_fetch_user'],
+            ip_history, ua_history, language_history, velocity_score, campaign_score, breach_score
+        )
+        if self.shadow is None:
+            scores = calculate_login_score_breakdown(*login_args)
+            action = determine_security_action(scores['total_score'])
+        else:
+            scores = self.shadow.score_breakdown(*login_args, event={'userid': user_id, 'ip': new_ip})
+            action = self.shadow.determine_action(scores['total_score'])
+        scoring_micros = (time.perf_counter() - start) * 1e6
+
+        response: Dict[str, Any] = {
+            "success": action == "ALLOW_LOGIN",
+            "riskScore": scores['total_score'],
+            "action": action,
+            "scores": scores,
+            "scoringMicros": round(scoring_micros, 2),
+        }
+        if action == "BLOCK_AND_REDIRECT_MAIN":
+            response.update(blocked=True, message="보안 정책에 의해 로그인이 차단되었습니다.")
+        elif action == "REQUIRE_CAPTCHA":
+            response.update(needCaptcha=True, message="의심스러운 활동이 감지되었습니다. 캡챠 인증을 완료해주세요.")
+        self._reply(response)
+
+    def _reply(self, payload: Dict[str, Any], status: int = 200) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # 요청마다 콘솔 출력하면 측정이 왜곡되므로 끔
+
+
+def make_server(
+        host: str,
+        port: int,
+        histories: Histories,
+        breach: Optional[BreachFilter] = None,
+        shadow: Optional[ShadowScorer] = None
+) -> ThreadingHTTPServer:
+    """
+    대체 로그인 서버를 만듭니다. port=0 이면 빈 포트를 자동으로 고릅니다. breach 가 없으면 유출 점수는 0점입니다.
+    shadow 가 있으면 그 점수기로 현재/후보 규칙을 함께 평가하고, GET /shadow 로 차이 통계를 제공합니다.
+    """
+    handler = type('BoundStandInLoginHandler', (StandInLoginHandler,),
+                   {'histories': histories, 'velocity': VelocityTracker(), 'campaign': CampaignDetector(),
+                    'breach': breach, 'shadow': shadow})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+# ==============================================================================
+# 2. 재생 부하 드라이버
+# ==============================================================================
+
+def read_replay_rows(path: Path) -> List[Dict[str, str]]:
+    """헤더 데이터 CSV 를 컬럼형 캐시로 읽어 표준 컬럼 이름으로 바꾼 행 리스트를 반환합니다."""
+    return read_csv_cached(path).rename(columns=COLUMN_ALIASES).astype(object).to_dict('records')
+
+
+def _cell_text(value: Any) -> str:
+    """CSV 칸 값을 요청에 넣을 문자열로 바꿉니다. 빈 칸(None, pandas 가 읽은 NaN)은 빈 문자열입니다."""
+    if isinstance(value, str):
+        return value
+    if value is None or (isinstance(value, float) and math.isnan(value)):
+        return ''
+    return str(value)
+
+
+def build_request(row: Mapping[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+    """CSV 한 행을 login.php 폼 본문과 요청 헤더로 바꿉니다. 빈 칸인 헤더는 보내지 않습니다."""
+    body = urlencode({'loginId': _cell_text(row.get('userid')),
+                      'password': _cell_text(row.get('password'))}).encode('utf-8')
+    headers = {'Content-Type': 'application/x-www-form-urlencoded', 'X-Forwarded-For': _cell_text(row.get('ip'))}
+    for name, header in REQUEST_HEADERS.items():
+        value = _cell_text(row.get(name))
+        if value:
+            headers[header] = value
+    return body, headers
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """정렬된 값에서 q 백분위수(최근접 순위)를 구합니다."""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(q / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+
+def replay(
+        url: str,
+        rows: List[Dict[str, str]],
+        concurrency: int = 8,
+        rate: float = 0.0,
+        total: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    행을 순서대로(부족하면 반복) total 건 전송합니다. 스레드마다 keep-alive 연결을 하나씩 재사용하며,
+    rate > 0 이면 i 번째 요청을 시작 후 i / rate 초에 보내 목표 초당 요청 수를 유지합니다.
+    """
+    target = urlparse(url)
+    total = total or len(rows)
+    lock = threading.Lock()
+    next_index = [0]
+    scoring_latencies: List[float] = []
+    round_trips: List[float] = []
+    actions: Counter = Counter()
+    errors = [0]
+
+    def claim() -> Iterator[int]:
+        while True:
+            with lock:
+                index = next_index[0]
+                if index >= total:
+                    return
+                next_index[0] += 1
+            yield index
+
+    def worker() -> None:
+        connection = HTTPConnection(target.hostname, target.port or 80, timeout=10)
+        for index in claim():
+            if rate > 0:
+                delay = started + index / rate - time.perf_counter()
+                if delay > 0:
+                    time.sleep(delay)
+            body, headers = build_request(rows[index % len(rows)])
+            sent = time.perf_counter()
+            try:
+                connection.request('POST', target.path or '/', body=body, headers=headers)
+                payload = json.loads(connection.getresponse().read())
+            except (OSError, ValueError):
+                connection.close()
+                with lock:
+                    errors[0] += 1
+                continue
+            elapsed = time.perf_counter() - sent
+            with lock:
+                round_trips.append(elapsed * 1e6)
+                scoring_latencies.append(payload.get('scoringMicros', 0.0))
+                actions[payload.get('action', 'UNKNOWN')] += 1
+        connection.close()
+
+    started = time.perf_counter()
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - started
+
+    scoring_latencies.sort()
+    round_trips.sort()
+    return {
+        'requests': len(round_trips),
+        'errors': errors[0],
+        'seconds': duration,
+        'throughput': len(round_trips) / duration if duration else 0.0,
+        'scoring_us': {q: percentile(scoring_latencies, q) for q in (50, 95, 99)},
+        'round_trip_us': {q: percentile(round_trips, q) for q in (50, 95, 99)},
+        'actions': dict(actions),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"요청 {report['requests']}건 (오류 {report['errors']}건), {report['seconds']:.2f}s, "
+          f"{report['throughput']:,.0f} req/s")
+    for label, key in (('점수 계산', 'scoring_us'), ('왕복', 'round_trip_us')):
+        latencies = report[key]
+        print(f"{label} 지연(us): p50={latencies[50]:.1f} p95={latencies[95]:.1f} p99={latencies[99]:.1f}")
+    for action, count in sorted(report['actions'].items(), key=lambda item: -item[1]):
+        print(f"  {action:<25} {count:>8} ({count / max(1, report['requests']):.1%})")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="로컬 대체 로그인 서버와 동시 재생 부하 드라이버")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+
+    serve = subcommands.add_parser('serve', help="대체 로그인 서버만 실행")
+    serve.add_argument('--port', type=int, default=8080)
+
+    for command in (subcommands.add_parser('replay', help="실행 중인 서버로 재생"),
+                    subcommands.add_parser('bench', help="서버를 띄우고 바로 재생")):
+        command.add_argument('--rows', type=Path, default=HEADER_DATA_FILE, help="재생할 헤더 데이터 CSV")
+        command.add_argument('--concurrency', type=int, default=8, help="동시 연결 수")
+        command.add_argument('--rate', type=float, default=0.0, help="목표 초당 요청 수 (0 = 제한 없음)")
+        command.add_argument('--total', type=int, help="보낼 요청 수 (기본: CSV 행 수)")
+    subcommands.choices['replay'].add_argument('--url', default='http://127.0.0.1:8080/login.php')
+
+    for command in (serve, subcommands.choices['bench']):
+        command.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="사용자별 과거 로그인 CSV")
+        command.add_argument('--host', default='127.0.0.1')
+        command.add_argument('--breach-filter', type=Path, help="유출 자격 증명 필터 파일 (breach_filter.py build)")
+        command.add_argument('--shadow-rules', type=Path, help="섀도 모드로 함께 평가할 후보 규칙 JSON (shadow_scoring.py)")
+    args = parser.parse_args()
+
+    breach = BreachFilter(args.breach_filter) if getattr(args, 'breach_filter', None) else None
+    shadow = None
+    if getattr(args, 'shadow_rules', None):
+        try:
+            shadow = ShadowScorer(candidate=RuleSet(load_rules(args.shadow_rules), name=str(args.shadow_rules)))
+        except (OSError, ValueError) as error:
+            parser.error(f"--shadow-rules: {error}")
+    if args.command == 'serve':
+        server = make_server(args.host, args.port, load_histories_csv(args.history), breach, shadow)
+        print(f"대체 로그인 서버: http://{args.host}:{server.server_port}/login.php")
+        server.serve_forever()
+    elif args.command == 'replay':
+        print_report(replay(args.url, read_replay_rows(args.rows), args.concurrency, args.rate, args.total))
+    else:
+        server = make_server(args.host, 0, load_histories_csv(args.history), breach, shadow)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        url = f"http://{args.host}:{server.server_port}/login.php"
+        try:
+            print_report(replay(url, read_replay_rows(args.rows), args.concurrency, args.rate, args.total))
+            if shadow is not None:
+                print_stats(shadow.stats())
+        finally:
+            server.shutdown()
@@ -0,0 +1,172 @@
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import argparse
+import os
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+
+from batch_scoring import (
+    HEADER_DATA_FILE,
+    HISTORY_DATA_FILE,
+    LOGIN_COLUMNS,
+    SCORE_COLUMNS,
+    build_user_histories,
+    normalize_login_columns,
+    score_login_batch,
+)
+from dataset_cache import read_csv_cached
+
+# ==============================================================================
+# 1. 사용자 기준 샤딩
+# ==============================================================================
+# 한 사용자의 점수는 그 사용자의 기록에만 의존하므로, 사용자 ID 로 나눈 샤드는 서로 독립입니다.
+# 각 작업 프로세스에는 샤드에 속한 행의 헤더 컬럼과 그 사용자들의 기록만 전달합니다.
+Histories = Mapping[str, Tuple[List[str], List[str], List[str]]]
+EMPTY_HISTORY: Tuple[List[str], List[str], List[str]] = ([], [], [])
+
+
+def shard_of(user_id: Any, shards: int) -> int:
+    """사용자 ID 를 샤드 번호로 바꿉니다. (프로세스마다 달라지는 hash() 대신 CRC32 사용)"""
+    return zlib.crc32(str(user_id).encode('utf-8')) % shards
+
+
+def build_shards(
+        logins: pd.DataFrame,
+        histories: Histories,
+        shards: int,
+        user_column: str = 'userid'
+) -> List[Dict[str, Any]]:
+    """로그인 표를 사용자 기준 샤드로 나눕니다. 각 샤드는 원래 행 번호, 헤더 컬럼, 사용자별 기록을 가집니다."""
+    logins = normalize_login_columns(logins)
+    users = logins[user_column].to_numpy(dtype=object)
+    shard_ids = np.fromiter((shard_of(user, shards) for user in users), dtype=np.int64, count=len(users))
+    columns = {name: logins[name].to_numpy(dtype=object) for name in LOGIN_COLUMNS}
+
+    payloads = []
+    for shard in range(shards):
+        rows = np.flatnonzero(shard_ids == shard)
+        if not len(rows):
+            continue
+        shard_users = users[rows].tolist()
+        payloads.append({
+            'rows': rows,
+            'users': shard_users,
+            'columns': {name: values[rows].tolist() for name, values in columns.items()},
+            'histories': {user: histories[user] for user in set(shard_users) if user in histories},
+        })
+    return payloads
+
+
+def score_shard(payload: Dict[str, Any]) -> Tuple[np.ndarray, Dict[str, np.ndarray]]:
+    """작업 프로세스에서 샤드 하나를 배치 점수화합니다."""
+    per_row = [payload['histories'].get(user, EMPTY_HISTORY) for user in payload['users']]
+    scores = score_login_batch(
+        payload['columns'],
+        [history[0] for history in per_row],
+        [history[1] for history in per_row],
+        [history[2] for history in per_row],
+    )
+    return payload['rows'], scores
+
+
+# ==============================================================================
+# 2. 병렬 점수화
+# ==============================================================================
+
+def parallel_score(
+        logins: pd.DataFrame,
+        histories: Histories,
+        workers: int,
+        shards: Optional[int] = None,
+        user_column: str = 'userid'
+) -> Dict[str, np.ndarray]:
+    """
+    사용자 기준 샤드를 프로세스 풀에서 병렬로 점수화하고, 원래 행 순서대로 합친 결과를 반환합니다.
+    shards 를 생략하면 작업 프로세스 수의 4배로 나누어 부하를 고르게 분산합니다.
+    workers=1 이면 프로세스 풀 없이 현재 프로세스에서 처리합니다.
+    """
+    shards = shards or max(1, workers * 4)
+    payloads = build_shards(logins, histories, shards, user_column)
+    merged = {name: np.zeros(len(logins), dtype=np.int64) for name in SCORE_COLUMNS + ['total_score']}
+
+    if workers <= 1:
+        results = map(score_shard, payloads)
+    else:
+        executor = ProcessPoolExecutor(max_workers=workers)
+        results = executor.map(score_shard, payloads)
+
+    try:
+        for rows, scores in results:
+            for name, values in scores.items():
+                merged[name][rows] = values
+    finally:
+        if workers > 1:
+            executor.shutdown()
+    return merged
+
+
+def load_dataset(header_file: Path, history_file: Path, replicate: int = 1) -> Tuple[pd.DataFrame, Dict]:
+    """로그인 헤더 CSV 와 기록 CSV 를 컬럼형 캐시로 읽습니다. replicate > 1 이면 사용자 ID 를 바꿔 데이터를 복제합니다."""
+    logins = read_csv_cached(header_file)
+    history_frame = read_csv_cached(history_file)
+    if replicate > 1:
+        copies, history_copies = [], []
+        for copy in range(replicate):
+            copies.append(logins.assign(userid=logins['userid'].astype(object) + f"#{copy}"))
+            history_copies.append(history_frame.assign(id=history_frame['id'].astype(object) + f"#{copy}"))
+        logins = pd.concat(copies, ignore_index=True)
+        history_frame = pd.concat(history_copies, ignore_index=True)
+    return logins, build_user_histories(history_frame, user_column='id')
+
+
+def run_scaling_benchmark(logins: pd.DataFrame, histories: Histories, worker_counts: Sequence[int]) -> List[Dict[str, float]]:
+    """작업 프로세스 수별 처리량을 측정하고 결과가 단일 프로세스와 같은지 확인합니다."""
+    reports = []
+    baseline = None
+    for workers in worker_counts:
+        start = time.perf_counter()
+        result = parallel_score(logins, histories, workers)
+        elapsed = time.perf_counter() - start
+        if baseline is None:
+            baseline = (elapsed, result['total_score'])
+        elif not np.array_equal(baseline[1], result['total_score']):
+            raise AssertionError(f"workers={workers} 결과가 단일 프로세스 결과와 다릅니다.")
+        reports.append({
+            'workers': workers,
+            'seconds': elapsed,
+            'rows_per_second': len(logins) / elapsed,
+            'speedup': baseline[0] / elapsed,
+        })
+    return reports
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="사용자 기준으로 샤딩해 여러 코어에서 로그인 데이터를 다시 점수화합니다.")
+    parser.add_argument('--headers', type=Path, default=HEADER_DATA_FILE, help="새 로그인 헤더 CSV")
+    parser.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="사용자별 과거 로그인 CSV")
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help="작업 프로세스 수")
+    parser.add_argument('--shards', type=int, help="샤드 수 (기본: 작업 프로세스 수 x 4)")
+    parser.add_argument('--output', type=Path, help="점수 결과 CSV 저장 경로")
+    parser.add_argument('--benchmark', action='store_true', help="작업 프로세스 1개부터 --workers 까지 처리량 비교")
+    parser.add_argument('--replicate', type=int, default=1, help="벤치마크용 데이터 복제 배수")
+    args = parser.parse_args()
+
+    logins, histories = load_dataset(args.headers, args.history, args.replicate)
+
+    if args.benchmark:
+        counts = sorted({1, *[2 ** power for power in range(1, args.workers.bit_length())], args.workers})
+        for report in run_scaling_benchmark(logins, histories, counts):
+            print(f"workers={report['workers']:>3} | {report['seconds']:.2f}s | "
+                  f"{report['rows_per_second']:,.0f} rows/s | x{report['speedup']:.2f}")
+    else:
+        start = time.perf_counter()
+        scores = parallel_score(logins, histories, args.workers, args.shards)
+        elapsed = time.perf_counter() - start
+        print(f"{len(logins)}행 점수화: {elapsed:.2f}s (workers={args.workers})")
+        if args.output:
+            result = pd.DataFrame({'userid': logins['userid'], **scores})
+            result.to_csv(args.output, index=False)
@@ -0,0 +1,222 @@
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+from pathlib import Path
+import argparse
+import json
+import os
+import sys
+import time
+
+import rule_table
+from scoring import (
+    SCORE_COMPONENTS,
+    calculate_login_score_breakdown,
+    determine_security_action,
+)
+
+# ==============================================================================
+# 1. 로그 읽기
+# ==============================================================================
+# risk_score_log.txt 한 줄 형식: "YYYY-MM-DD HH:MM:SS {JSON}"
+LOG_FILE = Path(__file__).resolve().parent.parent / '임시' / 'risk_score_log.txt'
+
+
+def parse_log_line(line: str) -> Optional[Dict[str, Any]]:
+    """로그 한 줄에서 JSON 레코드를 꺼냅니다. 형식이 깨진 줄은 None 을 반환합니다."""
+    brace = line.find('{')
+    if brace < 0:
+        return None
+    try:
+        record = json.loads(line[brace:])
+    except ValueError:
+        return None
+    return record if isinstance(record, dict) else None
+
+
+def read_log_records(
+        path: Path,
+        offset: int = 0,
+        follow: bool = False,
+        poll_interval: float = 1.0
+) -> Iterator[Tuple[int, Dict[str, Any]]]:
+    """
+    로그 파일을 offset 바이트부터 한 줄씩 읽어 (다음 줄의 바이트 오프셋, 레코드) 를 생성합니다.
+    파일 전체를 메모리에 올리지 않으며, 아직 줄바꿈이 쓰이지 않은 마지막 줄은 완성될 때까지 읽지 않습니다.
+    follow=True 이면 파일 끝에서 멈추지 않고 새 줄이 추가되기를 기다립니다 (tail -f).
+    파일이 오프셋보다 작아지거나 다른 파일로 바뀌면(로그 교체) 처음부터 다시 읽습니다.
+    """
+    inode = None
+    while True:
+        with open(path, 'rb') as file:
+            status = os.fstat(file.fileno())
+            if offset > status.st_size or (inode is not None and status.st_ino != inode):
+                offset = 0
+            inode = status.st_ino
+            file.seek(offset)
+            for line in iter(file.readline, b''):
+                # 줄바꿈이 없는 마지막 줄은 아직 쓰는 중일 수 있으므로 다음에 다시 읽음
+                if not line.endswith(b'\n'):
+                    break
+                offset += len(line)
+                record = parse_log_line(line.decode('utf-8', errors='replace'))
+                if record is not None:
+                    yield offset, record
+
+        if not follow:
+            return
+        time.sleep(poll_interval)
+
+
+# ==============================================================================
+# 2. 재점수화
+# ==============================================================================
+
+def rescore_record(record: Dict[str, Any]) -> Dict[str, int]:
+    """로그 레코드의 헤더와 기록으로 현재 규칙의 항목별 점수를 다시 계산합니다."""
+    return calculate_login_score_breakdown(
+        record.get('ip'),
+        record.get('user_agent'),
+        record.get('accept'),
+        record.get('accept_language'),
+        record.get('referer'),
+        record.get('sec_fetch_site'),
+        record.get('sec_fetch_mode'),
+        record.get('sec_fetch_dest'),
+        record.get('sec_fetch_user'),
+        record.get('ip_history') or [],
+        record.get('ua_history') or [],
+        record.get('lang_history') or [],
+    )
+
+
+def baseline_rules(path: Optional[Path] = None) -> rule_table.CompiledRules:
+    """로그를 기록할 때의 규칙. path 가 없으면 저장소의 기본 규칙(scoring_rules.json)입니다."""
+    if path is None:
+        return rule_table.compile_rules(rule_table.DEFAULT_RULES, name=str(rule_table.RULES_FILE))
+    return rule_table.compile_rules(rule_table.load_rules(path), name=str(path))
+
+
+def find_changed_records(
+        records: Iterable[Tuple[int, Dict[str, Any]]],
+        old_rules: Optional[rule_table.CompiledRules] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    레코드를 다시 점수화해 총점 또는 determine_security_action 판정이 달라진 것만 생성합니다.
+    출력에는 기록 당시/현재 점수와 판정, 그리고 달라진 항목 이름이 들어갑니다.
+    기록 당시 판정은 레코드에 action 이 있으면 그 값을, 없으면 기록 당시 총점을 old_rules(기본: baseline_rules())
+    의 CAPTCHA/차단 기준으로 판정한 값이므로, 기준 점수만 바꾼 규칙 변경도 판정 변경으로 드러납니다.
+    """
+    old_rules = old_rules if old_rules is not None else baseline_rules()
+    for offset, record in records:
+        new_scores = rescore_record(record)
+        old_total = record.get('total_score')
+        old_action = record.get('action')
+        if not isinstance(old_action, str):
+            old_action = old_rules.determine_action(old_total) if isinstance(old_total, (int, float)) else None
+        new_action = determine_security_action(new_scores['total_score'])
+        if old_total == new_scores['total_score'] and old_action == new_action:
+            continue
+
+        yield {
+            'offset': offset,
+            'timestamp': record.get('timestamp'),
+            'ip': record.get('ip'),
+            'old_total_score': old_total,
+            'new_total_score': new_scores['total_score'],
+            'old_action': old_action,
+            'new_action': new_action,
+            'changed_components': [name for name in SCORE_COMPONENTS if record.get(name) != new_scores[name]],
+            'new_scores': new_scores,
+        }
+
+
+# ==============================================================================
+# 3. 체크포인트
+# ==============================================================================
+
+class Checkpoint:
+    """재시작 시 이어 읽을 수 있도록 로그 파일의 바이트 오프셋을 JSON 파일에 저장합니다."""
+
+    def __init__(self, path: Path, log_path: Path) -> None:
+        self.path = path
+        self.log_path = str(Path(log_path).resolve())
+
+    def load(self) -> int:
+        """저장된 오프셋을 반환합니다. 체크포인트가 없거나 다른 로그 파일의 것이면 0."""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return 0
+        if data.get('log') != self.log_path:
+            return 0
+        return int(data.get('offset', 0))
+
+    def save(self, offset: int) -> None:
+        """임시 파일에 쓴 뒤 교체하여, 중간에 종료돼도 체크포인트가 깨지지 않게 합니다."""
+        temporary = Path(f"{self.path}.tmp")
+        with open(temporary, 'w', encoding='utf-8') as file:
+            json.dump({'log': self.log_path, 'offset': offset}, file)
+        os.replace(temporary, self.path)
+
+
+def stream_rescore(
+        log_path: Path,
+        checkpoint: Optional[Checkpoint] = None,
+        follow: bool = False,
+        checkpoint_every: int = 1000,
+        poll_interval: float = 1.0,
+        old_rules: Optional[rule_table.CompiledRules] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    로그를 체크포인트 위치부터 읽어 판정이 달라진 레코드를 생성하고, checkpoint_every 줄마다 오프셋을 저장합니다.
+    저장하는 오프셋은 처리를 끝낸 레코드까지입니다. 생성한 변경 레코드를 호출자가 받아 다음 레코드를 요청해야
+    끝난 것으로 보므로, 중간에 멈추면 마지막으로 넘긴 레코드는 재시작 때 다시 처리됩니다.
+    """
+    committed = checkpoint.load() if checkpoint else 0
+    processed = 0
+
+    def tracked() -> Iterator[Tuple[int, Dict[str, Any]]]:
+        nonlocal committed, processed
+        for offset, record in read_log_records(log_path, committed, follow, poll_interval):
+            yield offset, record
+            # find_changed_records 가 다음 레코드를 요청했으므로 이 레코드(와 그 변경 레코드)는 처리가 끝남
+            committed = offset
+            processed += 1
+            if checkpoint and processed % checkpoint_every == 0:
+                checkpoint.save(committed)
+
+    try:
+        yield from find_changed_records(tracked(), old_rules)
+    finally:
+        if checkpoint:
+            checkpoint.save(committed)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="risk_score_log 를 현재(또는 --rules) 규칙으로 다시 점수화해 판정이 달라진 레코드만 출력합니다.")
+    parser.add_argument('log', type=Path, nargs='?', default=LOG_FILE, help="JSON 라인 위험 점수 로그")
+    parser.add_argument('--checkpoint', type=Path, help="바이트 오프셋 체크포인트 파일 (지정 시 이어 읽기)")
+    parser.add_argument('--checkpoint-every', type=int, default=1000, help="체크포인트 저장 간격 (레코드 수)")
+    parser.add_argument('--follow', action='store_true', help="파일 끝에서 종료하지 않고 새 로그를 계속 읽음")
+    parser.add_argument('--poll-interval', type=float, default=1.0, help="--follow 시 새 줄 확인 간격 (초)")
+    parser.add_argument('--rules', type=Path, help="다시 점수화할 규칙 JSON (기본: 적용 중인 규칙)")
+    parser.add_argument('--old-rules', type=Path, help="로그 기록 당시 규칙 JSON (기본: scoring_rules.json)")
+    args = parser.parse_args()
+
+    try:
+        old_rules = baseline_rules(args.old_rules)
+        if args.rules is not None:
+            rule_table.reload_rules(args.rules)
+    except (OSError, ValueError) as error:
+        parser.error(f"규칙 파일: {error}")
+
+    checkpoint = Checkpoint(args.checkpoint, args.log) if args.checkpoint else None
+    changed = 0
+    try:
+        for diff in stream_rescore(args.log, checkpoint, args.follow, args.checkpoint_every, args.poll_interval,
+                                   old_rules):
+            changed += 1
+            print(json.dumps(diff, ensure_ascii=False), flush=True)
+    except KeyboardInterrupt:
+        pass
+    print(f"판정이 달라진 레코드: {changed}건", file=sys.stderr)
@@ -0,0 +1,365 @@
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+from pathlib import Path
+import argparse
+import copy
+import json
+import os
+import sys
+import threading
+import time
+
+# ==============================================================================
+# 1. 규칙 파일
+# ==============================================================================
+# 점수 가중치, 헤더 표, 조치 기준 점수는 코드가 아니라 scoring_rules.json 에 둡니다.
+# 다른 규칙 파일은 이 구조와 같은 JSON 에 바꿀 값만 적으면 됩니다 (나머지는 scoring_rules.json 값).
+# IP 관계 이름: country_change(국가 그룹 간 이동), group_change(그 밖의 그룹 변경), a_change(같은 그룹 내 A 옥텟 변경),
+#              b_change(B 옥텟 변경), cd_change(C/D 옥텟 변경)
+# UA 관계 이름: os_change(OS 변경), version_change(같은 OS 에서 브라우저/버전 변경)
+# bot_keywords 는 [UA 에 포함된 문자열, 브라우저 이름] 목록이며, 앞에서부터 처음 맞는 항목을 씁니다.
+RULES_FILE = Path(__file__).resolve().with_name('scoring_rules.json')
+RULES_FILE_ENV = 'SCORING_RULES'  # 이 환경 변수에 규칙 파일 경로가 있으면 import 시점에 그 규칙을 적용
+RULES_WATCH_INTERVAL_SECONDS = 2.0
+
+RULE_SCHEMA: Dict[str, Dict[str, str]] = {
+    'ip': {'country_groups': 'names', 'malicious_groups': 'names', 'malicious': 'weight',
+           'country_change': 'weight', 'group_change': 'weight', 'a_change': 'weight', 'b_change': 'weight',
+           'cd_change': 'weight'},
+    'ua': {'bot_keywords': 'keywords', 'bot': 'weight', 'missing': 'weight', 'os_change': 'weight',
+           'version_change': 'weight'},
+    'lang': {'change': 'weight'},
+    'referer': {'suspicious_values': 'values', 'suspicious': 'weight'},
+    'accept': {'valid_by_browser': 'browser_map', 'missing': 'weight', 'mismatch': 'weight'},
+    'sec_fetch': {'modern_browsers': 'names', 'missing': 'weight'},
+    'thresholds': {'captcha': 'weight', 'block': 'weight'},
+}
+IP_RELATIONS: Tuple[str, ...] = ('country_change', 'group_change', 'a_change', 'b_change', 'cd_change')
+UA_RELATIONS: Tuple[str, ...] = ('os_change', 'version_change')
+
+
+def _check_value(where: str, kind: str, value: Any) -> None:
+    if kind == 'weight':
+        valid = isinstance(value, int) and not isinstance(value, bool) and value >= 0
+    elif kind == 'names':
+        valid = isinstance(value, list) and all(isinstance(item, str) for item in value)
+    elif kind == 'values':
+        valid = isinstance(value, list) and all(item is None or isinstance(item, str) for item in value)
+    elif kind == 'keywords':
+        valid = isinstance(value, list) and all(
+            isinstance(item, list) and len(item) == 2 and all(isinstance(text, str) and text for text in item)
+            for item in value)
+    else:
+        valid = isinstance(value, dict) and all(isinstance(item, str) for item in value.values())
+    if not valid:
+        raise ValueError(f"{where}: 잘못된 값 {value!r}")
+
+
+def validate_rules(rules: Dict[str, Any]) -> Dict[str, Any]:
+    """모든 섹션/항목이 있고 형식이 맞는지 확인합니다. 문제가 있으면 ValueError."""
+    for section, fields in RULE_SCHEMA.items():
+        values = rules.get(section)
+        if not isinstance(values, dict):
+            raise ValueError(f"규칙 섹션 없음: {section}")
+        for name, kind in fields.items():
+            if name not in values:
+                raise ValueError(f"{section}: 규칙 항목 없음 {name}")
+            _check_value(f"{section}.{name}", kind, values[name])
+    overlap = set(rules['ip']['country_groups']) & set(rules['ip']['malicious_groups'])
+    if overlap:
+        raise ValueError(f"ip: 국가 그룹이면서 악성 그룹인 이름 {sorted(overlap)}")
+    if rules['thresholds']['captcha'] > rules['thresholds']['block']:
+        raise ValueError("thresholds: captcha 가 block 보다 큼")
+    return rules
+
+
+def read_rule_file(path: Path) -> Dict[str, Any]:
+    with open(path, 'r', encoding='utf-8') as file:
+        rules = json.load(file)
+    if not isinstance(rules, dict):
+        raise ValueError(f"{path}: 규칙 파일은 JSON 객체여야 합니다")
+    return rules
+
+
+# 저장소에 함께 있는 기본 규칙 (scoring_rules.json)
+DEFAULT_RULES: Dict[str, Any] = validate_rules(read_rule_file(RULES_FILE))
+
+
+def merge_rules(overrides: Dict[str, Any], base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    base(기본 DEFAULT_RULES) 에 overrides 를 섹션 단위로 덮어쓴 새 규칙 dict.
+    알 수 없는 섹션/항목은 오타로 보고 거부합니다.
+    """
+    merged = copy.deepcopy(DEFAULT_RULES if base is None else base)
+    for section, values in overrides.items():
+        if section not in merged or not isinstance(values, dict):
+            raise ValueError(f"알 수 없는 규칙 섹션: {section}")
+        unknown = set(values) - set(merged[section])
+        if unknown:
+            raise ValueError(f"{section}: 알 수 없는 규칙 항목 {sorted(unknown)}")
+        merged[section].update(values)
+    return validate_rules(merged)
+
+
+def load_rules(path: Path, base: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """규칙 파일을 읽어 base(기본 DEFAULT_RULES) 에 덮어쓴 규칙 dict 를 반환합니다."""
+    return merge_rules(read_rule_file(path), base)
+
+
+# ==============================================================================
+# 2. 조회 표 컴파일
+# ==============================================================================
+# 규칙 dict 를 로드 시점에 한 번 정수 코드로 바꾼 조회 표로 펼칩니다. 로그인마다 하는 일은 코드 조회와 표 인덱싱뿐입니다.
+# - IP 그룹 코드: 국가/악성 그룹마다 코드 하나, 그 밖의 그룹 이름은 모두 other_group 코드
+#   ip_table[이전 그룹][새 그룹][프리픽스 깊이] -> 점수. 깊이 0=A 옥텟 다름, 1=B 다름, 2=C/D 다름, 3=같음
+#   (other_group 끼리라도 이름이 다르면 그룹 변경이므로 ip_other_change 를 씁니다)
+# - 관계 비트 표: 기록 비교 결과를 관계 비트 집합으로 모아 두는 경로(프로필/배치/섀도)는
+#   ip_relation_scores[비트 집합], ua_relation_scores[비트 집합] 한 번으로 점수화합니다.
+#   IP 비트는 IP_RELATIONS 순서(1 국가, 2 그룹, 4 A, 8 B, 16 C/D), UA 비트는 UA_RELATIONS 순서(1 OS, 2 버전).
+# - Accept: 브라우저 코드 x Accept 코드(0 비어 있음, 1 표에 없는 값, 2~ 표에 있는 정상 값) 벌점 행렬
+#   브라우저 코드는 실제 브라우저(UA type == 'Browser')일 때만 browser_codes 에서 찾고, 그 외에는 other_browser
+# - Sec-Fetch: 브라우저 이름 -> 헤더가 없을 때의 벌점 (최신 브라우저만 있음)
+ACCEPT_MISSING = 0
+ACCEPT_UNKNOWN = 1
+
+
+def _relation_score_table(weights: Sequence[int]) -> List[int]:
+    """관계 비트 집합 -> 그 관계들의 최대 가중치 (없으면 0). 기록 비교 결과를 인덱스 한 번으로 점수화합니다."""
+    return [max([weight for bit, weight in enumerate(weights) if mask >> bit & 1], default=0)
+            for mask in range(1 << len(weights))]
+
+
+class CompiledRules:
+    """규칙 dict 를 펼친 불변 조회 표. 교체는 이 객체 전체를 바꾸는 것으로만 일어납니다."""
+    __slots__ = (
+        'name', 'config', 'compiled_at',
+        'group_codes', 'other_group', 'country_groups', 'malicious_groups', 'ip_malicious', 'ip_malicious_by_code',
+        'ip_table', 'ip_depth_scores', 'ip_other_change', 'ip_group_relation', 'ip_relation_scores',
+        'bot_keywords', 'ua_bot', 'ua_missing', 'ua_relation_scores', 'lang_change',
+        'referer_values', 'referer_suspicious',
+        'browser_codes', 'other_browser', 'accept_codes', 'accept_penalty', 'sec_fetch_penalty',
+        'captcha_threshold', 'block_threshold',
+    )
+
+    def __init__(self, rules: Dict[str, Any], name: str = 'rules') -> None:
+        validate_rules(rules)
+        self.name = name
+        self.config = copy.deepcopy(rules)
+        self.compiled_at = time.time()
+        self._compile_ip(rules['ip'])
+
+        ua = rules['ua']
+        self.bot_keywords: Tuple[Tuple[str, str], ...] = tuple((keyword, browser) for keyword, browser in ua['bot_keywords'])
+        self.ua_bot = ua['bot']
+        self.ua_missing = ua['missing']
+        self.ua_relation_scores = _relation_score_table([ua[relation] for relation in UA_RELATIONS])
+        self.lang_change = rules['lang']['change']
+        self.referer_values: FrozenSet[Optional[str]] = frozenset(rules['referer']['suspicious_values'])
+        self.referer_suspicious = rules['referer']['suspicious']
+        self._compile_headers(rules['accept'], rules['sec_fetch'])
+        self.captcha_threshold = rules['thresholds']['captcha']
+        self.block_threshold = rules['thresholds']['block']
+
+    def _compile_ip(self, ip: Dict[str, Any]) -> None:
+        self.country_groups: FrozenSet[str] = frozenset(ip['country_groups'])
+        self.malicious_groups: FrozenSet[str] = frozenset(ip['malicious_groups'])
+        self.ip_malicious = ip['malicious']
+        names = sorted(self.country_groups | self.malicious_groups)
+        self.group_codes: Dict[str, int] = {name: code for code, name in enumerate(names)}
+        self.other_group = len(names)
+        is_country = [name in self.country_groups for name in names] + [False]
+        self.ip_malicious_by_code = [name in self.malicious_groups for name in names] + [False]
+
+        # 같은 그룹이면 a_change(4), 둘 다 국가 그룹이면 country_change(1), 그 밖에는 group_change(2) (이전/새 순서와 무관)
+        self.ip_group_relation = [[4 if prev == new else 1 if is_country[prev] and is_country[new] else 2
+                                   for new in range(len(names) + 1)] for prev in range(len(names) + 1)]
+        self.ip_relation_scores = _relation_score_table([ip[relation] for relation in IP_RELATIONS])
+        self.ip_depth_scores = [0, ip['b_change'], ip['cd_change'], 0]
+        self.ip_other_change = ip['group_change']
+        self.ip_table = [[[self.ip_relation_scores[self.ip_group_relation[prev][new]], *self.ip_depth_scores[1:]]
+                          for new in range(len(names) + 1)] for prev in range(len(names) + 1)]
+
+    def _compile_headers(self, accept: Dict[str, Any], sec_fetch: Dict[str, Any]) -> None:
+        valid_by_browser = accept['valid_by_browser']
+        browsers = sorted(valid_by_browser)
+        self.browser_codes: Dict[str, int] = {name: code for code, name in enumerate(browsers)}
+        self.other_browser = len(browsers)
+        valid_values = sorted(set(valid_by_browser.values()))
+        self.accept_codes: Dict[str, int] = {value: code for code, value in enumerate(valid_values, start=2)}
+
+        def penalty(browser: Optional[str], code: int) -> int:
+            if code == ACCEPT_MISSING:
+                return accept['missing']
+            if browser not in valid_by_browser:
+                return 0
+            if code == ACCEPT_UNKNOWN or valid_values[code - 2] != valid_by_browser[browser]:
+                return accept['mismatch']
+            return 0
+
+        self.accept_penalty = [[penalty(browser, code) for code in range(len(valid_values) + 2)]
+                               for browser in [*browsers, None]]
+        self.sec_fetch_penalty: Dict[str, int] = {browser: sec_fetch['missing']
+                                                  for browser in sorted(set(sec_fetch['modern_browsers']))}
+
+    def accept_code(self, accept: Any) -> int:
+        """Accept 값의 코드. 비어 있으면 ACCEPT_MISSING, 정상 값 표에 없으면 ACCEPT_UNKNOWN."""
+        if isinstance(accept, str):
+            code = self.accept_codes.get(accept)
+            if code is not None:
+                return code
+        if not accept or str(accept).strip() == '' or str(accept).lower() in ('none', 'null'):
+            return ACCEPT_MISSING
+        return ACCEPT_UNKNOWN
+
+    def determine_action(self, total_score: int) -> str:
+        if total_score >= self.block_threshold:
+            return "BLOCK_AND_REDIRECT_MAIN"
+        elif total_score >= self.captcha_threshold:
+            return "REQUIRE_CAPTCHA"
+        return "ALLOW_LOGIN"
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            'name': self.name,
+            'compiled_at': self.compiled_at,
+            'ip_groups': self.other_group + 1,
+            'browsers': self.other_browser + 1,
+            'accept_values': len(self.accept_codes) + 2,
+            'bot_keywords': len(self.bot_keywords),
+            'thresholds': {'captcha': self.captcha_threshold, 'block': self.block_threshold},
+        }
+
+
+def compile_rules(rules: Dict[str, Any], name: str = 'rules') -> CompiledRules:
+    return CompiledRules(rules, name)
+
+
+# ==============================================================================
+# 3. 실행 중 교체
+# ==============================================================================
+# 점수 함수는 로그인마다 ACTIVE_RULES 를 한 번 읽어 그 객체만 씁니다. 교체는 새 CompiledRules 를 다 만든 뒤
+# 모듈 변수 하나를 바꾸는 것이라, 한 로그인이 이전/새 규칙을 섞어 쓰는 일은 없습니다.
+# 규칙에서 파생된 캐시(UA 파싱 결과 등)를 가진 모듈은 add_swap_listener 로 교체 알림을 받아 비웁니다.
+_SWAP_LOCK = threading.Lock()
+_SWAP_LISTENERS: List[Callable[[CompiledRules, CompiledRules], None]] = []
+
+
+def _initial_rules() -> CompiledRules:
+    path = os.environ.get(RULES_FILE_ENV)
+    if path:
+        return compile_rules(load_rules(Path(path)), name=path)
+    return compile_rules(DEFAULT_RULES, name=RULES_FILE.name)
+
+
+ACTIVE_RULES: CompiledRules = _initial_rules()
+
+
+def active_rules() -> CompiledRules:
+    return ACTIVE_RULES
+
+
+def add_swap_listener(listener: Callable[[CompiledRules, CompiledRules], None]) -> None:
+    """규칙이 교체될 때마다 listener(이전 규칙, 새 규칙) 를 호출합니다."""
+    with _SWAP_LOCK:
+        _SWAP_LISTENERS.append(listener)
+
+
+def remove_swap_listener(listener: Callable[[CompiledRules, CompiledRules], None]) -> None:
+    with _SWAP_LOCK:
+        if listener in _SWAP_LISTENERS:
+            _SWAP_LISTENERS.remove(listener)
+
+
+def install_rules(rules: CompiledRules) -> CompiledRules:
+    """컴파일된 규칙을 점수 계산에 적용하고 이전 규칙을 반환합니다."""
+    global ACTIVE_RULES
+    with _SWAP_LOCK:
+        previous = ACTIVE_RULES
+        ACTIVE_RULES = rules
+        listeners = list(_SWAP_LISTENERS)
+    for listener in listeners:
+        listener(previous, rules)
+    return previous
+
+
+def reload_rules(path: Path) -> CompiledRules:
+    """규칙 파일을 읽어 컴파일하고 적용합니다. 파일에 문제가 있으면 예외가 나고 현재 규칙은 그대로입니다."""
+    rules = compile_rules(load_rules(path), name=str(path))
+    install_rules(rules)
+    return rules
+
+
+class RuleFileWatcher(threading.Thread):
+    """
+    규칙 파일의 수정 시각을 주기적으로 확인해 바뀌면 다시 적용하는 데몬 스레드.
+    잘못된 파일은 오류를 기록하고 건너뛰므로, 파일을 고칠 때까지 마지막으로 성공한 규칙이 유지됩니다.
+    """
+
+    def __init__(self, path: Path, interval: float = RULES_WATCH_INTERVAL_SECONDS) -> None:
+        super().__init__(name='rule-file-watcher', daemon=True)
+        self.path = Path(path)
+        self.interval = interval
+        self.stop_event = threading.Event()
+        self.mtime_ns: Optional[int] = None
+        self.reloads = 0
+        self.errors = 0
+        self.last_error: Optional[str] = None
+
+    def check(self) -> bool:
+        """파일이 바뀌었으면 다시 적용합니다. 적용했으면 True."""
+        try:
+            mtime_ns = self.path.stat().st_mtime_ns
+        except OSError as error:
+            self.last_error = str(error)
+            return False
+        if mtime_ns == self.mtime_ns:
+            return False
+        self.mtime_ns = mtime_ns
+        try:
+            reload_rules(self.path)
+        except (OSError, ValueError) as error:
+            self.errors += 1
+            self.last_error = str(error)
+            print(f"규칙 파일 적용 실패 ({self.path}): {error}", file=sys.stderr)
+            return False
+        self.reloads += 1
+        self.last_error = None
+        return True
+
+    def run(self) -> None:
+        while not self.stop_event.wait(self.interval):
+            self.check()
+
+    def stop(self) -> None:
+        self.stop_event.set()
+
+    def stats(self) -> Dict[str, Any]:
+        return {'path': str(self.path), 'reloads': self.reloads, 'errors': self.errors, 'last_error': self.last_error,
+                **ACTIVE_RULES.summary()}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="점수 규칙 파일 검사와 조회 표 컴파일")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    dump = subcommands.add_parser('dump', help="기본 규칙(scoring_rules.json 과 같은 값) 출력")
+    check = subcommands.add_parser('check', help="규칙 파일을 검사/컴파일하고 조회 표 크기와 바뀐 값을 출력")
+    check.add_argument('rules', type=Path, help="규칙 JSON (바꿀 값만 적어도 됨)")
+    args = parser.parse_args()
+
+    if args.command == 'dump':
+        json.dump(DEFAULT_RULES, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        sys.exit(0)
+
+    try:
+        rules = load_rules(args.rules)
+        start = time.perf_counter()
+        compiled = compile_rules(rules, name=str(args.rules))
+        elapsed_ms = (time.perf_counter() - start) * 1e3
+    except (OSError, ValueError) as error:
+        print(f"규칙 파일 오류: {error}", file=sys.stderr)
+        sys.exit(1)
+    print(f"컴파일 {elapsed_ms:.2f}ms: {json.dumps(compiled.summary(), ensure_ascii=False)}")
+    for section, values in rules.items():
+        for name, value in values.items():
+            if DEFAULT_RULES[section][name] != value:
+                print(f"  {section}.{name}: {DEFAULT_RULES[section][name]!r} -> {value!r}")
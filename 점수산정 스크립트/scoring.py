@@ -1,5 +1,12 @@
-from typing import List, Set, Dict, Any
+from typing import List, Set, Dict, Any, Optional, Sequence, Tuple
+from bisect import bisect_right
+from functools import lru_cache
+import csv
+import os
 import re
+import sys
+
+import rule_table
 
 # ==============================================================================
 # 1. 공통 분류 데이터 및 상수
@@ -31,19 +38,14 @@ LOCATION_DATA: Dict[str, Dict[str, List[str]]] = {
     }
 }
 
-COUNTRY_GROUPS: Set[str] = set(['Korea', 'USA', 'China', 'Europe'])
-SUSPICIOUS_REFERERS: Set[str] = {
-    'https://www.google.com/',
-    'http://attacker-site.xyz/login-attack.html',
-    'https://capstone3d.dothome.net/fake-login.php',
-    None, '', 'none', 'null'
-}
-ACCEPT_HEADERS_BY_BROWSER_VALID: Dict[str, str] = {
-    'Firefox': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,*/*;q=0.8',
-    'Chrome': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8,application/signed-exchange;v=b3;q=0.7',
-    'Safari': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-}
-MODERN_BROWSERS: Set[str] = set(ACCEPT_HEADERS_BY_BROWSER_VALID.keys())
+# 점수 규칙(가중치, 헤더 표, 기준 점수)은 scoring_rules.json 에 있고 rule_table.py 가 조회 표로 컴파일합니다.
+# 점수 함수는 로그인마다 rule_table.ACTIVE_RULES 를 읽으므로 규칙 파일을 바꾸면 재시작 없이 적용됩니다.
+# 아래 상수는 import 시점 규칙의 사본으로, 기존 코드 호환용입니다 (실행 중 교체는 반영되지 않음).
+_IMPORT_RULES: Dict[str, Any] = rule_table.ACTIVE_RULES.config
+COUNTRY_GROUPS: Set[str] = set(_IMPORT_RULES['ip']['country_groups'])
+SUSPICIOUS_REFERERS: Set[str] = set(_IMPORT_RULES['referer']['suspicious_values'])
+ACCEPT_HEADERS_BY_BROWSER_VALID: Dict[str, str] = dict(_IMPORT_RULES['accept']['valid_by_browser'])
+MODERN_BROWSERS: Set[str] = set(_IMPORT_RULES['sec_fetch']['modern_browsers'])
 
 # IP A.B 프리픽스 -> 그룹 이름 매핑 테이블
 LOCATION_PREFIX_MAP: Dict[str, str] = {}
@@ -52,8 +54,142 @@ for group, data in LOCATION_DATA.items():
         LOCATION_PREFIX_MAP[prefix] = group
 
 
-def get_group_name(ip_address: str) -> str:
-    """IP 주소의 A.B 프리픽스를 기준으로 그룹 이름을 반환합니다."""
+def ip_to_int(ip_address: Any) -> Optional[int]:
+    """정규 표기(0~255 의 10진수 네 조각) IPv4 주소를 32비트 정수로 바꿉니다. 그 외에는 None 을 반환합니다."""
+    try:
+        a, b, c, d = ip_address.split('.')
+        a, b, c, d = int(a), int(b), int(c), int(d)
+    except:
+        return None
+    # 범위를 벗어나거나 "01", " 1", "+1" 처럼 정규 표기가 아니면 거부
+    if (a | b | c | d) >> 8 or f"{a}.{b}.{c}.{d}" != ip_address: return None
+    return (a << 24) | (b << 16) | (c << 8) | d
+
+
+class IpClassificationIndex:
+    """
+    CIDR 대역 -> 그룹 이름 분류 색인.
+    겹치는 대역은 가장 좁은(구체적인) 대역이 우선하도록 서로 겹치지 않는 정수 구간으로 펼친 뒤,
+    구간 시작값 정렬 배열에서 이진 탐색으로 조회합니다.
+    """
+
+    def __init__(self, ranges: Sequence[Tuple[int, int, str]] = ()) -> None:
+        self.starts: List[int] = []
+        self.ends: List[int] = []
+        self.groups: List[str] = []
+        self._build(ranges)
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def _build(self, ranges: Sequence[Tuple[int, int, str]]) -> None:
+        # 시작값 오름차순, 같은 시작이면 넓은 대역 먼저 -> 스택 위쪽이 항상 더 좁은 대역
+        ordered = sorted(ranges, key=lambda item: (item[0], -item[1]))
+        stack: List[Tuple[int, str]] = []
+        cursor = 0
+
+        def emit(upto: int) -> None:
+            nonlocal cursor
+            if stack and cursor <= upto:
+                group = stack[-1][1]
+                if self.ends and self.ends[-1] + 1 == cursor and self.groups[-1] == group:
+                    self.ends[-1] = upto
+                else:
+                    self.starts.append(cursor)
+                    self.ends.append(upto)
+                    self.groups.append(group)
+            cursor = max(cursor, upto + 1)
+
+        for start, end, group in ordered:
+            while stack and stack[-1][0] < start:
+                emit(stack[-1][0])
+                stack.pop()
+            emit(start - 1)
+            stack.append((end, group))
+            cursor = start
+        while stack:
+            emit(stack[-1][0])
+            stack.pop()
+
+    @classmethod
+    def from_cidrs(cls, entries: Sequence[Tuple[str, str]]) -> 'IpClassificationIndex':
+        """("A.B.C.D/N", 그룹 이름) 목록으로 색인을 만듭니다."""
+        ranges = []
+        for cidr, group in entries:
+            network, _, length = cidr.strip().partition('/')
+            base = ip_to_int(network)
+            prefix_length = int(length) if length else 32
+            if base is None or not 0 <= prefix_length <= 32:
+                raise ValueError(f"잘못된 CIDR 표기: {cidr!r}")
+            size = 1 << (32 - prefix_length)
+            start = base & ~(size - 1) & 0xFFFFFFFF
+            ranges.append((start, start + size - 1, group))
+        return cls(ranges)
+
+    @classmethod
+    def from_prefix_map(cls, prefix_map: Dict[str, str]) -> 'IpClassificationIndex':
+        """LOCATION_PREFIX_MAP 형식("A.B" -> 그룹)을 /16 대역 색인으로 바꿉니다."""
+        return cls.from_cidrs([(f"{prefix}.0.0/16", group) for prefix, group in prefix_map.items()])
+
+    @classmethod
+    def from_csv(cls, path: str, cidr_column: str = 'cidr', group_column: str = 'group') -> 'IpClassificationIndex':
+        """
+        CSV 파일에서 대역을 일괄 로드합니다. (예: cidr,group / 5.188.0.0/16,Malicious)
+        국가/ASN/호스팅/VPN/Tor 목록은 group 컬럼에 점수 계산용 그룹 이름을 적어 변환합니다.
+        """
+        with open(path, 'r', encoding='utf-8', newline='') as file:
+            reader = csv.DictReader(file)
+            return cls.from_cidrs([(row[cidr_column], row[group_column]) for row in reader])
+
+    def lookup(self, ip_int: int) -> str:
+        """정수 IP 의 그룹 이름을 반환합니다. 어느 대역에도 속하지 않으면 "Unknown"."""
+        position = bisect_right(self.starts, ip_int) - 1
+        if position >= 0 and ip_int <= self.ends[position]:
+            return self.groups[position]
+        return "Unknown"
+
+    def lookup_many(self, ip_ints: Sequence[int]) -> List[str]:
+        """정수 IP 배열을 한 번에 분류합니다 (NumPy 가 있으면 searchsorted 사용)."""
+        try:
+            import numpy as np
+        except ImportError:
+            return [self.lookup(ip_int) for ip_int in ip_ints]
+
+        values = np.asarray(ip_ints, dtype=np.int64)
+        if not self.starts:
+            return ["Unknown"] * len(values)
+        starts = np.asarray(self.starts, dtype=np.int64)
+        ends = np.asarray(self.ends, dtype=np.int64)
+        groups = np.asarray(self.groups + ["Unknown"], dtype=object)
+        positions = np.searchsorted(starts, values, side='right') - 1
+        inside = (positions >= 0) & (values <= ends[np.maximum(positions, 0)])
+        return groups[np.where(inside, positions, len(self.groups))].tolist()
+
+
+# 현재 점수 계산에 쓰이는 IP 분류 색인 (기본값은 LOCATION_PREFIX_MAP 의 /16 대역)
+IP_CLASSIFICATION_INDEX: IpClassificationIndex = IpClassificationIndex.from_prefix_map(LOCATION_PREFIX_MAP)
+
+# 같은 사용자의 기록 IP 는 로그인마다 반복 조회되므로 문자열 -> 그룹 결과를 캐시합니다.
+IP_GROUP_CACHE_SIZE = 65536
+
+
+def set_ip_classification_index(index: IpClassificationIndex) -> None:
+    """점수 계산에 사용할 IP 분류 색인을 교체합니다. (예: from_csv 로 로드한 대규모 대역 목록)"""
+    global IP_CLASSIFICATION_INDEX
+    IP_CLASSIFICATION_INDEX = index
+    _get_group_name_cached.cache_clear()
+
+
+def get_group_name_for_int(ip_int: int) -> str:
+    """정수 IP 의 그룹 이름을 현재 분류 색인에서 찾습니다."""
+    return IP_CLASSIFICATION_INDEX.lookup(ip_int)
+
+
+def _get_group_name(ip_address: str) -> str:
+    """IP 주소가 속한 대역의 그룹 이름을 반환합니다. 정규 표기가 아니면 A.B 프리픽스 표로 판단합니다."""
+    ip_int = ip_to_int(ip_address)
+    if ip_int is not None:
+        return IP_CLASSIFICATION_INDEX.lookup(ip_int)
     try:
         parts = ip_address.split('.')
         ab_prefix = f"{parts[0]}.{parts[1]}"
@@ -62,21 +198,50 @@ def get_group_name(ip_address: str) -> str:
         return "Unknown"
 
 
+_get_group_name_cached = lru_cache(maxsize=IP_GROUP_CACHE_SIZE)(_get_group_name)
+
+
+def get_group_name(ip_address: str) -> str:
+    """IP 주소가 속한 대역의 그룹 이름을 반환합니다."""
+    if isinstance(ip_address, str):
+        return _get_group_name_cached(ip_address)
+    return _get_group_name(ip_address)
+
+
+def get_group_names(ip_addresses: Sequence[Any]) -> List[str]:
+    """여러 IP 의 그룹 이름을 한 번에 구합니다. 정규 표기 IP 는 색인에서 일괄 조회합니다."""
+    ip_ints = [ip_to_int(ip_address) for ip_address in ip_addresses]
+    found = iter(IP_CLASSIFICATION_INDEX.lookup_many([ip_int for ip_int in ip_ints if ip_int is not None]))
+    return [next(found) if ip_int is not None else get_group_name(ip_address)
+            for ip_address, ip_int in zip(ip_addresses, ip_ints)]
+
+
 # ------------------------------------------------------------------
 
-def calculate_dynamic_ip_score_final_country(new_ip: str, user_ip_history: List[str]) -> int:
-    """IP 비교 점수 산정 (최대 10점): 악성 IP 감지 시 10점 확정."""
+def calculate_dynamic_ip_score_final_country(
+        new_ip: str,
+        user_ip_history: List[str],
+        rules: Optional[rule_table.CompiledRules] = None
+) -> int:
+    """IP 비교 점수 산정 (기본 규칙 최대 10점): 악성 그룹 IP 감지 시 ip.malicious 점수 확정."""
     try:
         new_parts = new_ip.split('.')
         if len(new_parts) != 4: return 0
     except:
         return 0
 
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
     new_a, new_b, new_c, new_d = new_parts
+    group_codes, other_group = rules.group_codes, rules.other_group
     new_group = get_group_name(new_ip)
+    new_code = group_codes.get(new_group, other_group)
 
-    if new_group == 'Malicious': return 10
+    if rules.ip_malicious_by_code[new_code]: return rules.ip_malicious
 
+    # 기록 IP 와 프리픽스가 갈라지는 깊이를 구해 ip_table[이전 그룹][새 그룹][깊이] 로 점수화합니다.
+    # B 옥텟 이하에서 갈라지면 그룹과 무관한 점수라 그룹 조회를 건너뜁니다.
+    ip_table, depth_scores = rules.ip_table, rules.ip_depth_scores
     max_comparison_score = 0
     for prev_ip in user_ip_history:
         try:
@@ -86,36 +251,41 @@ def calculate_dynamic_ip_score_final_country(new_ip: str, user_ip_history: List[
             continue
 
         prev_a, prev_b, prev_c, prev_d = prev_parts
-        prev_group = get_group_name(prev_ip)
-
-        comparison_score = 0
 
         if new_a != prev_a:
-            if new_group != prev_group:
-                if new_group in COUNTRY_GROUPS and prev_group in COUNTRY_GROUPS:
-                    comparison_score = 3
-                elif new_group != prev_group:
-                    comparison_score = 3
-            elif new_group == prev_group:
-                comparison_score = 2
+            prev_group = get_group_name(prev_ip)
+            prev_code = group_codes.get(prev_group, other_group)
+            if prev_code == other_group and new_code == other_group and prev_group != new_group:
+                comparison_score = rules.ip_other_change
+            else:
+                comparison_score = ip_table[prev_code][new_code][0]
         elif new_b != prev_b:
-            comparison_score = 2
+            comparison_score = depth_scores[1]
         elif new_c != prev_c or new_d != prev_d:
-            comparison_score = 1
+            comparison_score = depth_scores[2]
+        else:
+            continue
 
-        max_comparison_score = max(max_comparison_score, comparison_score)
+        if comparison_score > max_comparison_score:
+            max_comparison_score = comparison_score
 
     return max_comparison_score
 
 
 # ------------------------------------------------------------------
 
-def extract_ua_features(ua_string: str) -> Dict[str, str]:
-    """UA 문자열에서 OS, 브라우저, 타입 등을 추출합니다."""
-    if not ua_string or str(ua_string).strip() == '' or str(ua_string).lower() in ['none', 'null', 'nan']:
-        return {'os': 'None', 'browser': 'None', 'version': 'None', 'type': 'None'}
+# UA 파싱 정규식 (모듈 로드 시 한 번만 컴파일)
+FIREFOX_VERSION_PATTERN = re.compile(r'Firefox/([\d.]+)')
+CHROME_VERSION_PATTERN = re.compile(r'Chrome/([\d.]+)')
+SAFARI_VERSION_PATTERN = re.compile(r'Version/([\d.]+)')
+
+# 실제 트래픽의 고유 UA 문자열은 많지 않으므로 파싱 결과를 크기 제한 LRU 캐시에 보관합니다.
+UA_CACHE_SIZE = 4096
+EMPTY_UA_FEATURES: Dict[str, str] = {'os': 'None', 'browser': 'None', 'version': 'None', 'type': 'None'}
 
-    ua_string = str(ua_string)
+
+def _parse_ua_features(ua_string: str) -> Dict[str, str]:
+    """UA 문자열에서 OS, 브라우저, 타입 등을 추출합니다. (캐시 없이 실제로 파싱하는 부분)"""
     os_info = 'Other'
     if 'Windows NT' in ua_string: os_info = 'Windows'
     elif 'Macintosh' in ua_string or 'Mac OS X' in ua_string: os_info = 'Mac'
@@ -123,80 +293,133 @@ def extract_ua_features(ua_string: str) -> Dict[str, str]:
     elif 'Android' in ua_string: os_info = 'Android'
 
     browser, version, type = 'Other', '0', 'Other'
-    if 'python-requests' in ua_string or 'curl' in ua_string or 'Nmap' in ua_string:
-        if 'python-requests' in ua_string: browser = 'Python-Requests'
-        elif 'curl' in ua_string: browser = 'Curl'
-        elif 'Nmap' in ua_string: browser = 'Nmap'
-        return {'os': 'Bot', 'browser': browser, 'version': 'Bot', 'type': 'Bot'}
+    for keyword, bot_name in rule_table.ACTIVE_RULES.bot_keywords:
+        if keyword in ua_string:
+            return {'os': 'Bot', 'browser': bot_name, 'version': 'Bot', 'type': 'Bot'}
 
-    match = re.search(r'Firefox/([\d.]+)', ua_string)
+    match = FIREFOX_VERSION_PATTERN.search(ua_string)
     if match: browser, version, type = 'Firefox', match.group(1).split('.')[0], 'Browser'
     elif 'Chrome' in ua_string and 'Safari' in ua_string:
-        match = re.search(r'Chrome/([\d.]+)', ua_string)
+        match = CHROME_VERSION_PATTERN.search(ua_string)
         if match: browser, version, type = 'Chrome', match.group(1).split('.')[0], 'Browser'
     elif 'Safari' in ua_string and 'Version/' in ua_string:
-        match = re.search(r'Version/([\d.]+)', ua_string)
+        match = SAFARI_VERSION_PATTERN.search(ua_string)
         if match: browser, version, type = 'Safari', match.group(1).split('.')[0], 'Browser'
 
     return {'os': os_info, 'browser': browser, 'version': version, 'type': type}
 
 
-def calculate_dynamic_ua_score(new_ua: str, user_ua_history: List[str]) -> int:
-    """UA 비교 점수 산정 (최대 10점): 봇/스캐너 감지 시 10점 확정."""
-    new_features = extract_ua_features(new_ua)
-    if new_features['os'] == 'Bot': return 10
-    if new_features['os'] == 'None': return 1
+_parse_ua_features_cached = lru_cache(maxsize=UA_CACHE_SIZE)(_parse_ua_features)
 
-    max_comparison_score = 0
+
+def get_ua_features(ua_string: Any) -> Dict[str, str]:
+    """
+    캐시된 UA 특징을 반환합니다. 반환된 dict 는 캐시와 공유되므로 수정하면 안 됩니다.
+    점수 함수 내부에서는 복사 비용을 피하기 위해 이 함수를 사용합니다.
+    """
+    if not ua_string or str(ua_string).strip() == '' or str(ua_string).lower() in ['none', 'null', 'nan']:
+        return EMPTY_UA_FEATURES
+    if isinstance(ua_string, str):
+        return _parse_ua_features_cached(ua_string)
+    return _parse_ua_features(str(ua_string))
+
+
+def extract_ua_features(ua_string: str) -> Dict[str, str]:
+    """UA 문자열에서 OS, 브라우저, 타입 등을 추출합니다."""
+    return dict(get_ua_features(ua_string))
+
+
+def ua_cache_info() -> Dict[str, int]:
+    """UA 파싱 캐시의 적중/미스 횟수와 현재 크기를 반환합니다."""
+    info = _parse_ua_features_cached.cache_info()
+    return {'hits': info.hits, 'misses': info.misses, 'size': info.currsize, 'max_size': info.maxsize}
+
+
+def clear_ua_cache() -> None:
+    """UA 파싱 캐시와 카운터를 초기화합니다."""
+    _parse_ua_features_cached.cache_clear()
+
+
+def _on_rules_swapped(previous: rule_table.CompiledRules, rules: rule_table.CompiledRules) -> None:
+    # 봇 키워드가 바뀌면 이전 키워드로 파싱해 둔 UA 결과를 버림
+    if previous.bot_keywords != rules.bot_keywords:
+        clear_ua_cache()
+
+
+rule_table.add_swap_listener(_on_rules_swapped)
+
+
+def calculate_dynamic_ua_score(
+        new_ua: str,
+        user_ua_history: List[str],
+        ua_features: Optional[Dict[str, str]] = None,
+        rules: Optional[rule_table.CompiledRules] = None
+) -> int:
+    """UA 비교 점수 산정 (기본 규칙 최대 10점): 봇/스캐너 감지 시 ua.bot 점수 확정."""
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    new_features = ua_features if ua_features is not None else get_ua_features(new_ua)
+    if new_features['os'] == 'Bot': return rules.ua_bot
+    if new_features['os'] == 'None': return rules.ua_missing
+
+    # 기록과의 관계(1 OS 변경, 2 브라우저/버전 변경)를 비트로 모아 ua_relation_scores 에서 한 번에 점수화
+    relations = 0
     for prev_ua in user_ua_history:
-        prev_features = extract_ua_features(prev_ua)
+        prev_features = get_ua_features(prev_ua)
         if prev_features['os'] == 'None' or prev_features['os'] == 'Bot': continue
 
-        comparison_score = 0
         if new_features['os'] != prev_features['os']:
-            comparison_score = 2
+            relations |= 1
         elif new_features['browser'] != prev_features['browser'] or \
                 new_features['version'] != prev_features['version']:
-            comparison_score = 1
-
-        max_comparison_score = max(max_comparison_score, comparison_score)
-    return max_comparison_score
+            relations |= 2
+        if relations == 3: break
+    return rules.ua_relation_scores[relations]
 
 
-def calculate_dynamic_language_score(new_language: str, user_language_history: List[str]) -> int:
-    """Language 헤더가 이전 기록과 다를 경우 (+2점)을 부여합니다."""
+def calculate_dynamic_language_score(
+        new_language: str,
+        user_language_history: List[str],
+        rules: Optional[rule_table.CompiledRules] = None
+) -> int:
+    """Language 헤더가 이전 기록과 다를 경우 lang.change 점수(기본 +2점)를 부여합니다."""
     if not user_language_history: return 0
     if new_language not in user_language_history:
-        return 2
+        return (rules or rule_table.ACTIVE_RULES).lang_change
     return 0
 
 
-def calculate_referer_score(new_referer: str) -> int:
-    """Referer 헤더가 의심스러운 목록에 포함되는지 확인하여 +2점을 부여합니다."""
-    if new_referer in SUSPICIOUS_REFERERS or str(new_referer) in SUSPICIOUS_REFERERS:
-        return 2
+def calculate_referer_score(new_referer: str, rules: Optional[rule_table.CompiledRules] = None) -> int:
+    """Referer 헤더가 의심스러운 목록에 포함되는지 확인하여 referer.suspicious 점수(기본 +2점)를 부여합니다."""
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    if new_referer in rules.referer_values or str(new_referer) in rules.referer_values:
+        return rules.referer_suspicious
     return 0
 
 
-def calculate_accept_score(new_accept: str, new_ua: str) -> int:
+def calculate_accept_score(
+        new_accept: str,
+        new_ua: str,
+        ua_features: Optional[Dict[str, str]] = None,
+        rules: Optional[rule_table.CompiledRules] = None
+) -> int:
     """
-    Accept 헤더를 검증하여 점수를 부여합니다.
+    Accept 헤더를 검증하여 점수를 부여합니다. (기본 규칙 기준)
     +2점: 헤더가 비어있음
     +10점: 브라우저 타입과 Accept 값이 불일치함
     """
-    if not new_accept or str(new_accept).strip() == '' or str(new_accept).lower() in ['none', 'null']:
-        return 2
-
-    ua_features = extract_ua_features(new_ua)
-    browser_type = ua_features['browser']
-    ua_type = ua_features['type']
-
-    if ua_type == 'Browser' and browser_type in ACCEPT_HEADERS_BY_BROWSER_VALID:
-        valid_accept = ACCEPT_HEADERS_BY_BROWSER_VALID[browser_type]
-
-        if new_accept != valid_accept:
-            return 10
-    return 0
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    # accept_penalty[브라우저 코드][Accept 코드] 한 번의 조회 (정상 값이면 문자열 비교 없이 dict 조회로 코드가 정해짐)
+    accept_code = rules.accept_codes.get(new_accept) if isinstance(new_accept, str) else None
+    if accept_code is None:
+        accept_code = rules.accept_code(new_accept)
+    if ua_features is None:
+        ua_features = get_ua_features(new_ua)
+    browser_code = rules.browser_codes.get(ua_features['browser'], rules.other_browser) \
+        if ua_features['type'] == 'Browser' else rules.other_browser
+    return rules.accept_penalty[browser_code][accept_code]
 
 
 def calculate_sec_fetch_score(
@@ -204,15 +427,20 @@ def calculate_sec_fetch_score(
         site: str,
         mode: str,
         dest: str,
-        user: str
+        user: str,
+        ua_features: Optional[Dict[str, str]] = None,
+        rules: Optional[rule_table.CompiledRules] = None
 ) -> int:
     """
-    최신 브라우저인데 Sec-Fetch 헤더가 없는 경우 (+10점)을 부여합니다.
+    최신 브라우저인데 Sec-Fetch 헤더가 없는 경우 sec_fetch.missing 점수(기본 +10점)를 부여합니다.
     """
-    ua_features = extract_ua_features(new_ua)
-    browser_type = ua_features['browser']
+    if rules is None:
+        rules = rule_table.ACTIVE_RULES
+    if ua_features is None:
+        ua_features = get_ua_features(new_ua)
+    penalty = rules.sec_fetch_penalty.get(ua_features['browser'])
 
-    if browser_type not in MODERN_BROWSERS:
+    if not penalty:
         return 0
 
     missing_site = site is None or str(site).strip() == '' or str(site).lower() == 'none'
@@ -220,7 +448,7 @@ def calculate_sec_fetch_score(
     missing_dest = dest is None or str(dest).strip() == '' or str(dest).lower() == 'none'
 
     if missing_site or missing_mode or missing_dest:
-        return 10
+        return penalty
     return 0
 
 
@@ -228,7 +456,13 @@ def calculate_sec_fetch_score(
 # 4. 최종 통합 점수 산정 함수 및 보안 액션
 # ==============================================================================
 
-def calculate_integrated_login_score(
+# 항목별 점수 이름 (risk_score_log.txt 의 JSON 키와 동일)
+SCORE_COMPONENTS: List[str] = [
+    'ip_score', 'ua_score', 'lang_score', 'referer_score', 'accept_score', 'sec_fetch_score',
+]
+
+
+def calculate_login_score_breakdown(
         new_ip: str,
         new_ua: str,
         new_accept: str,
@@ -240,38 +474,162 @@ def calculate_integrated_login_score(
         new_sec_fetch_user: str,
         user_ip_history: List[str],
         user_ua_history: List[str],
-        user_language_history: List[str]
-) -> int:
+        user_language_history: List[str],
+        velocity_score: int = 0,
+        campaign_score: int = 0,
+        breach_score: int = 0
+) -> Dict[str, int]:
     """
-    모든 헤더 점수를 합산하여 최종 통합 위험 점수를 산정합니다.
+    항목별 점수와 합계(total_score)를 dict 로 반환합니다.
+    velocity_score 는 요청 간 상태가 필요한 속도 점수(velocity.VelocityTracker)로, 호출 측에서 계산해 넘깁니다.
+    campaign_score 도 같은 방식의 여러 계정 대상 헤더 지문 점수(campaign.CampaignDetector)입니다.
+    breach_score 는 유출 자격 증명 점수(breach_filter.calculate_breach_score)로, 비밀번호가 필요하므로 역시 호출 측에서 넘깁니다.
     """
 
-    ip_score = calculate_dynamic_ip_score_final_country(new_ip, user_ip_history)
-    ua_score = calculate_dynamic_ua_score(new_ua, user_ua_history)
-    language_score = calculate_dynamic_language_score(new_language, user_language_history)
-    referer_score = calculate_referer_score(new_referer)
-    accept_score = calculate_accept_score(new_accept, new_ua)
+    if SCORING_PROFILER is not None:
+        return _profiled_login_score_breakdown(
+            SCORING_PROFILER, new_ip, new_ua, new_accept, new_language, new_referer,
+            new_sec_fetch_site, new_sec_fetch_mode, new_sec_fetch_dest, new_sec_fetch_user,
+            user_ip_history, user_ua_history, user_language_history, velocity_score, campaign_score, breach_score
+        )
+
+    # 규칙은 로그인당 한 번만 읽어 모든 항목에 같은 규칙을 씁니다 (계산 중 교체돼도 섞이지 않음).
+    rules = rule_table.ACTIVE_RULES
+    # UA 는 로그인당 한 번만 파싱해 세 점수 함수가 공유합니다.
+    ua_features = get_ua_features(new_ua)
+
+    ip_score = calculate_dynamic_ip_score_final_country(new_ip, user_ip_history, rules)
+    ua_score = calculate_dynamic_ua_score(new_ua, user_ua_history, ua_features, rules)
+    language_score = calculate_dynamic_language_score(new_language, user_language_history, rules)
+    referer_score = calculate_referer_score(new_referer, rules)
+    accept_score = calculate_accept_score(new_accept, new_ua, ua_features, rules)
     sec_fetch_score = calculate_sec_fetch_score(
         new_ua,
         new_sec_fetch_site,
         new_sec_fetch_mode,
         new_sec_fetch_dest,
-        new_sec_fetch_user
+        new_sec_fetch_user,
+        ua_features,
+        rules
     )
 
-    return ip_score + ua_score + language_score + referer_score + accept_score + sec_fetch_score
+    return {
+        'ip_score': ip_score,
+        'ua_score': ua_score,
+        'lang_score': language_score,
+        'referer_score': referer_score,
+        'accept_score': accept_score,
+        'sec_fetch_score': sec_fetch_score,
+        'velocity_score': velocity_score,
+        'campaign_score': campaign_score,
+        'breach_score': breach_score,
+        'total_score': ip_score + ua_score + language_score + referer_score + accept_score + sec_fetch_score
+                       + velocity_score + campaign_score + breach_score,
+    }
+
+
+# ------------------------------------------------------------------
+# 항목별 계측 (scoring_profiler.ScoringProfiler)
+# None 이면 calculate_login_score_breakdown 은 조건 검사 한 번 외에 추가 비용이 없습니다.
+SCORING_PROFILER: Any = None
+
+
+def _profiled_login_score_breakdown(
+        profiler: Any,
+        new_ip: str,
+        new_ua: str,
+        new_accept: str,
+        new_language: str,
+        new_referer: str,
+        new_sec_fetch_site: str,
+        new_sec_fetch_mode: str,
+        new_sec_fetch_dest: str,
+        new_sec_fetch_user: str,
+        user_ip_history: List[str],
+        user_ua_history: List[str],
+        user_language_history: List[str],
+        velocity_score: int = 0,
+        campaign_score: int = 0,
+        breach_score: int = 0
+) -> Dict[str, int]:
+    """calculate_login_score_breakdown 와 같은 계산을 항목별 시간/적중 기록과 함께 수행합니다."""
+    measure = profiler.measure
+    start = profiler.clock()
+    rules = rule_table.ACTIVE_RULES
+    ua_features = measure('ua_parse', get_ua_features, new_ua)
+
+    scores = {
+        'ip_score': measure('ip_score', calculate_dynamic_ip_score_final_country, new_ip, user_ip_history, rules),
+        'ua_score': measure('ua_score', calculate_dynamic_ua_score, new_ua, user_ua_history, ua_features, rules),
+        'lang_score': measure(
+            'lang_score', calculate_dynamic_language_score, new_language, user_language_history, rules
+        ),
+        'referer_score': measure('referer_score', calculate_referer_score, new_referer, rules),
+        'accept_score': measure('accept_score', calculate_accept_score, new_accept, new_ua, ua_features, rules),
+        'sec_fetch_score': measure(
+            'sec_fetch_score', calculate_sec_fetch_score, new_ua, new_sec_fetch_site, new_sec_fetch_mode,
+            new_sec_fetch_dest, new_sec_fetch_user, ua_features, rules
+        ),
+        'velocity_score': velocity_score,
+        'campaign_score': campaign_score,
+        'breach_score': breach_score,
+    }
+    scores['total_score'] = sum(scores.values())
+    profiler.record('total_score', profiler.clock() - start, scores['total_score'])
+    return scores
+
+
+def calculate_integrated_login_score(
+        new_ip: str,
+        new_ua: str,
+        new_accept: str,
+        new_language: str,
+        new_referer: str,
+        new_sec_fetch_site: str,
+        new_sec_fetch_mode: str,
+        new_sec_fetch_dest: str,
+        new_sec_fetch_user: str,
+        user_ip_history: List[str],
+        user_ua_history: List[str],
+        user_language_history: List[str],
+        velocity_score: int = 0,
+        campaign_score: int = 0,
+        breach_score: int = 0
+) -> int:
+    """
+    모든 헤더 점수를 합산하여 최종 통합 위험 점수를 산정합니다.
+    """
+    return calculate_login_score_breakdown(
+        new_ip, new_ua, new_accept, new_language, new_referer,
+        new_sec_fetch_site, new_sec_fetch_mode, new_sec_fetch_dest, new_sec_fetch_user,
+        user_ip_history, user_ua_history, user_language_history, velocity_score, campaign_score, breach_score
+    )['total_score']
 
 #캡차 시행 또는 차단 시 메인페이지로 넘어갈 수 있게 연동 필요
+# 조치 기준 점수 (scoring_rules.json 의 thresholds, threshold_calibration.py 로 라벨 데이터에 맞춰 조정할 수 있습니다)
+# 아래 상수는 import 시점 값이며, 판정은 현재 적용된 규칙의 기준 점수를 씁니다.
+CAPTCHA_THRESHOLD = _IMPORT_RULES['thresholds']['captcha']
+BLOCK_THRESHOLD = _IMPORT_RULES['thresholds']['block']
+
+
 def determine_security_action(total_score: int) -> str:
     """
     통합 점수를 기반으로 필요한 보안 조치를 결정합니다.
     """
-    if total_score >= 9:
-        return "BLOCK_AND_REDIRECT_MAIN" # 9점 이상이면 메인페이지로 이동 (차단/실패 처리)
-    elif total_score >= 7:
-        return "REQUIRE_CAPTCHA" # 7점 이상이면 CAPTCHA 요구
+    rules = rule_table.ACTIVE_RULES
+    if total_score >= rules.block_threshold:
+        return "BLOCK_AND_REDIRECT_MAIN" # 기본 9점 이상이면 메인페이지로 이동 (차단/실패 처리)
+    elif total_score >= rules.captcha_threshold:
+        return "REQUIRE_CAPTCHA" # 기본 7점 이상이면 CAPTCHA 요구
     else:
-        return "ALLOW_LOGIN" # 7점 미만은 로그인 허용
+        return "ALLOW_LOGIN" # 기본 7점 미만은 로그인 허용
+
+
+# 환경 변수 SCORING_PROFILE=1 이면 import 시점부터 항목별 계측을 켭니다.
+# 계측은 scoring_profiler 가 import 를 마칠 때 켜므로, scoring_profiler 를 먼저 import 하는 중이면 여기서는 부르지 않습니다.
+SCORING_PROFILE_FROM_ENV = os.environ.get('SCORING_PROFILE', '').lower() in ('1', 'true', 'yes', 'on')
+if SCORING_PROFILE_FROM_ENV and 'scoring_profiler' not in sys.modules:
+    import scoring_profiler
 
 
 # --- 테스트 예시 ---
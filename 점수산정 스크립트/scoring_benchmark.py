@@ -0,0 +1,530 @@
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+from pathlib import Path
+import argparse
+import csv
+import gc
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+import scoring
+from batch_scoring import HEADER_DATA_FILE, HISTORY_DATA_FILE, LOGIN_COLUMNS, score_login_batch
+from campaign import CampaignDetector, header_fingerprint
+from dataset_cache import DATASET_CACHE_DIR
+from login_event import LoginEvent, calculate_event_score_breakdown
+from login_load_test import load_histories_csv, percentile
+from parallel_rescoring import parallel_score
+from risk_log_rescoring import LOG_FILE, read_log_records
+from scoring import (
+    SCORE_COMPONENTS,
+    calculate_accept_score,
+    calculate_dynamic_ip_score_final_country,
+    calculate_dynamic_language_score,
+    calculate_dynamic_ua_score,
+    calculate_login_score_breakdown,
+    calculate_referer_score,
+    calculate_sec_fetch_score,
+    clear_ua_cache,
+    determine_security_action,
+    get_group_name,
+    get_ua_features,
+    set_ip_classification_index,
+)
+from scoring_profiler import profiling
+from scoring_sidecar import SIDECAR_MAX_BATCH_SIZE, SidecarScorer, normalize_login
+from shadow_scoring import DEFAULT_RULES, RuleSet, ShadowScorer
+from user_profile import UserProfile, UserProfileStore, calculate_profile_component_scores
+
+# ==============================================================================
+# 1. 골든 레코드
+# ==============================================================================
+# risk_score_log.txt 의 레코드와 헤더/기록 CSV 의 로그인을 입력 + 기대 점수 한 줄씩의 JSON Lines 로 고정합니다.
+# 입력(JSON Lines)은 저장소의 로그/CSV 로 언제든 다시 만들 수 있어 데이터셋 캐시에 두지만,
+# 기대 점수는 저장소에 올린 GOLDEN_EXPECTED_FILE 에서만 읽습니다. 현재 코드로 다시 계산하지 않으므로
+# 기준 구현(calculate_login_score_breakdown)이나 기본 규칙이 바뀌면 reference 경로부터 불일치로 드러납니다.
+# 의도한 점수 변경이면 freeze 로 파일을 다시 쓰고, 점수 변경이 보이는 diff 와 함께 커밋합니다.
+# 로그 레코드에는 login.php 가 당시 기록한 점수도 'logged' 로 함께 남깁니다 (규칙 차이 확인용, 합격 기준 아님).
+GOLDEN_DIR = DATASET_CACHE_DIR / 'golden'
+GOLDEN_FIXTURE_FILE = GOLDEN_DIR / 'golden_records.jsonl'
+GOLDEN_EXPECTED_FILE = Path(__file__).resolve().parent / 'golden_expected.csv'
+GOLDEN_SCORE_KEYS: List[str] = SCORE_COMPONENTS + ['total_score']
+BENCH_REPEAT = 5
+BENCH_PARALLEL_WORKERS = 2
+REGRESSION_TOLERANCE = 0.2  # 기준 실행보다 20% 이상 느려지면 회귀로 판단
+
+
+def _expected_scores(scores: Dict[str, int]) -> Dict[str, int]:
+    expected = {name: int(scores[name]) for name in SCORE_COMPONENTS}
+    expected['total_score'] = sum(expected.values())
+    return expected
+
+
+def reference_breakdown(fixture: Dict[str, Any]) -> Dict[str, int]:
+    """UA 파싱/IP 그룹 캐시를 비운 뒤 스칼라 함수로 계산합니다. 모든 최적화 경로의 비교 기준입니다."""
+    clear_ua_cache()
+    set_ip_classification_index(scoring.IP_CLASSIFICATION_INDEX)  # 같은 색인을 다시 설정해 IP 그룹 캐시만 비움
+    return _expected_scores(calculate_login_score_breakdown(
+        *(fixture[name] for name in LOGIN_COLUMNS),
+        fixture['ip_history'], fixture['ua_history'], fixture['lang_history']
+    ))
+
+
+def build_golden_fixtures(log_file: Path, header_file: Path, history_file: Path,
+                          limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """
+    로그 레코드와 CSV 로그인을 골든 레코드 입력 리스트로 만듭니다. 각 레코드의 key 는 경로 간 사용자 키로도 쓰입니다.
+    기대 점수는 attach_expected 로 붙입니다.
+    """
+    fixtures: List[Dict[str, Any]] = []
+    for offset, record in read_log_records(log_file):
+        fixture = {'key': f"log:{offset}", 'source': 'log'}
+        fixture.update({name: record.get(name) for name in LOGIN_COLUMNS})
+        fixture['ip_history'] = list(record.get('ip_history') or [])
+        fixture['ua_history'] = list(record.get('ua_history') or [])
+        fixture['lang_history'] = list(record.get('lang_history') or [])
+        fixture['logged'] = {name: record.get(name) for name in GOLDEN_SCORE_KEYS}
+        fixtures.append(fixture)
+
+    histories = load_histories_csv(history_file)
+    with open(header_file, 'r', encoding='utf-8', newline='') as file:
+        for count, row in enumerate(csv.DictReader(file)):
+            if limit is not None and count >= limit:
+                break
+            ip_history, ua_history, language_history = histories.get(row['userid'], ([], [], []))
+            fixture = {'key': f"csv:{count}", 'source': 'csv'}
+            fixture.update({name: row.get(name, row.get(name.replace('_', '-'))) for name in LOGIN_COLUMNS})
+            fixture.update(ip_history=list(ip_history), ua_history=list(ua_history), lang_history=list(language_history))
+            fixtures.append(fixture)
+    return fixtures
+
+
+def save_expected(fixtures: Sequence[Dict[str, Any]], path: Path) -> None:
+    """기준 구현으로 계산한 항목 점수를 key 순서대로 CSV 에 고정합니다 (합계는 읽을 때 다시 더함)."""
+    with open(path, 'w', encoding='utf-8', newline='') as file:
+        writer = csv.writer(file, lineterminator='\n')
+        writer.writerow(['key'] + SCORE_COMPONENTS)
+        for fixture in fixtures:
+            expected = reference_breakdown(fixture)
+            writer.writerow([fixture['key']] + [expected[name] for name in SCORE_COMPONENTS])
+
+
+def load_expected(path: Path) -> Dict[str, Dict[str, int]]:
+    with open(path, 'r', encoding='utf-8', newline='') as file:
+        return {row['key']: _expected_scores(row) for row in csv.DictReader(file)}
+
+
+def attach_expected(fixtures: Sequence[Dict[str, Any]], expected: Dict[str, Dict[str, int]]) -> None:
+    """고정된 기대 점수와 조치를 골든 레코드에 붙입니다. 레코드 구성이 고정 파일과 다르면 ValueError."""
+    missing = [fixture['key'] for fixture in fixtures if fixture['key'] not in expected]
+    if missing or len(expected) != len(fixtures):
+        raise ValueError(f"골든 레코드 {len(fixtures):,}건과 기대 점수 {len(expected):,}건이 맞지 않습니다 "
+                         f"(기대 점수 없는 레코드 {len(missing):,}건, 예: {missing[:3]})")
+    for fixture in fixtures:
+        fixture['expected'] = expected[fixture['key']]
+        fixture['action'] = determine_security_action(fixture['expected']['total_score'])
+
+
+def save_fixtures(fixtures: Sequence[Dict[str, Any]], path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as file:
+        for fixture in fixtures:
+            file.write(json.dumps(fixture, ensure_ascii=False) + '\n')
+
+
+def load_fixtures(path: Path) -> List[Dict[str, Any]]:
+    with open(path, 'r', encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+# ==============================================================================
+# 2. 점수화 경로
+# ==============================================================================
+# 경로마다 (레코드 순서대로의 항목 점수 dict 리스트, 호출 단위 지연(us) 리스트) 를 반환합니다.
+# 배치형 경로의 지연은 배치 한 번의 시간입니다. 속도/캠페인/유출처럼 요청 간 상태가 필요한 점수는 비교하지 않습니다.
+PathResult = Tuple[List[Dict[str, int]], List[float]]
+
+
+def _timed_each(fixtures: Sequence[Dict[str, Any]], score: Callable[[Dict[str, Any]], Dict[str, int]]) -> PathResult:
+    results, latencies = [], []
+    clock = time.perf_counter
+    for fixture in fixtures:
+        start = clock()
+        scores = score(fixture)
+        latencies.append((clock() - start) * 1e6)
+        results.append(_expected_scores(scores))
+    return results, latencies
+
+
+def _history_args(fixture: Dict[str, Any]) -> Tuple[List[str], List[str], List[str]]:
+    return fixture['ip_history'], fixture['ua_history'], fixture['lang_history']
+
+
+def path_reference(fixtures: Sequence[Dict[str, Any]]) -> PathResult:
+    return _timed_each(fixtures, reference_breakdown)
+
+
+def path_scalar(fixtures: Sequence[Dict[str, Any]]) -> PathResult:
+    """캐시가 데워진 상태의 calculate_login_score_breakdown."""
+    return _timed_each(fixtures, lambda fixture: calculate_login_score_breakdown(
+        *(fixture[name] for name in LOGIN_COLUMNS), *_history_args(fixture)
+    ))
+
+
+def path_profiled(fixtures: Sequence[Dict[str, Any]]) -> PathResult:
+    """scoring_profiler 계측 경로 (_profiled_login_score_breakdown)."""
+    with profiling():
+        return path_scalar(fixtures)
+
+
+def path_event(fixtures: Sequence[Dict[str, Any]]) -> PathResult:
+    """LoginEvent 로 변환한 뒤 calculate_event_score_breakdown."""
+    return _timed_each(fixtures, lambda fixture: calculate_event_score_breakdown(
+        LoginEvent.from_log_record(fixture), *_history_args(fixture)
+    ))
+
+
+def path_profile(fixtures: Sequence[Dict[str, Any]]) -> PathResult:
+    """UserProfile 기반 calculate_profile_component_scores. 프로필 생성 시간은 측정에서 제외합니다."""
+    profiles = {fixture['key']: UserProfile.from_history(*_history_args(fixture)) for fixture in fixtures}
+    return _timed_each(fixtures, lambda fixture: calculate_profile_component_scores(
+        profiles[fixture['key']], *(fixture[name] for name in LOGIN_COLUMNS)
+    ))
+
+
+def path_shadow(fixtures: Sequence[Dict[str, Any]]) -> PathResult:
+    """shadow_scoring.ShadowScorer (공유 특징 + 현재 규칙, 기본 규칙을 후보로 매번 함께 평가)."""
+    shadow = ShadowScorer(candidate=RuleSet(DEFAULT_RULES, name='candidate'), latency_budget_us=0)
+    return _timed_each(fixtures, lambda fixture: shadow.score_breakdown(
+        *(fixture[name] for name in LOGIN_COLUMNS), *_history_args(fixture)
+    ))
+
+
+def _fixture_frame(fixtures: Sequence[Dict[str, Any]]) -> pd.DataFrame:
+    frame = pd.DataFrame({name: [fixture[name] for fixture in fixtures] for name in LOGIN_COLUMNS}, dtype=object)
+    frame['userid'] = [fixture['key'] for fixture in fixtures]
+    return frame
+
+
+def _split_columns(columns: Dict[str, Any]) -> List[Dict[str, int]]:
+    size = len(columns['total_score'])
+    return [_expected_scores({name: columns[name][index] for name in SCORE_COMPONENTS}) for index in range(size)]
+
+
+def path_batch(fixtures: Sequence[Dict[str, Any]]) -> PathResult:
+    """batch_scoring.score_login_batch 한 번으로 전체 레코드."""
+    columns = {name: [fixture[name] for fixture in fixtures] for name in LOGIN_COLUMNS}
+    histories = [[fixture[name] for fixture in fixtures] for name in ('ip_history', 'ua_history', 'lang_history')]
+    start = time.perf_counter()
+    result = score_login_batch(columns, *histories)
+    return _split_columns(result), [(time.perf_counter() - start) * 1e6]
+
+
+def path_parallel(fixtures: Sequence[Dict[str, Any]], workers: int = BENCH_PARALLEL_WORKERS) -> PathResult:
+    """parallel_rescoring.parallel_score (사용자 기준 샤드, 프로세스 풀)."""
+    frame = _fixture_frame(fixtures)
+    histories = {fixture['key']: _history_args(fixture) for fixture in fixtures}
+    start = time.perf_counter()
+    result = parallel_score(frame, histories, workers)
+    return _split_columns(result), [(time.perf_counter() - start) * 1e6]
+
+
+def path_sidecar(fixtures: Sequence[Dict[str, Any]]) -> PathResult:
+    """scoring_sidecar.SidecarScorer.score_batch (마이크로 배치 크기 단위)."""
+    store = UserProfileStore()
+    for fixture in fixtures:
+        store.profiles[fixture['key']] = UserProfile.from_history(*_history_args(fixture))
+    scorer = SidecarScorer(store)
+    logins = []
+    for fixture in fixtures:
+        login = normalize_login(fixture)
+        login['user_id'] = fixture['key']
+        logins.append(login)
+
+    results, latencies = [], []
+    for offset in range(0, len(logins), SIDECAR_MAX_BATCH_SIZE):
+        start = time.perf_counter()
+        batch = scorer.score_batch(logins[offset:offset + SIDECAR_MAX_BATCH_SIZE])
+        latencies.append((time.perf_counter() - start) * 1e6)
+        results.extend(_expected_scores(result['scores']) for result in batch)
+    return results, latencies
+
+
+SCORING_PATHS: Dict[str, Callable[[Sequence[Dict[str, Any]]], PathResult]] = {
+    'reference': path_reference,
+    'scalar': path_scalar,
+    'profiled': path_profiled,
+    'event': path_event,
+    'profile': path_profile,
+    'shadow': path_shadow,
+    'batch': path_batch,
+    'parallel': path_parallel,
+    'sidecar': path_sidecar,
+}
+
+
+# ==============================================================================
+# 3. 정확성 검사와 성능 측정
+# ==============================================================================
+
+def check_path(fixtures: Sequence[Dict[str, Any]], results: Sequence[Dict[str, int]]) -> Dict[str, Any]:
+    """경로 결과를 골든 기대 점수와 비교합니다. (결과가 레코드 수의 배수면 반복 실행으로 보고 순환 비교)"""
+    mismatches, first = 0, None
+    for index, scores in enumerate(results):
+        fixture = fixtures[index % len(fixtures)]
+        if scores != fixture['expected']:
+            mismatches += 1
+            if first is None:
+                first = {'key': fixture['key'], 'expected': fixture['expected'], 'actual': scores}
+    return {'checked': len(results), 'mismatches': mismatches, 'first_mismatch': first}
+
+
+def _without_gc(function: Callable[[], Any]) -> Any:
+    """timeit 과 같이 측정 중에는 순환 GC 를 끕니다 (실행마다 GC 시점이 달라 생기는 편차 제거)."""
+    gc.collect()
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        return function()
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def measure_functions(fixtures: Sequence[Dict[str, Any]], repeat: int = BENCH_REPEAT) -> Dict[str, Dict[str, float]]:
+    """scoring.py 항목 함수별 호출당 시간(us). 캐시가 데워진 상태에서 repeat 번 중 가장 빠른 값을 씁니다."""
+    features = [get_ua_features(fixture['user_agent']) for fixture in fixtures]
+    calls: Dict[str, Callable[[int, Dict[str, Any]], Any]] = {
+        'get_ua_features': lambda i, f: get_ua_features(f['user_agent']),
+        'get_group_name': lambda i, f: get_group_name(f['ip']),
+        'ip_score': lambda i, f: calculate_dynamic_ip_score_final_country(f['ip'], f['ip_history']),
+        'ua_score': lambda i, f: calculate_dynamic_ua_score(f['user_agent'], f['ua_history'], features[i]),
+        'lang_score': lambda i, f: calculate_dynamic_language_score(f['accept_language'], f['lang_history']),
+        'referer_score': lambda i, f: calculate_referer_score(f['referer']),
+        'accept_score': lambda i, f: calculate_accept_score(f['accept'], f['user_agent'], features[i]),
+        'sec_fetch_score': lambda i, f: calculate_sec_fetch_score(
+            f['user_agent'], f['sec_fetch_site'], f['sec_fetch_mode'], f['sec_fetch_dest'], f['sec_fetch_user'],
+            features[i]
+        ),
+        'determine_security_action': lambda i, f: determine_security_action(f['expected']['total_score']),
+    }
+    report = {}
+    for name, call in calls.items():
+        best = float('inf')
+        for _ in range(repeat):
+            def timed() -> float:
+                start = time.perf_counter()
+                for index, fixture in enumerate(fixtures):
+                    call(index, fixture)
+                return time.perf_counter() - start
+            best = min(best, _without_gc(timed))
+        report[name] = {'calls': len(fixtures), 'us_per_call': best / len(fixtures) * 1e6}
+    return report
+
+
+def measure_paths(fixtures: Sequence[Dict[str, Any]], paths: Sequence[str],
+                  repeat: int = BENCH_REPEAT) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+    """경로마다 정확성 결과와 (가장 빠른 실행 기준) 처리량/지연 백분위를 구합니다."""
+    correctness, performance = {}, {}
+    path_scalar(fixtures)  # 캐시를 데워 경로 순서와 관계없이 같은 조건에서 측정
+    for name in paths:
+        best_seconds, best_latencies = float('inf'), []
+        for run in range(repeat):
+            results, latencies = _without_gc(lambda: SCORING_PATHS[name](fixtures))
+            if run == 0:
+                correctness[name] = check_path(fixtures, results)
+            seconds = sum(latencies) / 1e6
+            if seconds < best_seconds:
+                best_seconds, best_latencies, rows = seconds, sorted(latencies), len(results)
+        performance[name] = {
+            'rows': rows,
+            'seconds': best_seconds,
+            'rows_per_second': rows / best_seconds if best_seconds else 0.0,
+            'latency_us': {str(q): percentile(best_latencies, q) for q in (50, 95, 99)},
+            'latency_unit': 'call' if len(best_latencies) == rows else 'batch',
+        }
+    return correctness, performance
+
+
+# 사이드카 JSON 본문에서 헤더 자리에 올 수 있는 문자열이 아닌 값들
+MALFORMED_HEADER_VALUES: List[Any] = [0, 7, 1.5, float('nan'), True, ['x'], {'k': 'v'}]
+
+
+def check_malformed_inputs() -> Dict[str, Any]:
+    """
+    헤더 자리에 문자열이 아닌 값이 와도 캠페인 지문과 탐지기가 예외 없이 동작하는지 확인합니다.
+    (지문 계산의 TypeError 가 사이드카 마이크로 배치 전체를 실패시킨 문제의 회귀 검사)
+    """
+    detector = CampaignDetector()
+    failures = []
+    for position in range(7):
+        for value in MALFORMED_HEADER_VALUES:
+            headers: List[Any] = ['Mozilla/5.0', 'text/html', 'ko-KR', 'same-origin', 'navigate', 'document', '?1']
+            headers[position] = value
+            try:
+                if not isinstance(header_fingerprint(*headers), int):
+                    raise TypeError("지문이 int 가 아님")
+                detector.observe('10.0.0.1', 'user', *headers, now=0.0)
+            except Exception as error:
+                failures.append(f"{position}:{value!r}: {type(error).__name__}: {error}")
+    # None 과 빈 문자열은 같은 지문이어야 함
+    if header_fingerprint(None, None, None, None, None, None, None) != header_fingerprint('', '', '', '', '', '', ''):
+        failures.append("None 과 빈 문자열의 지문이 다름")
+    return {'checked': 7 * len(MALFORMED_HEADER_VALUES) + 1, 'failures': failures}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              cwd=Path(__file__).resolve().parent, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(fixtures: Sequence[Dict[str, Any]], paths: Sequence[str] = tuple(SCORING_PATHS),
+              repeat: int = BENCH_REPEAT) -> Dict[str, Any]:
+    """골든 레코드로 모든 경로를 검사/측정한 결과 dict (JSON 으로 저장해 실행 간 비교)."""
+    correctness, performance = measure_paths(fixtures, paths, repeat)
+    malformed = check_malformed_inputs()
+    functions = measure_functions(fixtures, repeat)
+    logged = [fixture for fixture in fixtures if fixture.get('logged')]
+    return {
+        'created': time.strftime('%Y-%m-%d %H:%M:%S'),
+        'git_commit': _git_commit(),
+        'python': sys.version.split()[0],
+        'platform': platform.platform(),
+        'fixtures': len(fixtures),
+        'passed': all(result['mismatches'] == 0 for result in correctness.values()) and not malformed['failures'],
+        'correctness': correctness,
+        'malformed_inputs': malformed,
+        # login.php 가 기록한 점수와 현재 기준 구현이 다른 로그 레코드 수 (PHP/Python 규칙 차이 확인용)
+        'logged_divergence': sum(fixture['logged'] != fixture['expected'] for fixture in logged),
+        'logged_records': len(logged),
+        'functions': functions,
+        'paths': performance,
+    }
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any],
+                    tolerance: float = REGRESSION_TOLERANCE) -> List[Dict[str, Any]]:
+    """
+    두 실행 결과의 경로별 처리량, 함수별 호출당 시간을 비교합니다.
+    각 행의 ratio 는 current / baseline 소요 시간 비율이며, 1 + tolerance 를 넘으면 regression 입니다.
+    같은 기계에서 --repeat 를 충분히 준 두 실행끼리 비교해야 합니다 (공유 서버에서는 실행 간 편차가 큼).
+    """
+    rows = []
+    for name, stats in current['paths'].items():
+        if name in baseline['paths'] and stats['rows_per_second']:
+            ratio = baseline['paths'][name]['rows_per_second'] / stats['rows_per_second']
+            rows.append({'kind': 'path', 'name': name, 'baseline': baseline['paths'][name]['rows_per_second'],
+                         'current': stats['rows_per_second'], 'ratio': ratio, 'regression': ratio > 1 + tolerance})
+    for name, stats in current['functions'].items():
+        if name in baseline['functions'] and baseline['functions'][name]['us_per_call']:
+            ratio = stats['us_per_call'] / baseline['functions'][name]['us_per_call']
+            rows.append({'kind': 'function', 'name': name, 'baseline': baseline['functions'][name]['us_per_call'],
+                         'current': stats['us_per_call'], 'ratio': ratio, 'regression': ratio > 1 + tolerance})
+    return rows
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    print(f"골든 레코드 {report['fixtures']:,}건 (커밋 {report['git_commit']}, Python {report['python']})")
+    print(f"{'경로':<11}{'불일치':>8}{'행/s':>12}{'p50(us)':>11}{'p99(us)':>11}  단위")
+    for name, stats in report['paths'].items():
+        print(f"{name:<11}{report['correctness'][name]['mismatches']:>8}{stats['rows_per_second']:>12,.0f}"
+              f"{stats['latency_us']['50']:>11.1f}{stats['latency_us']['99']:>11.1f}  {stats['latency_unit']}")
+    print(f"{'함수':<26}{'us/호출':>9}")
+    for name, stats in report['functions'].items():
+        print(f"{name:<26}{stats['us_per_call']:>9.3f}")
+    print(f"login.php 기록과 다른 로그 레코드: {report['logged_divergence']}/{report['logged_records']}")
+    malformed = report['malformed_inputs']
+    print(f"잘못된 입력 검사: {malformed['checked'] - len(malformed['failures'])}/{malformed['checked']} 통과")
+    for failure in malformed['failures']:
+        print(f"  {failure}")
+    print("정확성: " + ("통과" if report['passed'] else "실패"))
+
+
+def print_comparison(rows: List[Dict[str, Any]]) -> None:
+    print(f"{'종류':<10}{'이름':<26}{'기준':>12}{'현재':>12}{'시간 비율':>10}")
+    for row in rows:
+        flag = '  회귀' if row['regression'] else ''
+        print(f"{row['kind']:<10}{row['name']:<26}{row['baseline']:>12,.3f}{row['current']:>12,.3f}"
+              f"{row['ratio']:>10.2f}{flag}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="골든 레코드로 점수화 경로의 정확성과 성능을 측정합니다.")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    build = subcommands.add_parser('build', help="로그/CSV 로 골든 레코드 입력 파일 생성 (기대 점수는 고정 파일에서)")
+    freeze = subcommands.add_parser('freeze', help="build 와 같되, 현재 기준 구현의 점수로 기대 점수 파일을 다시 씀 "
+                                                   "(의도한 점수 변경 시)")
+    for command in (build, freeze):
+        command.add_argument('--log', type=Path, default=LOG_FILE, help="risk_score_log.txt")
+        command.add_argument('--headers', type=Path, default=HEADER_DATA_FILE, help="새 로그인 헤더 CSV")
+        command.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="사용자별 과거 로그인 CSV")
+        command.add_argument('--limit', type=int, help="CSV 에서 가져올 최대 행 수")
+    run = subcommands.add_parser('run', help="모든 경로 검사/측정 후 JSON 저장")
+    run.add_argument('--paths', nargs='+', choices=list(SCORING_PATHS), default=list(SCORING_PATHS))
+    run.add_argument('--repeat', type=int, default=BENCH_REPEAT, help="측정 반복 횟수 (가장 빠른 값 사용)")
+    run.add_argument('--output', type=Path, help="결과 JSON 경로 (기본: 골든 디렉터리에 시각 이름으로 저장)")
+    run.add_argument('--baseline', type=Path, help="비교할 이전 결과 JSON")
+    compare = subcommands.add_parser('compare', help="두 결과 JSON 비교")
+    compare.add_argument('baseline', type=Path)
+    compare.add_argument('current', type=Path)
+    for command in (build, run, freeze):
+        command.add_argument('--fixtures', type=Path, default=GOLDEN_FIXTURE_FILE, help="골든 레코드 JSON Lines 경로")
+        command.add_argument('--expected', type=Path, default=GOLDEN_EXPECTED_FILE, help="고정된 기대 점수 CSV")
+    for command in (run, compare):
+        command.add_argument('--tolerance', type=float, default=REGRESSION_TOLERANCE, help="회귀로 보는 감속 비율")
+    args = parser.parse_args()
+
+    if args.command in ('build', 'freeze'):
+        fixtures = build_golden_fixtures(args.log, args.headers, args.history, args.limit)
+        if args.command == 'freeze':
+            save_expected(fixtures, args.expected)
+            print(f"{args.expected}: {len(fixtures):,}건")
+        try:
+            attach_expected(fixtures, load_expected(args.expected))
+        except (OSError, ValueError) as error:
+            print(f"기대 점수 파일 오류: {error}", file=sys.stderr)
+            sys.exit(1)
+        save_fixtures(fixtures, args.fixtures)
+        print(f"{args.fixtures}: {len(fixtures):,}건")
+        sys.exit(0)
+
+    if args.command == 'compare':
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            baseline = json.load(file)
+        with open(args.current, 'r', encoding='utf-8') as file:
+            current = json.load(file)
+        rows = compare_reports(baseline, current, args.tolerance)
+        print_comparison(rows)
+        sys.exit(1 if any(row['regression'] for row in rows) or not current['passed'] else 0)
+
+    # 골든 레코드를 자동으로 다시 만들지 않으며, 캐시의 기대 점수 대신 항상 고정 파일의 값으로 검사
+    if not args.fixtures.exists():
+        print(f"{args.fixtures} 가 없습니다. 먼저 build 를 실행하세요.", file=sys.stderr)
+        sys.exit(1)
+    fixtures = load_fixtures(args.fixtures)
+    try:
+        attach_expected(fixtures, load_expected(args.expected))
+    except (OSError, ValueError) as error:
+        print(f"기대 점수 파일 오류: {error}", file=sys.stderr)
+        sys.exit(1)
+    report = run_suite(fixtures, args.paths, args.repeat)
+    output = args.output or GOLDEN_DIR / f"bench-{time.strftime('%Y%m%d-%H%M%S')}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as file:
+        json.dump(report, file, ensure_ascii=False, indent=2)
+    print_report(report)
+    print(f"결과: {output}")
+
+    regressed = False
+    if args.baseline is not None:
+        with open(args.baseline, 'r', encoding='utf-8') as file:
+            rows = compare_reports(json.load(file), report, args.tolerance)
+        print_comparison(rows)
+        regressed = any(row['regression'] for row in rows)
+    sys.exit(0 if report['passed'] and not regressed else 1)
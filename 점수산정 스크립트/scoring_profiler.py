@@ -0,0 +1,191 @@
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from contextlib import contextmanager
+from pathlib import Path
+import argparse
+import csv
+import math
+import time
+
+import scoring
+
+# ==============================================================================
+# 1. 항목별 계측기
+# ==============================================================================
+# 켜져 있는 동안 calculate_login_score_breakdown 이 각 점수 함수를 measure() 로 감싸 호출합니다.
+# SCORING_PROFILE=1 이면 scoring.py 가 import 도중 이 모듈을 불러오므로, 모듈 수준에서는 (초기화 중일 수 있는) scoring 만 import 합니다.
+# (batch_scoring, login_load_test 는 scoring 을 import 하므로 CLI 에서만 불러옴)
+# 항목마다 호출 수, 누적 시간, 0점이 아닌 결과 수(적중), 최근 sample_size 개 소요 시간을 보관합니다.
+PROFILER_SAMPLE_SIZE = 10000
+
+
+class ComponentStats:
+    """점수 항목 하나의 누적 통계. 최근 소요 시간은 고정 크기 고리 버퍼에 보관합니다."""
+
+    __slots__ = ('calls', 'hits', 'total_ns', 'samples', 'position')
+
+    def __init__(self, sample_size: int) -> None:
+        self.calls = 0
+        self.hits = 0
+        self.total_ns = 0
+        self.samples: List[int] = [0] * sample_size
+        self.position = 0
+
+    def add(self, elapsed_ns: int, hit: bool) -> None:
+        self.calls += 1
+        self.hits += hit
+        self.total_ns += elapsed_ns
+        self.samples[self.position] = elapsed_ns
+        self.position = (self.position + 1) % len(self.samples)
+
+    def percentiles_us(self, quantiles: List[float]) -> Dict[float, float]:
+        """보관 중인 표본에서 백분위수(마이크로초)를 구합니다."""
+        recorded = sorted(self.samples[:min(self.calls, len(self.samples))])
+        if not recorded:
+            return {q: 0.0 for q in quantiles}
+        return {q: recorded[max(0, math.ceil(q / 100 * len(recorded)) - 1)] / 1000 for q in quantiles}
+
+
+class ScoringProfiler:
+    """
+    점수 항목별 호출 수, 시간, 적중률을 기록합니다.
+    통계 갱신에 잠금을 쓰지 않으므로 멀티스레드에서 측정하면 근사값이 됩니다.
+    """
+
+    clock = staticmethod(time.perf_counter_ns)
+
+    def __init__(self, sample_size: int = PROFILER_SAMPLE_SIZE) -> None:
+        self.sample_size = sample_size
+        self.stats: Dict[str, ComponentStats] = {}
+
+    def record(self, name: str, elapsed_ns: int, result: Any) -> None:
+        stats = self.stats.get(name)
+        if stats is None:
+            stats = self.stats[name] = ComponentStats(self.sample_size)
+        stats.add(elapsed_ns, type(result) is int and result > 0)
+
+    def measure(self, name: str, function: Callable[..., Any], *args: Any) -> Any:
+        """function(*args) 를 호출하고 소요 시간과 0점 초과 여부를 name 항목에 기록합니다."""
+        start = time.perf_counter_ns()
+        result = function(*args)
+        self.record(name, time.perf_counter_ns() - start, result)
+        return result
+
+    def reset(self) -> None:
+        self.stats.clear()
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """항목별 통계를 dict 로 반환합니다. 시간 단위는 초(total_seconds) 와 마이크로초(*_us) 입니다."""
+        result = {}
+        for name, stats in self.stats.items():
+            percentiles = stats.percentiles_us([50, 95, 99])
+            result[name] = {
+                'calls': stats.calls,
+                'hits': stats.hits,
+                'hit_rate': stats.hits / stats.calls if stats.calls else 0.0,
+                'total_seconds': stats.total_ns / 1e9,
+                'mean_us': stats.total_ns / stats.calls / 1000 if stats.calls else 0.0,
+                'p50_us': percentiles[50],
+                'p95_us': percentiles[95],
+                'p99_us': percentiles[99],
+            }
+        return result
+
+    def to_prometheus(self, prefix: str = 'login_scoring') -> str:
+        """Prometheus 텍스트 노출 형식으로 통계를 반환합니다."""
+        snapshot = self.snapshot()
+        lines = []
+
+        def metric(name: str, kind: str, help_text: str, values: Dict[str, str]) -> None:
+            lines.append(f"# HELP {prefix}_{name} {help_text}")
+            lines.append(f"# TYPE {prefix}_{name} {kind}")
+            for labels, value in values.items():
+                lines.append(f"{prefix}_{name}{{{labels}}} {value}")
+
+        metric('component_calls_total', 'counter', "Number of scorer calls.",
+               {f'component="{name}"': str(stats['calls']) for name, stats in snapshot.items()})
+        metric('component_hits_total', 'counter', "Number of scorer calls with a non-zero score.",
+               {f'component="{name}"': str(stats['hits']) for name, stats in snapshot.items()})
+        metric('component_seconds_total', 'counter', "Cumulative wall-clock time spent in the scorer.",
+               {f'component="{name}"': repr(stats['total_seconds']) for name, stats in snapshot.items()})
+        metric('component_latency_seconds', 'summary', "Scorer latency quantiles over recent calls.",
+               {f'component="{name}",quantile="{q / 100}"': repr(stats[f'p{q}_us'] / 1e6)
+                for name, stats in snapshot.items() for q in (50, 95, 99)})
+        return '\n'.join(lines) + '\n'
+
+
+def enable_profiling(profiler: Optional[ScoringProfiler] = None) -> ScoringProfiler:
+    """scoring.calculate_login_score_breakdown 계측을 켜고 사용 중인 계측기를 반환합니다."""
+    scoring.SCORING_PROFILER = profiler or ScoringProfiler()
+    return scoring.SCORING_PROFILER
+
+
+def disable_profiling() -> None:
+    scoring.SCORING_PROFILER = None
+
+
+def get_profiler() -> Optional[ScoringProfiler]:
+    return scoring.SCORING_PROFILER
+
+
+# SCORING_PROFILE=1 계측은 이 모듈이 정의를 마친 뒤 켭니다 (scoring 과 어느 쪽을 먼저 import 해도 동작).
+if scoring.SCORING_PROFILE_FROM_ENV and scoring.SCORING_PROFILER is None:
+    enable_profiling()
+
+
+@contextmanager
+def profiling(profiler: Optional[ScoringProfiler] = None) -> Iterator[ScoringProfiler]:
+    """with 블록 안에서만 계측을 켭니다. 블록이 끝나면 이전 상태로 되돌립니다."""
+    previous = scoring.SCORING_PROFILER
+    active = enable_profiling(profiler)
+    try:
+        yield active
+    finally:
+        scoring.SCORING_PROFILER = previous
+
+
+# ==============================================================================
+# 2. 데이터셋 실행 CLI
+# ==============================================================================
+def run_dataset(header_file: Path, history_file: Path, limit: Optional[int] = None) -> ScoringProfiler:
+    """헤더 CSV 의 각 행을 기록 CSV 의 사용자 기록으로 점수화하며 계측합니다."""
+    from login_load_test import load_histories_csv
+
+    histories = load_histories_csv(history_file)
+    with open(header_file, 'r', encoding='utf-8', newline='') as file, profiling() as profiler:
+        for count, row in enumerate(csv.DictReader(file)):
+            if limit is not None and count >= limit:
+                break
+            ip_history, ua_history, language_history = histories.get(row['userid'], ([], [], []))
+            scoring.calculate_login_score_breakdown(
+                row['ip'], row['user_agent'], row['accept'], row['accept_language'], row['referer'],
+                row['sec-fetch-site'], row['sec-fetch-mode'], row['sec-fetch-dest'], row['sec-fetch-user'],
+                ip_history, ua_history, language_history
+            )
+    return profiler
+
+
+def print_breakdown(profiler: ScoringProfiler) -> None:
+    snapshot = profiler.snapshot()
+    overall = snapshot.get('total_score', {}).get('total_seconds', 0.0) or 1.0
+    print(f"{'항목':<16}{'호출':>9}{'적중률':>9}{'누적(ms)':>11}{'비중':>8}{'p50(us)':>10}{'p95(us)':>10}{'p99(us)':>10}")
+    for name, stats in sorted(snapshot.items(), key=lambda item: -item[1]['total_seconds']):
+        print(f"{name:<16}{stats['calls']:>9}{stats['hit_rate']:>9.1%}{stats['total_seconds'] * 1000:>11.1f}"
+              f"{stats['total_seconds'] / overall:>8.1%}{stats['p50_us']:>10.2f}{stats['p95_us']:>10.2f}"
+              f"{stats['p99_us']:>10.2f}")
+
+
+if __name__ == '__main__':
+    from batch_scoring import HEADER_DATA_FILE, HISTORY_DATA_FILE
+
+    parser = argparse.ArgumentParser(description="데이터셋을 점수화하며 항목별 호출 수/시간/적중률을 출력합니다.")
+    parser.add_argument('--headers', type=Path, default=HEADER_DATA_FILE, help="새 로그인 헤더 CSV")
+    parser.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="사용자별 과거 로그인 CSV")
+    parser.add_argument('--limit', type=int, help="처리할 최대 행 수")
+    parser.add_argument('--prometheus', action='store_true', help="Prometheus 텍스트 형식으로 출력")
+    args = parser.parse_args()
+
+    result = run_dataset(args.headers, args.history, args.limit)
+    if args.prometheus:
+        print(result.to_prometheus(), end='')
+    else:
+        print_breakdown(result)
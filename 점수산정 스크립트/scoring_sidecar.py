@@ -0,0 +1,510 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from collections import deque
+from pathlib import Path
+import argparse
+import asyncio
+import json
+import time
+
+import rule_table
+from batch_scoring import HEADER_DATA_FILE, HISTORY_DATA_FILE, LOGIN_COLUMNS
+from breach_filter import BREACH_CREDENTIAL_SCORE, BreachFilter, calculate_breach_score
+from campaign import CampaignDetector
+from login_load_test import load_histories_csv, percentile, read_replay_rows
+from scoring import (
+    SCORE_COMPONENTS,
+    calculate_accept_score,
+    calculate_referer_score,
+    calculate_sec_fetch_score,
+    get_ua_features,
+)
+from user_profile import UserProfile, UserProfileStore
+from velocity import VelocityTracker
+
+# ==============================================================================
+# 1. 배치 점수기
+# ==============================================================================
+# login.php 가 로그인마다 로컬 HTTP(또는 Unix 소켓)로 점수를 물어보는 상주 서비스입니다.
+# 사용자 프로필은 메모리에 올려 두고(user_profile.py), 동시에 들어온 요청은 몇 ms 단위로 모아 한 번에 점수화합니다.
+SIDECAR_MAX_BATCH_SIZE = 64
+SIDECAR_MAX_WAIT_MS = 2.0
+SIDECAR_MAX_PENDING = 4096  # 대기 중인 요청이 이보다 많으면 503 으로 즉시 거절
+SIDECAR_MAX_CONNECTIONS = 1024
+SIDECAR_MAX_BODY_BYTES = 64 * 1024
+
+# 0점이 아닌 항목의 사유 문구 (login.php 의 reasons 와 같은 용도)
+COMPONENT_REASONS: Dict[str, str] = {
+    'ip_score': "평소와 다른 IP 대역",
+    'ua_score': "평소와 다른 User-Agent",
+    'lang_score': "평소와 다른 Accept-Language",
+    'referer_score': "Referer 이상",
+    'accept_score': "브라우저와 Accept 헤더 불일치",
+    'sec_fetch_score': "Sec-Fetch 헤더 불일치",
+}
+# 악성 IP / 봇 UA 판정(규칙의 ip.malicious, ua.bot 점수)의 사유 문구
+BLOCKING_REASONS: Dict[str, str] = {
+    'ip_score': "악성 IP 대역",
+    'ua_score': "봇 User-Agent 감지",
+}
+# 유출 자격 증명 점수의 사유 문구
+BREACH_CREDENTIAL_REASON = "유출된 계정/비밀번호 조합"
+BREACH_PASSWORD_REASON = "유출 목록에 있는 비밀번호"
+
+
+def score_reasons(scores: Dict[str, int], rules: Optional[rule_table.CompiledRules] = None) -> List[str]:
+    """항목별 점수에서 0점이 아닌 항목의 사유 목록을 만듭니다."""
+    rules = rules or rule_table.ACTIVE_RULES
+    blocking_scores = {'ip_score': rules.ip_malicious, 'ua_score': rules.ua_bot}
+    reasons = [BLOCKING_REASONS[name] if name in blocking_scores and scores[name] >= blocking_scores[name]
+               else COMPONENT_REASONS[name]
+               for name in SCORE_COMPONENTS if scores[name]]
+    if scores.get('breach_score'):
+        reasons.append(BREACH_CREDENTIAL_REASON if scores['breach_score'] >= BREACH_CREDENTIAL_SCORE
+                       else BREACH_PASSWORD_REASON)
+    return reasons
+
+
+class SidecarOverloaded(Exception):
+    """대기열이 가득 차 요청을 받을 수 없음."""
+
+
+class SidecarScorer:
+    """
+    메모리의 UserProfileStore, VelocityTracker, CampaignDetector, BreachFilter 로 로그인 묶음을 점수화합니다.
+    항목 점수는 scoring.calculate_login_score_breakdown 과 같으며, 헤더만으로 정해지는 항목은
+    묶음 안에서 같은 헤더 조합마다 한 번만 계산합니다.
+    점수 규칙은 묶음마다 rule_table.ACTIVE_RULES 를 한 번 읽어 씁니다.
+    score_batch 는 헤더·프로필 항목 점수를 묶음 전체에 대해 먼저 계산한 뒤 속도/캠페인 기록을 갱신하므로,
+    항목 점수 계산에서 예외가 나면 묶음의 어느 로그인도 기록되지 않은 상태로 끝납니다.
+    """
+
+    def __init__(
+            self,
+            profiles: UserProfileStore,
+            velocity: Optional[VelocityTracker] = None,
+            campaign: Optional[CampaignDetector] = None,
+            breach: Optional[BreachFilter] = None
+    ) -> None:
+        self.profiles = profiles
+        self.velocity = velocity if velocity is not None else VelocityTracker()
+        self.campaign = campaign if campaign is not None else CampaignDetector()
+        self.breach = breach
+        self.empty_profile = UserProfile()
+        self.rules = rule_table.ACTIVE_RULES
+        self.rule_swaps = 0
+
+    def _use_rules(self, rules: rule_table.CompiledRules) -> None:
+        """교체된 규칙으로 바꾸고 교체 횟수를 셉니다."""
+        self.rules = rules
+        self.rule_swaps += 1
+
+    def _header_profile_scores(
+            self,
+            login: Dict[str, Any],
+            header_key: Tuple[Any, ...],
+            header_scores: Dict[Tuple[Any, ...], Tuple[Dict[str, str], int, int, int]],
+            rules: rule_table.CompiledRules
+    ) -> Dict[str, int]:
+        ua = header_key[0]
+        cached = header_scores.get(header_key)
+        if cached is None:
+            ua_features = get_ua_features(ua)
+            cached = header_scores[header_key] = (
+                ua_features,
+                calculate_referer_score(header_key[2], rules),
+                calculate_accept_score(header_key[1], ua, ua_features, rules),
+                calculate_sec_fetch_score(ua, *header_key[3:], ua_features, rules),
+            )
+        ua_features, referer_score, accept_score, sec_fetch_score = cached
+
+        # 기록이 없는 사용자는 저장소에 빈 프로필을 만들지 않고 공용 빈 프로필로 점수화
+        profile = self.profiles.profiles.get(login.get('user_id'), self.empty_profile)
+        return {
+            'ip_score': profile.ip_score(login.get('ip'), rules),
+            'ua_score': profile.ua_score(ua, ua_features, rules),
+            'lang_score': profile.language_score(login.get('accept_language'), rules),
+            'referer_score': referer_score,
+            'accept_score': accept_score,
+            'sec_fetch_score': sec_fetch_score,
+        }
+
+    def score_batch(self, logins: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        now = time.time()
+        rules = rule_table.ACTIVE_RULES
+        if rules is not self.rules:
+            self._use_rules(rules)
+        header_scores: Dict[Tuple[Any, ...], Tuple[Dict[str, str], int, int, int]] = {}
+        scored = []
+        for login in logins:
+            ua = login.get('user_agent')
+            header_key = (ua, login.get('accept'), login.get('referer'), login.get('sec_fetch_site'),
+                          login.get('sec_fetch_mode'), login.get('sec_fetch_dest'), login.get('sec_fetch_user'))
+            scores = self._header_profile_scores(login, header_key, header_scores, rules)
+            scored.append((login, header_key, scores))
+
+        results = []
+        for login, header_key, scores in scored:
+            ua = header_key[0]
+            user_id = login.get('user_id')
+            velocity_score, reasons = self.velocity.observe(login.get('ip'), user_id, now)
+            campaign_score, campaign_reasons = self.campaign.observe(
+                login.get('ip'), user_id, ua, header_key[1], login.get('accept_language'), *header_key[3:], now=now
+            )
+            scores['velocity_score'] = velocity_score
+            scores['campaign_score'] = campaign_score
+            scores['breach_score'] = calculate_breach_score(self.breach, user_id, login.get('password'))
+            scores['total_score'] = sum(scores.values())
+            results.append({
+                'riskScore': scores['total_score'],
+                'action': rules.determine_action(scores['total_score']),
+                'scores': scores,
+                'reasons': score_reasons(scores, rules) + reasons + campaign_reasons,
+            })
+        return results
+
+    def record_login(self, login: Dict[str, Any]) -> None:
+        """로그인 성공을 사용자 프로필에 반영합니다."""
+        self.profiles.record_login(login['user_id'], login.get('ip'), login.get('user_agent'),
+                                   login.get('accept_language'))
+
+
+class MicroBatcher:
+    """
+    동시에 들어온 요청을 모아 score_batch 한 번으로 처리합니다.
+    첫 요청 뒤 이벤트 루프에 양보하며 이미 도착한 요청을 모으고, 양보 사이에 새 요청이 더 들어오지 않거나
+    max_wait 초가 지나거나 max_batch_size 개가 모이면 묶음을 점수화합니다. 타이머로 기다리지 않으므로
+    부하가 낮을 때는 대기 시간이 추가되지 않습니다.
+    대기 중인 요청이 max_pending 개를 넘으면 submit 이 SidecarOverloaded 를 발생시킵니다.
+    묶음 점수화가 예외로 실패하면 요청을 하나씩 다시 점수화해, 실패한 요청에만 예외를 돌려줍니다.
+    """
+
+    def __init__(
+            self,
+            score_batch: Callable[[List[Dict[str, Any]]], List[Dict[str, Any]]],
+            max_batch_size: int = SIDECAR_MAX_BATCH_SIZE,
+            max_wait: float = SIDECAR_MAX_WAIT_MS / 1000,
+            max_pending: int = SIDECAR_MAX_PENDING
+    ) -> None:
+        self.score_batch = score_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.max_pending = max_pending
+        self.pending: deque = deque()
+        self.arrived = asyncio.Event()
+        self.batches = 0
+        self.scored = 0
+        self.rejected = 0
+        self.failed = 0
+
+    async def submit(self, login: Dict[str, Any]) -> Dict[str, Any]:
+        if len(self.pending) >= self.max_pending:
+            self.rejected += 1
+            raise SidecarOverloaded()
+        future = asyncio.get_running_loop().create_future()
+        self.pending.append((login, future))
+        self.arrived.set()
+        return await future
+
+    async def run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await self.arrived.wait()
+            deadline = loop.time() + self.max_wait
+            collected = 0
+            while collected != len(self.pending) and len(self.pending) < self.max_batch_size and loop.time() < deadline:
+                collected = len(self.pending)
+                await asyncio.sleep(0)
+
+            batch = [self.pending.popleft() for _ in range(min(self.max_batch_size, len(self.pending)))]
+            if not self.pending:
+                self.arrived.clear()
+
+            try:
+                results = self.score_batch([login for login, _ in batch])
+            except Exception:
+                self._score_one_by_one(batch)
+                continue
+            for (_, future), result in zip(batch, results):
+                if not future.done():  # 연결이 끊겨 취소된 요청은 건너뜀
+                    future.set_result(result)
+            self.batches += 1
+            self.scored += len(batch)
+
+    def _score_one_by_one(self, batch: List[Tuple[Dict[str, Any], asyncio.Future]]) -> None:
+        """잘못된 요청 하나 때문에 같은 묶음의 다른 요청까지 실패하지 않도록 요청마다 따로 점수화합니다."""
+        for login, future in batch:
+            try:
+                result = self.score_batch([login])[0]
+            except Exception as error:
+                self.failed += 1
+                if not future.done():
+                    future.set_exception(error)
+                continue
+            if not future.done():
+                future.set_result(result)
+            self.batches += 1
+            self.scored += 1
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            'pending': len(self.pending),
+            'batches': self.batches,
+            'scored': self.scored,
+            'rejected': self.rejected,
+            'failed': self.failed,
+            'mean_batch_size': self.scored / self.batches if self.batches else 0.0,
+        }
+
+
+# ==============================================================================
+# 2. HTTP 인터페이스
+# ==============================================================================
+# POST /score   {"user_id", "ip", "user_agent", "accept", ...} -> {"riskScore", "action", "scores", "reasons"}
+#               "password" 는 선택이며 유출 자격 증명 필터 조회에만 쓰고 저장하지 않습니다.
+# POST /record  로그인 성공 후 같은 본문으로 호출하면 사용자 프로필에 반영
+# GET  /health  대기열/배치 통계와 적용 중인 규칙
+
+def normalize_login(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """요청 본문을 LOGIN_COLUMNS + user_id, password 키로 맞춥니다. (userid, sec-fetch-* 표기도 허용)"""
+    login = {name: payload.get(name, payload.get(name.replace('_', '-'))) for name in LOGIN_COLUMNS}
+    login['user_id'] = payload.get('user_id', payload.get('userid'))
+    login['password'] = payload.get('password')
+    return login
+
+
+def invalid_login_fields(login: Dict[str, Any]) -> List[str]:
+    """값이 문자열도 null 도 아닌(숫자, 배열, 객체) 항목 이름. 점수기와 프로필 저장소에는 문자열만 넘깁니다."""
+    return [name for name, value in login.items() if value is not None and not isinstance(value, str)]
+
+
+class ScoringSidecar:
+    """MicroBatcher 앞단의 HTTP/1.1 (keep-alive) 서버."""
+
+    def __init__(
+            self,
+            scorer: SidecarScorer,
+            batcher: MicroBatcher,
+            max_connections: int = SIDECAR_MAX_CONNECTIONS,
+            rule_watcher: Optional[rule_table.RuleFileWatcher] = None
+    ) -> None:
+        self.scorer = scorer
+        self.batcher = batcher
+        self.max_connections = max_connections
+        self.rule_watcher = rule_watcher
+        self.connections = 0
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        if self.connections >= self.max_connections:
+            await self._reply(writer, 503, {"error": "too many connections"}, keep_alive=False)
+            writer.close()
+            return
+        self.connections += 1
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b'\r\n\r\n')
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    return
+                request_line, *header_lines = head.decode('latin-1').split('\r\n')
+                method, path = (request_line.split(' ') + ['', ''])[:2]
+                headers = {}
+                for line in header_lines:
+                    name, _, value = line.partition(':')
+                    if name:
+                        headers[name.strip().lower()] = value.strip()
+                keep_alive = headers.get('connection', '').lower() != 'close'
+
+                try:
+                    length = int(headers.get('content-length') or 0)
+                    if length < 0:
+                        raise ValueError
+                except ValueError:
+                    # 본문 길이를 알 수 없으므로 연결을 이어 쓸 수 없음
+                    await self._reply(writer, 400, {"error": "invalid Content-Length"}, keep_alive=False)
+                    return
+                if length > SIDECAR_MAX_BODY_BYTES:
+                    await self._reply(writer, 413, {"error": "body too large"}, keep_alive=False)
+                    return
+                body = await reader.readexactly(length) if length else b''
+
+                status, payload = await self.dispatch(method, path, body)
+                await self._reply(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self.connections -= 1
+            writer.close()
+
+    async def dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, Dict[str, Any]]:
+        if method == 'GET' and path == '/health':
+            health = {'status': 'ok', 'profiles': len(self.scorer.profiles), **self.batcher.stats()}
+            health['rules'] = self.rule_watcher.stats() if self.rule_watcher is not None \
+                else rule_table.ACTIVE_RULES.summary()
+            return 200, health
+        if method != 'POST' or path not in ('/score', '/record'):
+            return 404, {"error": "not found"}
+        try:
+            payload = json.loads(body)
+            if not isinstance(payload, dict):
+                raise ValueError
+        except ValueError:
+            return 400, {"error": "JSON object body required"}
+
+        login = normalize_login(payload)
+        invalid = invalid_login_fields(login)
+        if invalid:
+            return 400, {"error": "string or null required: " + ', '.join(invalid)}
+        if path == '/record':
+            if not login['user_id']:
+                return 400, {"error": "user_id required"}
+            self.scorer.record_login(login)
+            return 200, {'recorded': True}
+        try:
+            return 200, await self.batcher.submit(login)
+        except SidecarOverloaded:
+            return 503, {"error": "overloaded"}
+        except Exception as error:
+            return 500, {"error": f"scoring failed: {type(error).__name__}"}
+
+    async def _reply(self, writer: asyncio.StreamWriter, status: int, payload: Dict[str, Any], keep_alive: bool) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        reason = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 413: 'Payload Too Large',
+                  500: 'Internal Server Error', 503: 'Service Unavailable'}[status]
+        retry_after = "Retry-After: 1\r\n" if status == 503 else ""
+        head = (f"HTTP/1.1 {status} {reason}\r\n"
+                f"Content-Type: application/json; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\n{retry_after}"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        writer.write(head.encode('latin-1') + body)
+        await writer.drain()
+
+
+def build_profiles(history_file: Optional[Path], profile_file: Optional[Path]) -> UserProfileStore:
+    """저장된 프로필 파일이 있으면 읽고, 없으면 과거 로그인 CSV 로 프로필을 만듭니다."""
+    if profile_file is not None and profile_file.exists():
+        return UserProfileStore.load(profile_file)
+    store = UserProfileStore()
+    if history_file is not None:
+        for user_id, (ips, uas, languages) in load_histories_csv(history_file).items():
+            store.profiles[user_id] = UserProfile.from_history(ips, uas, languages)
+    return store
+
+
+async def start_sidecar(
+        sidecar: ScoringSidecar,
+        host: str = '127.0.0.1',
+        port: int = 8700,
+        unix_path: Optional[Path] = None
+) -> asyncio.AbstractServer:
+    """배치 처리 작업을 띄우고 TCP(또는 unix_path 가 있으면 Unix 소켓) 서버를 시작합니다."""
+    asyncio.get_running_loop().create_task(sidecar.batcher.run())
+    if unix_path is not None:
+        return await asyncio.start_unix_server(sidecar.handle_connection, path=str(unix_path))
+    return await asyncio.start_server(sidecar.handle_connection, host, port)
+
+
+# ==============================================================================
+# 3. 부하 측정
+# ==============================================================================
+
+async def run_bench(
+        sidecar: ScoringSidecar,
+        rows: List[Dict[str, Any]],
+        total: int,
+        concurrency: int
+) -> Dict[str, Any]:
+    """사이드카를 임시 포트로 띄우고 keep-alive 연결 concurrency 개로 total 건을 보냅니다."""
+    server = await start_sidecar(sidecar, port=0)
+    port = server.sockets[0].getsockname()[1]
+    bodies = [json.dumps(normalize_login(row), ensure_ascii=False).encode('utf-8') for row in rows]
+    next_index = 0
+    latencies: List[float] = []
+
+    async def client() -> None:
+        nonlocal next_index
+        reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        while next_index < total:
+            body = bodies[next_index % len(bodies)]
+            next_index += 1
+            sent = time.perf_counter()
+            writer.write(b"POST /score HTTP/1.1\r\nHost: sidecar\r\nContent-Type: application/json\r\n"
+                         b"Content-Length: " + str(len(body)).encode() + b"\r\n\r\n" + body)
+            head = await reader.readuntil(b'\r\n\r\n')
+            length = int(head.split(b'Content-Length: ')[1].split(b'\r\n')[0])
+            await reader.readexactly(length)
+            latencies.append((time.perf_counter() - sent) * 1e6)
+        writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    duration = time.perf_counter() - started
+    server.close()
+
+    latencies.sort()
+    return {
+        'requests': len(latencies),
+        'seconds': duration,
+        'throughput': len(latencies) / duration if duration else 0.0,
+        'round_trip_us': {q: percentile(latencies, q) for q in (50, 95, 99)},
+        **sidecar.batcher.stats(),
+    }
+
+
+def make_sidecar(args: argparse.Namespace) -> ScoringSidecar:
+    # 규칙 파일을 주면 먼저 적용하고(잘못된 파일이면 시작하지 않음), 이후 수정되면 재시작 없이 다시 적용
+    watcher = None
+    if args.rules is not None:
+        watcher = rule_table.RuleFileWatcher(args.rules, args.rules_watch_interval)
+        watcher.mtime_ns = args.rules.stat().st_mtime_ns
+        rule_table.reload_rules(args.rules)
+        watcher.start()
+    breach = BreachFilter(args.breach_filter) if args.breach_filter else None
+    scorer = SidecarScorer(build_profiles(args.history, args.profiles), breach=breach)
+    batcher = MicroBatcher(scorer.score_batch, args.max_batch_size, args.max_wait_ms / 1000, args.max_pending)
+    return ScoringSidecar(scorer, batcher, args.max_connections, watcher)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="요청을 마이크로 배치로 묶어 점수화하는 asyncio 점수 사이드카")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    serve = subcommands.add_parser('serve', help="사이드카 실행")
+    serve.add_argument('--host', default='127.0.0.1')
+    serve.add_argument('--port', type=int, default=8700)
+    serve.add_argument('--unix', type=Path, help="TCP 대신 사용할 Unix 소켓 경로")
+    bench = subcommands.add_parser('bench', help="사이드카를 띄우고 헤더 데이터로 부하 측정")
+    bench.add_argument('--rows', type=Path, default=HEADER_DATA_FILE, help="재생할 헤더 데이터 CSV")
+    bench.add_argument('--total', type=int, default=20000, help="보낼 요청 수")
+    bench.add_argument('--concurrency', type=int, default=64, help="동시 연결 수")
+
+    for command in (serve, bench):
+        command.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="프로필을 만들 과거 로그인 CSV")
+        command.add_argument('--profiles', type=Path, help="UserProfileStore JSON Lines 파일 (있으면 --history 대신 사용)")
+        command.add_argument('--max-batch-size', type=int, default=SIDECAR_MAX_BATCH_SIZE, help="배치 최대 요청 수")
+        command.add_argument('--max-wait-ms', type=float, default=SIDECAR_MAX_WAIT_MS, help="배치를 모으는 최대 대기 시간")
+        command.add_argument('--max-pending', type=int, default=SIDECAR_MAX_PENDING, help="대기열 한도 (초과 시 503)")
+        command.add_argument('--max-connections', type=int, default=SIDECAR_MAX_CONNECTIONS, help="동시 연결 한도")
+        command.add_argument('--breach-filter', type=Path, help="유출 자격 증명 필터 파일 (breach_filter.py build)")
+        command.add_argument('--rules', type=Path, help="점수 규칙 JSON (바꿀 값만 적어도 됨, 수정하면 자동 적용)")
+        command.add_argument('--rules-watch-interval', type=float, default=rule_table.RULES_WATCH_INTERVAL_SECONDS,
+                             help="규칙 파일 변경 확인 간격(초)")
+    args = parser.parse_args()
+
+    if args.command == 'serve':
+        async def serve_forever() -> None:
+            server = await start_sidecar(make_sidecar(args), args.host, args.port, args.unix)
+            print(f"점수 사이드카: {args.unix or f'http://{args.host}:{args.port}'}")
+            async with server:
+                await server.serve_forever()
+
+        try:
+            asyncio.run(serve_forever())
+        except KeyboardInterrupt:
+            pass
+    else:
+        report = asyncio.run(run_bench(make_sidecar(args), read_replay_rows(args.rows), args.total, args.concurrency))
+        latencies = report['round_trip_us']
+        print(f"요청 {report['requests']}건, {report['seconds']:.2f}s, {report['throughput']:,.0f} req/s")
+        print(f"왕복 지연(us): p50={latencies[50]:.1f} p95={latencies[95]:.1f} p99={latencies[99]:.1f}")
+        print(f"배치 {report['batches']}개, 평균 크기 {report['mean_batch_size']:.1f}, 거절 {report['rejected']}건")
@@ -0,0 +1,525 @@
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+from collections import Counter, deque
+from pathlib import Path
+import argparse
+import json
+import math
+import random
+import sys
+import threading
+import time
+
+import rule_table
+from rule_table import ACCEPT_MISSING, ACCEPT_UNKNOWN, DEFAULT_RULES, load_rules
+from scoring import SCORE_COMPONENTS, get_group_name, get_ua_features
+
+# ==============================================================================
+# 1. 규칙 집합
+# ==============================================================================
+# 규칙 구조와 기본값은 scoring_rules.json(rule_table.py)과 같습니다. 후보 규칙은 같은 구조의 JSON 파일에 바꿀 값만 적으면 됩니다.
+# 로그인 특징(LoginFeatures)은 현재 규칙으로 한 번만 추출해 두 규칙 집합이 공유하므로,
+# 특징 추출에 쓰이는 항목(ip.country_groups, ip.malicious_groups, ua.bot_keywords)은 후보에서 바꿀 수 없습니다.
+SHARED_FEATURE_RULES: Tuple[Tuple[str, str], ...] = (
+    ('ip', 'country_groups'), ('ip', 'malicious_groups'), ('ua', 'bot_keywords'),
+)
+
+
+class RuleSet:
+    """컴파일된 규칙(rule_table.CompiledRules)으로 공유 특징을 점수화합니다. 같은 LoginFeatures 로 여러 규칙 집합을 평가할 수 있습니다."""
+
+    def __init__(
+            self,
+            rules: Dict[str, Any],
+            name: str = 'active',
+            compiled: Optional[rule_table.CompiledRules] = None
+    ) -> None:
+        self.name = name
+        self.rules = rules
+        self.compiled = compiled if compiled is not None else rule_table.compile_rules(rules, name)
+
+    @classmethod
+    def from_compiled(cls, compiled: rule_table.CompiledRules, name: str = 'active') -> 'RuleSet':
+        return cls(compiled.config, name, compiled)
+
+    def shares_features_with(self, other: 'RuleSet') -> bool:
+        return all(self.rules[section][name] == other.rules[section][name] for section, name in SHARED_FEATURE_RULES)
+
+    def component_scores(self, features: 'LoginFeatures') -> Dict[str, int]:
+        """SCORE_COMPONENTS 순서의 항목 점수. scoring.calculate_login_score_breakdown 의 각 항목과 같은 조회 표를 씁니다."""
+        rules = self.compiled
+        if not features.ip_valid:
+            ip_score = 0
+        elif features.ip_malicious:
+            ip_score = rules.ip_malicious
+        else:
+            ip_score = rules.ip_relation_scores[features.ip_relations]
+
+        ua_features = features.ua_features
+        if ua_features['os'] == 'Bot':
+            ua_score = rules.ua_bot
+        elif ua_features['os'] == 'None':
+            ua_score = rules.ua_missing
+        else:
+            ua_score = rules.ua_relation_scores[features.ua_relations]
+
+        referer = features.referer
+        if referer in rules.referer_values or features.referer_text in rules.referer_values:
+            referer_score = rules.referer_suspicious
+        else:
+            referer_score = 0
+
+        accept = features.accept
+        if features.accept_missing:
+            accept_code = ACCEPT_MISSING
+        else:
+            accept_code = rules.accept_codes.get(accept, ACCEPT_UNKNOWN) if isinstance(accept, str) else ACCEPT_UNKNOWN
+
+        return {
+            'ip_score': ip_score,
+            'ua_score': ua_score,
+            'lang_score': rules.lang_change if features.lang_changed else 0,
+            'referer_score': referer_score,
+            'accept_score': rules.accept_penalty[rules.browser_codes.get(ua_features['browser'], rules.other_browser)
+                                                 if ua_features['type'] == 'Browser' else rules.other_browser][accept_code],
+            'sec_fetch_score': rules.sec_fetch_penalty.get(ua_features['browser'], 0) if features.sec_fetch_missing else 0,
+        }
+
+    def determine_action(self, total_score: int) -> str:
+        return self.compiled.determine_action(total_score)
+
+
+# ==============================================================================
+# 2. 공유 특징
+# ==============================================================================
+# 규칙 집합과 무관한 비싼 부분(UA 파싱, IP 그룹 분류, 기록 비교)은 로그인당 한 번만 계산해 두 규칙 집합이 공유합니다.
+# 기록 비교 결과는 관계 종류별 비트 집합으로 남기므로, 가중치가 달라도 기록을 다시 돌 필요가 없습니다.
+# 그룹 분류(국가/악성 그룹)는 rules(현재 규칙)의 그룹 코드를 씁니다.
+
+def _is_missing(value: Any) -> bool:
+    return value is None or str(value).strip() == '' or str(value).lower() == 'none'
+
+
+class LoginFeatures:
+    __slots__ = ('ip_valid', 'ip_malicious', 'ip_relations', 'ua_features', 'ua_relations',
+                 'lang_changed', 'referer', 'referer_text', 'accept', 'accept_missing', 'sec_fetch_missing')
+
+    def __init__(
+            self,
+            new_ip: str,
+            new_ua: str,
+            new_accept: str,
+            new_language: str,
+            new_referer: str,
+            new_sec_fetch_site: str,
+            new_sec_fetch_mode: str,
+            new_sec_fetch_dest: str,
+            new_sec_fetch_user: str,
+            user_ip_history: List[str],
+            user_ua_history: List[str],
+            user_language_history: List[str],
+            rules: Optional[rule_table.CompiledRules] = None
+    ) -> None:
+        self._classify_ip(new_ip, user_ip_history, rules if rules is not None else rule_table.ACTIVE_RULES)
+
+        self.ua_features = ua_features = get_ua_features(new_ua)
+        self.ua_relations = 0
+        if ua_features['os'] not in ('Bot', 'None'):
+            for prev_ua in user_ua_history:
+                prev_features = get_ua_features(prev_ua)
+                if prev_features['os'] == 'None' or prev_features['os'] == 'Bot':
+                    continue
+                if ua_features['os'] != prev_features['os']:
+                    self.ua_relations |= 1
+                elif ua_features['browser'] != prev_features['browser'] or \
+                        ua_features['version'] != prev_features['version']:
+                    self.ua_relations |= 2
+
+        self.lang_changed = bool(user_language_history) and new_language not in user_language_history
+        self.referer = new_referer
+        self.referer_text = str(new_referer)
+        self.accept = new_accept
+        self.accept_missing = not new_accept or str(new_accept).strip() == '' or \
+            str(new_accept).lower() in ['none', 'null']
+        self.sec_fetch_missing = _is_missing(new_sec_fetch_site) or _is_missing(new_sec_fetch_mode) or \
+            _is_missing(new_sec_fetch_dest)
+
+    def _classify_ip(self, new_ip: str, user_ip_history: List[str], rules: rule_table.CompiledRules) -> None:
+        self.ip_valid, self.ip_malicious, self.ip_relations = False, False, 0
+        try:
+            new_parts = new_ip.split('.')
+        except AttributeError:
+            return
+        if len(new_parts) != 4:
+            return
+        self.ip_valid = True
+        group_codes, other_group = rules.group_codes, rules.other_group
+        new_group = get_group_name(new_ip)
+        new_code = group_codes.get(new_group, other_group)
+        if rules.ip_malicious_by_code[new_code]:
+            self.ip_malicious = True
+            return
+
+        # 관계 비트는 rule_table.IP_RELATIONS 순서 (1 국가, 2 그룹, 4 A, 8 B, 16 C/D)
+        group_relation = rules.ip_group_relation[new_code]
+        relations = 0
+        for prev_ip in user_ip_history:
+            try:
+                prev_parts = prev_ip.split('.')
+            except AttributeError:
+                continue
+            if len(prev_parts) != 4:
+                continue
+            if new_parts[0] != prev_parts[0]:
+                prev_group = get_group_name(prev_ip)
+                prev_code = group_codes.get(prev_group, other_group)
+                if prev_code == other_group and new_code == other_group and prev_group != new_group:
+                    relations |= 2  # group_change
+                else:
+                    relations |= group_relation[prev_code]
+            elif new_parts[1] != prev_parts[1]:
+                relations |= 8  # b_change
+            elif new_parts[2] != prev_parts[2] or new_parts[3] != prev_parts[3]:
+                relations |= 16  # cd_change
+        self.ip_relations = relations
+
+
+# ==============================================================================
+# 3. 판정 차이 통계
+# ==============================================================================
+SHADOW_SAMPLE_SIZE = 100  # 판정이 다른 로그인 표본 수 (저장소 표본 추출)
+SHADOW_LATENCY_WINDOW = 4096  # 추가 지연 백분위 계산에 쓰는 최근 측정 수
+
+
+class ShadowDiff:
+    """현재/후보 규칙 판정 차이의 누적 통계. 메모리는 항목 수와 표본 수에만 비례합니다."""
+
+    def __init__(self, sample_size: int = SHADOW_SAMPLE_SIZE, seed: int = 0) -> None:
+        self.sample_size = sample_size
+        self.random = random.Random(seed)
+        self.lock = threading.Lock()
+        self.compared = 0
+        self.score_changes = 0
+        self.action_changes = 0
+        self.transitions: Counter = Counter()
+        self.component_changes: Counter = Counter()
+        self.component_delta_sum: Counter = Counter()
+        self.component_delta_min: Dict[str, int] = {}
+        self.component_delta_max: Dict[str, int] = {}
+        self.samples: List[Dict[str, Any]] = []
+
+    def record(
+            self,
+            active: Dict[str, int],
+            active_action: str,
+            candidate: Dict[str, int],
+            candidate_action: str,
+            event: Optional[Dict[str, Any]] = None
+    ) -> None:
+        with self.lock:
+            self.compared += 1
+            self.transitions[(active_action, candidate_action)] += 1
+            if active['total_score'] == candidate['total_score'] and active_action == candidate_action:
+                return
+            self.score_changes += active['total_score'] != candidate['total_score']
+            for name in SCORE_COMPONENTS:
+                delta = candidate[name] - active[name]
+                if delta:
+                    self.component_changes[name] += 1
+                    self.component_delta_sum[name] += delta
+                    self.component_delta_min[name] = min(self.component_delta_min.get(name, delta), delta)
+                    self.component_delta_max[name] = max(self.component_delta_max.get(name, delta), delta)
+            if active_action == candidate_action:
+                return
+
+            # 판정이 다른 로그인만 저장소 표본 추출 (모든 불일치 로그인이 같은 확률로 남음)
+            self.action_changes += 1
+            sample = {'active': active, 'active_action': active_action,
+                      'candidate': candidate, 'candidate_action': candidate_action, 'event': event}
+            if len(self.samples) < self.sample_size:
+                self.samples.append(sample)
+            else:
+                slot = self.random.randrange(self.action_changes)
+                if slot < self.sample_size:
+                    self.samples[slot] = sample
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            return {
+                'compared': self.compared,
+                'score_changes': self.score_changes,
+                'action_changes': self.action_changes,
+                'action_change_rate': self.action_changes / self.compared if self.compared else 0.0,
+                'transitions': [{'active': active, 'candidate': candidate, 'count': count}
+                                for (active, candidate), count in self.transitions.most_common()],
+                'components': {
+                    name: {
+                        'changed': self.component_changes[name],
+                        'mean_delta': self.component_delta_sum[name] / self.component_changes[name],
+                        'min_delta': self.component_delta_min[name],
+                        'max_delta': self.component_delta_max[name],
+                    }
+                    for name in SCORE_COMPONENTS if self.component_changes[name]
+                },
+                'samples': list(self.samples),
+            }
+
+
+# ==============================================================================
+# 4. 섀도 점수기
+# ==============================================================================
+# 로그인마다 특징을 한 번 추출해 현재 규칙으로 점수화하고(이 결과만 집행), 같은 특징으로 후보 규칙도 평가해 차이를 기록합니다.
+# 후보 평가 + 차이 기록 시간을 로그인마다 재며, 평균이 latency_budget_us 를 넘으면 그 비율만큼 건너뛰며 표본 평가합니다.
+# 후보 평가는 로그인당 평균 약 5us(p99 약 12us)라 그 근처의 예산은 평가를 수시로 건너뛰게 되므로, 기본은 0(모든 로그인 평가)입니다.
+# 예산을 두면 차이 통계는 표본이 되며, stats 의 skipped / sampling_rate 로 실제 평가 비율을 보여 줍니다.
+SHADOW_LATENCY_BUDGET_US = 0.0
+SHADOW_COST_SMOOTHING = 0.01  # 후보 평가 시간 지수 이동 평균 계수
+
+
+class ShadowScorer:
+    """
+    현재/후보 규칙 집합으로 동시에 점수화합니다. score_breakdown 은 calculate_login_score_breakdown 과 같은 인자와
+    반환 형식이며, 반환값은 항상 현재 규칙의 결과입니다. candidate 가 None 이면 섀도 평가 없이 현재 규칙만 계산합니다.
+    active 를 생략하면 로그인마다 적용 중인 규칙(rule_table.ACTIVE_RULES)을 읽어 현재 규칙으로 씁니다.
+    교체된 규칙의 공유 특징 항목이 후보와 다르면 다시 같아질 때까지 후보 평가를 멈춥니다 (stats 의 candidate_compatible).
+    """
+
+    def __init__(
+            self,
+            active: Optional[RuleSet] = None,
+            candidate: Optional[RuleSet] = None,
+            latency_budget_us: float = SHADOW_LATENCY_BUDGET_US,
+            diff: Optional[ShadowDiff] = None
+    ) -> None:
+        self.follows_active_rules = active is None
+        self.active = active if active is not None else RuleSet.from_compiled(rule_table.ACTIVE_RULES)
+        if candidate is not None and not candidate.shares_features_with(self.active):
+            raise ValueError("후보 규칙의 " + ', '.join(f"{section}.{name}" for section, name in SHARED_FEATURE_RULES)
+                             + " 는 현재 규칙과 같아야 합니다")
+        self.candidate = candidate
+        self.candidate_compatible = True
+        self.latency_budget_us = latency_budget_us
+        self.diff = diff if diff is not None else ShadowDiff()
+        self.lock = threading.Lock()
+        self.scored = 0
+        self.evaluated = 0
+        self.cost_us = 0.0
+        self.stride = 1
+        self.overheads: deque = deque(maxlen=SHADOW_LATENCY_WINDOW)
+
+    def score_breakdown(
+            self,
+            new_ip: str,
+            new_ua: str,
+            new_accept: str,
+            new_language: str,
+            new_referer: str,
+            new_sec_fetch_site: str,
+            new_sec_fetch_mode: str,
+            new_sec_fetch_dest: str,
+            new_sec_fetch_user: str,
+            user_ip_history: List[str],
+            user_ua_history: List[str],
+            user_language_history: List[str],
+            velocity_score: int = 0,
+            campaign_score: int = 0,
+            breach_score: int = 0,
+            event: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, int]:
+        """event 는 판정이 다를 때 표본에 남길 식별 정보(사용자, 시각 등)입니다. 비밀번호는 넣지 않습니다."""
+        # 현재 규칙은 로그인당 한 번만 읽어 특징 추출, 점수, 판정에 같은 규칙을 씀
+        active_rules = self.active_rules()
+        features = LoginFeatures(
+            new_ip, new_ua, new_accept, new_language, new_referer, new_sec_fetch_site, new_sec_fetch_mode,
+            new_sec_fetch_dest, new_sec_fetch_user, user_ip_history, user_ua_history, user_language_history,
+            active_rules.compiled
+        )
+        extra = {'velocity_score': velocity_score, 'campaign_score': campaign_score, 'breach_score': breach_score}
+        active = active_rules.component_scores(features)
+        active.update(extra)
+        active['total_score'] = sum(active.values())
+
+        candidate_rules = self.candidate
+        if candidate_rules is None or not self.candidate_compatible:
+            return active
+        with self.lock:
+            self.scored += 1
+            if self.scored % self.stride:
+                return active
+
+        start = time.perf_counter()
+        candidate = candidate_rules.component_scores(features)
+        candidate.update(extra)
+        candidate['total_score'] = sum(candidate.values())
+        self.diff.record(active, active_rules.determine_action(active['total_score']),
+                         candidate, candidate_rules.determine_action(candidate['total_score']), event)
+        elapsed_us = (time.perf_counter() - start) * 1e6
+
+        with self.lock:
+            self.evaluated += 1
+            self.overheads.append(elapsed_us)
+            self.cost_us = elapsed_us if self.evaluated == 1 else \
+                self.cost_us + SHADOW_COST_SMOOTHING * (elapsed_us - self.cost_us)
+            self.stride = max(1, math.ceil(self.cost_us / self.latency_budget_us)) if self.latency_budget_us > 0 else 1
+        return active
+
+    def active_rules(self) -> RuleSet:
+        """현재 규칙. 생성 시 active 를 주지 않았으면 rule_table.ACTIVE_RULES 가 교체된 것을 보고 따라갑니다."""
+        if self.follows_active_rules:
+            compiled = rule_table.ACTIVE_RULES
+            if compiled is not self.active.compiled:
+                active = RuleSet.from_compiled(compiled)
+                self.candidate_compatible = self.candidate is None or self.candidate.shares_features_with(active)
+                self.active = active
+                return active
+        return self.active
+
+    def determine_action(self, total_score: int) -> str:
+        """집행할 판정 (현재 규칙 기준)."""
+        return self.active_rules().determine_action(total_score)
+
+    def stats(self) -> Dict[str, Any]:
+        with self.lock:
+            overheads = sorted(self.overheads)
+            scored, evaluated, cost_us, stride = self.scored, self.evaluated, self.cost_us, self.stride
+        # 규칙 교체로 후보 평가를 멈춘 동안의 로그인은 scored 에 들어가지 않음
+        return {
+            'active': self.active_rules().name,
+            'candidate': self.candidate.name if self.candidate is not None else None,
+            'candidate_compatible': self.candidate_compatible,
+            'scored': scored,
+            'evaluated': evaluated,
+            'skipped': scored - evaluated,
+            'sampling_rate': evaluated / scored if scored else 1.0,
+            'sample_stride': stride,
+            'latency_budget_us': self.latency_budget_us,
+            'overhead_us': {
+                'mean': cost_us,
+                '50': overheads[len(overheads) // 2] if overheads else 0.0,
+                '99': overheads[min(len(overheads) - 1, int(len(overheads) * 0.99))] if overheads else 0.0,
+            },
+            **self.diff.snapshot(),
+        }
+
+
+# ==============================================================================
+# 5. 재생 / 로그 추적
+# ==============================================================================
+
+def csv_logins(header_file: Path, history_file: Path) -> Iterator[Tuple[Tuple[Any, ...], Dict[str, Any]]]:
+    """헤더 CSV 와 기록 CSV 를 (score_breakdown 인자, 표본용 식별 정보) 로 생성합니다."""
+    import csv
+    from batch_scoring import LOGIN_COLUMNS
+    from login_load_test import load_histories_csv
+
+    histories = load_histories_csv(history_file)
+    with open(header_file, 'r', encoding='utf-8', newline='') as file:
+        for row in csv.DictReader(file):
+            headers = [row.get(name, row.get(name.replace('_', '-'))) for name in LOGIN_COLUMNS]
+            yield (*headers, *histories.get(row['userid'], ([], [], []))), {'userid': row['userid'], 'ip': row['ip']}
+
+
+def log_logins(log_file: Path, follow: bool = False) -> Iterator[Tuple[Tuple[Any, ...], Dict[str, Any]]]:
+    """risk_score_log 레코드를 (score_breakdown 인자, 표본용 식별 정보) 로 생성합니다. follow 면 새 줄을 계속 기다립니다."""
+    from batch_scoring import LOGIN_COLUMNS
+    from risk_log_rescoring import read_log_records
+
+    for offset, record in read_log_records(log_file, follow=follow):
+        args = (*(record.get(name) for name in LOGIN_COLUMNS),
+                record.get('ip_history') or [], record.get('ua_history') or [], record.get('lang_history') or [])
+        yield args, {'offset': offset, 'timestamp': record.get('timestamp'), 'ip': record.get('ip')}
+
+
+def run_replay(logins: Iterable[Tuple[Tuple[Any, ...], Dict[str, Any]]], shadow: ShadowScorer) -> Dict[str, Any]:
+    """
+    같은 로그인들을 scoring.calculate_login_score_breakdown 과 섀도 점수기로 각각 점수화합니다.
+    현재 규칙 결과가 scoring.py 와 같은지 확인하고, 로그인당 추가 지연을 비교합니다.
+    """
+    from scoring import calculate_login_score_breakdown
+
+    logins = list(logins)
+    start = time.perf_counter()
+    reference = [calculate_login_score_breakdown(*args) for args, _ in logins]
+    reference_seconds = time.perf_counter() - start
+    start = time.perf_counter()
+    active = [shadow.score_breakdown(*args, event=event) for args, event in logins]
+    shadow_seconds = time.perf_counter() - start
+    return {
+        'logins': len(logins),
+        'active_mismatches': sum(left != right for left, right in zip(reference, active)),
+        'reference_us': reference_seconds / max(1, len(logins)) * 1e6,
+        'shadow_us': shadow_seconds / max(1, len(logins)) * 1e6,
+        **shadow.stats(),
+    }
+
+
+def print_stats(stats: Dict[str, Any], samples: int = 3) -> None:
+    if not stats['candidate_compatible']:
+        print("교체된 현재 규칙의 공유 특징 항목이 후보와 달라 후보 평가를 멈췄습니다")
+    if stats['skipped']:
+        coverage = (f"전체 {stats['scored']:,}건 중 {stats['sampling_rate']:.1%} 표본 평가, "
+                    f"건너뜀 {stats['skipped']:,}건, 현재 {stats['sample_stride']}건마다 평가")
+    else:
+        coverage = f"전체 {stats['scored']:,}건 모두 평가"
+    print(f"비교 {stats['compared']:,}건 ({coverage}), "
+          f"총점 변경 {stats['score_changes']:,}건, 판정 변경 {stats['action_changes']:,}건 "
+          f"({stats['action_change_rate']:.2%}{', 표본 기준' if stats['skipped'] else ''})")
+    print(f"후보 평가 추가 지연(us): 평균 {stats['overhead_us']['mean']:.2f}, p50 {stats['overhead_us']['50']:.2f}, "
+          f"p99 {stats['overhead_us']['99']:.2f} (예산 {stats['latency_budget_us']:.1f})")
+    for transition in stats['transitions']:
+        marker = '' if transition['active'] == transition['candidate'] else '  *'
+        print(f"  {transition['active']:<25} -> {transition['candidate']:<25} {transition['count']:>8,}{marker}")
+    for name, component in stats['components'].items():
+        print(f"  {name:<16} 변경 {component['changed']:>7,}건, 평균 {component['mean_delta']:+.2f} "
+              f"(범위 {component['min_delta']:+d} ~ {component['max_delta']:+d})")
+    for sample in stats['samples'][:samples]:
+        print(f"  예) {json.dumps(sample['event'], ensure_ascii=False)}: {sample['active']['total_score']}점 "
+              f"{sample['active_action']} -> {sample['candidate']['total_score']}점 {sample['candidate_action']}")
+
+
+if __name__ == '__main__':
+    from batch_scoring import HEADER_DATA_FILE, HISTORY_DATA_FILE
+    from risk_log_rescoring import LOG_FILE
+
+    parser = argparse.ArgumentParser(description="현재/후보 규칙 집합 섀도 점수화와 판정 차이 통계")
+    subcommands = parser.add_subparsers(dest='command', required=True)
+    dump = subcommands.add_parser('dump-rules', help="기본 규칙을 후보 규칙 JSON 의 출발점으로 출력")
+    replay = subcommands.add_parser('replay', help="헤더/기록 CSV 를 재생하며 비교")
+    replay.add_argument('--headers', type=Path, default=HEADER_DATA_FILE, help="새 로그인 헤더 CSV")
+    replay.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="사용자별 과거 로그인 CSV")
+    tail = subcommands.add_parser('tail', help="risk_score_log 를 읽으며 비교 (--follow 면 계속)")
+    tail.add_argument('--log', type=Path, default=LOG_FILE, help="JSON 라인 위험 점수 로그")
+    tail.add_argument('--follow', action='store_true', help="파일 끝에서 종료하지 않고 새 로그를 계속 읽음")
+    tail.add_argument('--report-every', type=int, default=1000, help="통계 출력 간격 (레코드 수)")
+    for command in (replay, tail):
+        command.add_argument('candidate', type=Path, help="후보 규칙 JSON (dump-rules 형식, 바꿀 값만 적어도 됨)")
+        command.add_argument('--budget-us', type=float, default=SHADOW_LATENCY_BUDGET_US,
+                             help="로그인당 후보 평가 추가 지연 예산. 넘으면 표본 평가 (기본 0 은 항상 평가)")
+        command.add_argument('--samples', type=int, default=3, help="출력할 판정 변경 표본 수")
+    args = parser.parse_args()
+
+    if args.command == 'dump-rules':
+        json.dump(DEFAULT_RULES, sys.stdout, ensure_ascii=False, indent=2)
+        print()
+        sys.exit(0)
+
+    try:
+        shadow = ShadowScorer(candidate=RuleSet(load_rules(args.candidate), name=str(args.candidate)),
+                              latency_budget_us=args.budget_us)
+    except (OSError, ValueError) as error:
+        print(f"후보 규칙 오류: {error}", file=sys.stderr)
+        sys.exit(1)
+    if args.command == 'replay':
+        report = run_replay(csv_logins(args.headers, args.history), shadow)
+        print(f"로그인 {report['logins']:,}건, 현재 규칙과 scoring.py 불일치 {report['active_mismatches']}건")
+        print(f"로그인당 점수 계산(us): scoring.py {report['reference_us']:.2f}, "
+              f"현재+후보 {report['shadow_us']:.2f}")
+        print_stats(report, args.samples)
+    else:
+        try:
+            for count, (login, event) in enumerate(log_logins(args.log, args.follow), start=1):
+                shadow.score_breakdown(*login, event=event)
+                if count % args.report_every == 0:
+                    print_stats(shadow.stats(), args.samples)
+        except KeyboardInterrupt:
+            pass
+        print_stats(shadow.stats(), args.samples)
@@ -0,0 +1,170 @@
+from typing import Iterable, List, Optional, Sequence, Set, Tuple
+from pathlib import Path
+import argparse
+
+import numpy as np
+import pandas as pd
+
+import rule_table
+from batch_scoring import (
+    DATA_DIR,
+    HEADER_DATA_FILE,
+    HISTORY_DATA_FILE,
+    attach_histories,
+    build_user_histories,
+    score_login_batch,
+)
+from dataset_cache import read_csv_cached
+
+# ==============================================================================
+# 1. 라벨 데이터 점수화
+# ==============================================================================
+# 헤더 데이터의 각 행은 (계정, 비밀번호) 로 라벨 파일과 맞춥니다.
+# 공격 파일에 있는 자격 증명으로 시도한 로그인은 공격, 정상 파일에만 있는 것은 정상, 나머지는 제외합니다.
+# attack_results.csv 는 공격 스크립트의 시도 결과(대부분 bad_password, 일부 logged)이며, 실패한 시도도 공격이므로
+# result 와 관계없이 모두 공격 라벨로 씁니다. (현재 헤더 데이터에는 이 자격 증명으로 시도한 행이 없어 결과는 같음)
+# attack_accounts.csv 는 공격에 쓴 추측 목록 전체라 실제 사용자의 자격 증명과 겹치므로 라벨로 쓰지 않습니다.
+ATTACK_LABEL_FILES: List[Path] = [
+    DATA_DIR / '사용자계정2' / 'success_accounts.csv',
+    DATA_DIR / 'successful_attack_accounts.csv',
+    DATA_DIR / 'attack_results.csv',
+]
+BENIGN_LABEL_FILES: List[Path] = [DATA_DIR / 'user_accounts.csv']
+ACCOUNT_COLUMNS: Sequence[str] = ('userid', 'id')
+
+
+def read_credentials(paths: Iterable[Path]) -> Set[Tuple[str, str]]:
+    """계정 CSV 들에서 (계정, 비밀번호) 집합을 읽습니다. 계정 컬럼 이름은 userid 또는 id 입니다."""
+    credentials: Set[Tuple[str, str]] = set()
+    for path in paths:
+        frame = pd.read_csv(path, keep_default_na=False, dtype=str)
+        account = next((name for name in ACCOUNT_COLUMNS if name in frame.columns), None)
+        if account is None:
+            raise ValueError(f"{path}: 계정 컬럼({', '.join(ACCOUNT_COLUMNS)})이 없습니다.")
+        credentials.update(zip(frame[account], frame['password']))
+    return credentials
+
+
+def score_labelled_logins(
+        header_file: Path,
+        history_file: Path,
+        attack_files: Sequence[Path] = ATTACK_LABEL_FILES,
+        benign_files: Sequence[Path] = BENIGN_LABEL_FILES
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    헤더 데이터셋을 한 번만 배치 점수화하고, 라벨이 있는 행의 (총점 배열, 공격 여부 배열) 을 반환합니다.
+    """
+    attacks = read_credentials(attack_files)
+    benign = read_credentials(benign_files)
+
+    histories = build_user_histories(read_csv_cached(history_file), user_column='id')
+    logins = attach_histories(read_csv_cached(header_file), histories)
+    keys = list(zip(logins['userid'].astype(str), logins['password'].astype(str)))
+    is_attack = np.fromiter((key in attacks for key in keys), dtype=bool, count=len(keys))
+    labelled = is_attack | np.fromiter((key in benign for key in keys), dtype=bool, count=len(keys))
+
+    totals = score_login_batch(logins)['total_score']
+    return totals[labelled], is_attack[labelled]
+
+
+# ==============================================================================
+# 2. 누적 히스토그램 기반 기준 점수 탐색
+# ==============================================================================
+# 기준 점수 쌍 (captcha, block) 에서 점수 s 의 조치는 s >= block 이면 차단, s >= captcha 이면 CAPTCHA, 그 외 허용입니다.
+# 라벨별 "점수 >= t 인 건수" 누적 히스토그램 하나로 모든 쌍의 혼동 행렬을 뺄셈만으로 구합니다.
+
+def tail_counts(scores: np.ndarray, max_score: int) -> np.ndarray:
+    """길이 max_score + 2 배열. t 번째 값은 점수가 t 이상인 건수입니다 (마지막 값은 항상 0)."""
+    histogram = np.bincount(np.clip(scores, 0, max_score), minlength=max_score + 1)
+    return np.append(np.cumsum(histogram[::-1])[::-1], 0)
+
+
+def sweep_thresholds(scores: np.ndarray, is_attack: np.ndarray) -> pd.DataFrame:
+    """
+    0 <= captcha <= block <= 최고점 + 1 인 모든 기준 점수 쌍의 혼동 행렬과 지표를 한 번에 계산합니다.
+    false_block_rate 는 차단된 정상 로그인 비율, captcha_load 는 CAPTCHA 를 받는 전체 로그인 비율,
+    attack_pass_rate 는 그대로 허용된 공격 비율입니다.
+    """
+    scores = np.asarray(scores, dtype=np.int64)
+    is_attack = np.asarray(is_attack, dtype=bool)
+    max_score = int(max(scores.max(initial=0), rule_table.ACTIVE_RULES.block_threshold))
+    benign_tail = tail_counts(scores[~is_attack], max_score)
+    attack_tail = tail_counts(scores[is_attack], max_score)
+
+    captcha, block = np.triu_indices(max_score + 2)
+    result = {'captcha_threshold': captcha, 'block_threshold': block}
+    for label, tail in (('benign', benign_tail), ('attack', attack_tail)):
+        result[f'{label}_block'] = tail[block]
+        result[f'{label}_captcha'] = tail[captcha] - tail[block]
+        result[f'{label}_allow'] = tail[0] - tail[captcha]
+    sweep = pd.DataFrame(result)
+
+    benign_total = max(1, int(benign_tail[0]))
+    attack_total = max(1, int(attack_tail[0]))
+    sweep['false_block_rate'] = sweep['benign_block'] / benign_total
+    sweep['benign_captcha_rate'] = sweep['benign_captcha'] / benign_total
+    sweep['captcha_load'] = (sweep['benign_captcha'] + sweep['attack_captcha']) / max(1, len(scores))
+    sweep['attack_block_rate'] = sweep['attack_block'] / attack_total
+    sweep['attack_pass_rate'] = sweep['attack_allow'] / attack_total
+    return sweep
+
+
+def recommend_thresholds(
+        sweep: pd.DataFrame,
+        false_block_budget: float,
+        captcha_budget: Optional[float] = None
+) -> Optional[pd.Series]:
+    """
+    정상 로그인 차단 비율이 false_block_budget 이하(그리고 captcha_budget 이 있으면 CAPTCHA 부담도 그 이하)인
+    쌍 중에서 허용되는 공격이 가장 적은 쌍을 고릅니다. 동률이면 CAPTCHA 부담이 적고, 차단이 많고,
+    현재 기준 점수(rule_table.ACTIVE_RULES)에 가까운 쌍을 우선합니다.
+    조건을 만족하는 쌍이 없으면 None 을 반환합니다.
+    """
+    candidates = sweep[sweep['false_block_rate'] <= false_block_budget]
+    if captcha_budget is not None:
+        candidates = candidates[candidates['captcha_load'] <= captcha_budget]
+    if candidates.empty:
+        return None
+    rules = rule_table.ACTIVE_RULES
+    distance = (candidates['captcha_threshold'] - rules.captcha_threshold).abs() + \
+        (candidates['block_threshold'] - rules.block_threshold).abs()
+    ranked = candidates.assign(distance=distance).sort_values(
+        ['attack_pass_rate', 'captcha_load', 'attack_block_rate', 'distance'],
+        ascending=[True, True, False, True], kind='stable'
+    )
+    return ranked.iloc[0].drop('distance')
+
+
+def describe(row: pd.Series) -> str:
+    return (f"CAPTCHA >= {int(row['captcha_threshold'])}, 차단 >= {int(row['block_threshold'])} | "
+            f"정상 차단 {row['false_block_rate']:.2%}, CAPTCHA 부담 {row['captcha_load']:.2%}, "
+            f"공격 차단 {row['attack_block_rate']:.2%}, 공격 통과 {row['attack_pass_rate']:.2%}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="라벨 데이터를 한 번 점수화해 모든 CAPTCHA/차단 기준 점수 쌍을 평가합니다.")
+    parser.add_argument('--headers', type=Path, default=HEADER_DATA_FILE, help="로그인 헤더 CSV")
+    parser.add_argument('--history', type=Path, default=HISTORY_DATA_FILE, help="사용자별 과거 로그인 CSV")
+    parser.add_argument('--attack', type=Path, nargs='+', default=ATTACK_LABEL_FILES, help="공격 자격 증명 CSV")
+    parser.add_argument('--benign', type=Path, nargs='+', default=BENIGN_LABEL_FILES, help="정상 자격 증명 CSV")
+    parser.add_argument('--false-block-budget', type=float, default=0.001, help="허용할 정상 로그인 차단 비율")
+    parser.add_argument('--captcha-budget', type=float, default=0.05, help="허용할 CAPTCHA 부담 (전체 로그인 대비 비율)")
+    parser.add_argument('--output', type=Path, help="전체 탐색 결과 CSV 저장 경로")
+    args = parser.parse_args()
+
+    scores, is_attack = score_labelled_logins(args.headers, args.history, args.attack, args.benign)
+    print(f"라벨 행: 정상 {int((~is_attack).sum())}건, 공격 {int(is_attack.sum())}건")
+
+    sweep = sweep_thresholds(scores, is_attack)
+    rules = rule_table.ACTIVE_RULES
+    current = sweep[(sweep['captcha_threshold'] == rules.captcha_threshold)
+                    & (sweep['block_threshold'] == rules.block_threshold)]
+    if not current.empty:
+        print(f"현재 기준   {describe(current.iloc[0])}")
+    recommended = recommend_thresholds(sweep, args.false_block_budget, args.captcha_budget)
+    if recommended is None:
+        print("예산을 만족하는 기준 점수 쌍이 없습니다.")
+    else:
+        print(f"추천 기준   {describe(recommended)}")
+    if args.output:
+        sweep.to_csv(args.output, index=False)
@@ -0,0 +1,372 @@
+from typing import Any, Dict, Hashable, Iterable, Iterator, Optional, Set, Tuple
+from functools import lru_cache
+from pathlib import Path
+import json
+
+import rule_table
+import scoring
+from login_event import LoginEvent
+from scoring import (
+    IP_GROUP_CACHE_SIZE,
+    calculate_accept_score,
+    calculate_referer_score,
+    calculate_sec_fetch_score,
+    get_group_name,
+    get_group_name_for_int,
+    get_ua_features,
+    ip_to_int,
+)
+
+# ==============================================================================
+# 1. IP 키 변환
+# ==============================================================================
+# IP 한 개는 (/8 키, /16 키, 전체 키) 로 표현합니다.
+# 0~255 의 정규 10진 표기 조각은 정수로 압축하고, 그 외 조각("01" 등)은 문자열 그대로 두어
+# calculate_dynamic_ip_score_final_country 의 문자열 비교 결과와 항상 같도록 합니다.
+IpKeys = Tuple[Hashable, Hashable, Hashable]
+UaKey = Tuple[str, str, str]
+
+
+def _octet_key(part: str) -> Hashable:
+    """IP 한 조각을 정수(정규 표기일 때) 또는 원래 문자열로 바꿉니다."""
+    if part.isdigit() and part.isascii() and str(int(part)) == part and int(part) <= 255:
+        return int(part)
+    return part
+
+
+def _string_ip_keys(ip_address: str) -> Optional[IpKeys]:
+    # 대부분인 정규 표기 IP 는 정수 변환 한 번으로 끝내고, 그 외 표기만 조각별로 나눔
+    ip_int = ip_to_int(ip_address)
+    if ip_int is not None:
+        return ip_int >> 24, ip_int >> 16, ip_int
+    parts = ip_address.split('.')
+    if len(parts) != 4: return None
+
+    a, b, c, d = (_octet_key(part) for part in parts)
+    ab = (a << 8) | b if isinstance(a, int) and isinstance(b, int) else (a, b)
+    if isinstance(ab, int) and isinstance(c, int) and isinstance(d, int):
+        return a, ab, (ab << 16) | (c << 8) | d
+    return a, ab, (a, b, c, d)
+
+
+# 같은 사용자의 IP 는 로그인마다 반복되므로 문자열 -> 키 결과를 캐시합니다. (키는 분류 색인과 무관)
+_string_ip_keys_cached = lru_cache(maxsize=IP_GROUP_CACHE_SIZE)(_string_ip_keys)
+
+
+def ip_keys(ip_address: Any) -> Optional[IpKeys]:
+    """
+    IP 를 (/8 키, /16 키, 전체 키) 로 변환합니다. 점수 계산에서 무시되는 IP 는 None 을 반환합니다.
+    LoginEvent.ip 같은 32비트 정수 IP 는 문자열 파싱 없이 바로 변환합니다.
+    """
+    if isinstance(ip_address, int):
+        return (ip_address >> 24, ip_address >> 16, ip_address) if ip_address >= 0 else None
+    if isinstance(ip_address, str):
+        return _string_ip_keys_cached(ip_address)
+    return None
+
+
+def ip_from_key(key: Hashable) -> str:
+    """전체 키를 다시 점 표기 IP 문자열로 되돌립니다."""
+    if isinstance(key, int):
+        return '.'.join(str((key >> shift) & 0xFF) for shift in (24, 16, 8, 0))
+    return '.'.join(str(part) for part in key)
+
+
+def _increment(counter: Dict[Hashable, int], key: Hashable) -> None:
+    counter[key] = counter.get(key, 0) + 1
+
+
+def _ip_group(full: Hashable, ip_address: Any) -> str:
+    # 문자열 IP 는 scoring 의 문자열 -> 그룹 캐시를 거침 (색인이 바뀌면 scoring 이 비움)
+    return get_group_name(ip_address) if isinstance(ip_address, str) else get_group_name_for_int(full)
+
+
+# ==============================================================================
+# 2. 사용자 프로필
+# ==============================================================================
+
+class UserProfile:
+    """
+    사용자 한 명의 로그인 기록 요약입니다.
+    원본 기록 리스트 대신 고유 IP/UA 특징/언어만 보관하고, 비교에 필요한 개수를 미리 세어 두어
+    IP, UA, Language 점수를 기록 길이와 무관하게 O(1) 로 계산합니다.
+    그룹별 개수는 어느 IP 분류 색인으로 센 것인지 기억해 두고, scoring.set_ip_classification_index 로
+    색인이 바뀐 뒤 처음 쓸 때 현재 색인으로 다시 셉니다.
+    """
+
+    __slots__ = ('ips', 'ip_count_by_a', 'ip_count_by_ab', 'ip_count_by_group', 'ip_count_by_a_group',
+                 'group_index', 'ua_features', 'ua_count_by_os', 'languages')
+
+    def __init__(self) -> None:
+        # 전체 키 -> (/8 키, /16 키, 그룹 이름)
+        self.ips: Dict[Hashable, Tuple[Hashable, Hashable, str]] = {}
+        self.ip_count_by_a: Dict[Hashable, int] = {}
+        self.ip_count_by_ab: Dict[Hashable, int] = {}
+        self.ip_count_by_group: Dict[str, int] = {}
+        self.ip_count_by_a_group: Dict[Tuple[Hashable, str], int] = {}
+        # 그룹 이름/개수를 구할 때 쓴 분류 색인
+        self.group_index = scoring.IP_CLASSIFICATION_INDEX
+        # (os, browser, version) 고유 조합 (None/Bot UA 는 비교에서 제외되므로 저장하지 않음)
+        self.ua_features: Set[UaKey] = set()
+        self.ua_count_by_os: Dict[str, int] = {}
+        self.languages: Set[Any] = set()
+
+    @classmethod
+    def from_history(
+            cls,
+            user_ip_history: Iterable[str],
+            user_ua_history: Iterable[str],
+            user_language_history: Iterable[str]
+    ) -> 'UserProfile':
+        """기존 원본 기록 리스트로 프로필을 만듭니다."""
+        profile = cls()
+        for ip_address in user_ip_history:
+            profile.add_ip(ip_address)
+        for ua_string in user_ua_history:
+            profile.add_ua(ua_string)
+        for language in user_language_history:
+            profile.add_language(language)
+        return profile
+
+    # ------------------------------------------------------------------
+    # 기록 추가
+
+    def add_ip(self, ip_address: str) -> None:
+        keys = ip_keys(ip_address)
+        if keys is None:
+            return
+        a, ab, full = keys
+        if full in self.ips:
+            return
+        if self.group_index is not scoring.IP_CLASSIFICATION_INDEX:
+            self.regroup_ips()
+        group = _ip_group(full, ip_address)
+        self.ips[full] = (a, ab, group)
+        _increment(self.ip_count_by_a, a)
+        _increment(self.ip_count_by_ab, ab)
+        _increment(self.ip_count_by_group, group)
+        _increment(self.ip_count_by_a_group, (a, group))
+
+    def regroup_ips(self) -> None:
+        """현재 IP 분류 색인으로 기록 IP 의 그룹 이름과 그룹별 개수를 다시 구합니다."""
+        self.group_index = scoring.IP_CLASSIFICATION_INDEX
+        self.ip_count_by_group = {}
+        self.ip_count_by_a_group = {}
+        for full, (a, ab, _) in self.ips.items():
+            group = _ip_group(full, ip_from_key(full))
+            self.ips[full] = (a, ab, group)
+            _increment(self.ip_count_by_group, group)
+            _increment(self.ip_count_by_a_group, (a, group))
+
+    def add_ua(self, ua_string: str) -> None:
+        features = get_ua_features(ua_string)
+        if features['os'] in ('None', 'Bot'):
+            return
+        self.add_ua_features((features['os'], features['browser'], features['version']))
+
+    def add_ua_features(self, key: UaKey) -> None:
+        if key in self.ua_features:
+            return
+        self.ua_features.add(key)
+        _increment(self.ua_count_by_os, key[0])
+
+    def add_language(self, language: str) -> None:
+        self.languages.add(language)
+
+    def append(self, ip_address: str, ua_string: str, language: str) -> None:
+        """로그인 성공 한 건을 프로필에 반영합니다."""
+        self.add_ip(ip_address)
+        self.add_ua(ua_string)
+        self.add_language(language)
+
+    def append_event(self, event: LoginEvent) -> None:
+        """LoginEvent 한 건을 프로필에 반영합니다. 정규 표기 IP 는 정수 그대로 씁니다."""
+        self.append(event.ip if event.ip >= 0 else event.ip_address, event.user_agent, event.accept_language)
+
+    # ------------------------------------------------------------------
+    # O(1) 점수
+
+    # 기록과의 관계 종류를 개수 차이로 판정해 관계 비트로 모은 뒤 규칙의 관계 비트 표에서 점수를 읽습니다.
+    # (비트 순서는 rule_table.IP_RELATIONS / UA_RELATIONS)
+
+    def ip_score(self, new_ip: str, rules: Optional[rule_table.CompiledRules] = None) -> int:
+        """calculate_dynamic_ip_score_final_country 와 같은 점수를 프로필 조회로 계산합니다."""
+        keys = ip_keys(new_ip)
+        if keys is None: return 0
+        if rules is None:
+            rules = rule_table.ACTIVE_RULES
+        a, ab, full = keys
+        group = _ip_group(full, new_ip)
+        if group in rules.malicious_groups: return rules.ip_malicious
+        if not self.ips: return rules.ip_relation_scores[0]
+        if self.group_index is not scoring.IP_CLASSIFICATION_INDEX:
+            self.regroup_ips()
+
+        same_a = self.ip_count_by_a.get(a, 0)
+        same_ab = self.ip_count_by_ab.get(ab, 0)
+        relations = (same_a - same_ab > 0) << 3 | (same_ab - (1 if full in self.ips else 0) > 0) << 4
+        other_a = len(self.ips) - same_a
+        if other_a:
+            # A 가 다른 기록을 같은 그룹 / 국가 그룹 간 / 그 밖의 그룹 변경으로 나눔
+            count_by_group, count_by_a_group = self.ip_count_by_group, self.ip_count_by_a_group
+            a_change = count_by_group.get(group, 0) - count_by_a_group.get((a, group), 0)
+            group_change = other_a - a_change
+            country_change = 0
+            if group_change and group in rules.country_groups:
+                country_change = sum(count_by_group.get(country, 0) - count_by_a_group.get((a, country), 0)
+                                     for country in rules.country_groups if country != group)
+            relations |= (country_change > 0) | (group_change - country_change > 0) << 1 | (a_change > 0) << 2
+        return rules.ip_relation_scores[relations]
+
+    def ua_score(
+            self,
+            new_ua: str,
+            ua_features: Optional[Dict[str, str]] = None,
+            rules: Optional[rule_table.CompiledRules] = None
+    ) -> int:
+        """calculate_dynamic_ua_score 와 같은 점수를 프로필 조회로 계산합니다."""
+        if rules is None:
+            rules = rule_table.ACTIVE_RULES
+        features = ua_features if ua_features is not None else get_ua_features(new_ua)
+        if features['os'] == 'Bot': return rules.ua_bot
+        if features['os'] == 'None': return rules.ua_missing
+        if not self.ua_features: return rules.ua_relation_scores[0]
+
+        same_os = self.ua_count_by_os.get(features['os'], 0)
+        key = (features['os'], features['browser'], features['version'])
+        relations = (len(self.ua_features) - same_os > 0) | (same_os - (1 if key in self.ua_features else 0) > 0) << 1
+        return rules.ua_relation_scores[relations]
+
+    def language_score(self, new_language: str, rules: Optional[rule_table.CompiledRules] = None) -> int:
+        """calculate_dynamic_language_score 와 같은 점수를 프로필 조회로 계산합니다."""
+        if not self.languages: return 0
+        return 0 if new_language in self.languages else (rules or rule_table.ACTIVE_RULES).lang_change
+
+    def event_scores(
+            self,
+            event: LoginEvent,
+            ua_features: Optional[Dict[str, str]] = None,
+            rules: Optional[rule_table.CompiledRules] = None
+    ) -> Tuple[int, int, int]:
+        """LoginEvent 의 (IP, UA, Language) 점수를 계산합니다."""
+        if rules is None:
+            rules = rule_table.ACTIVE_RULES
+        ip = event.ip if event.ip >= 0 else event.ip_address
+        return (self.ip_score(ip, rules), self.ua_score(event.user_agent, ua_features, rules),
+                self.language_score(event.accept_language, rules))
+
+    # ------------------------------------------------------------------
+    # 직렬화
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'ips': [ip_from_key(key) for key in self.ips],
+            'uas': [list(key) for key in sorted(self.ua_features)],
+            'languages': list(self.languages),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'UserProfile':
+        profile = cls()
+        for ip_address in data.get('ips', []):
+            profile.add_ip(ip_address)
+        for key in data.get('uas', []):
+            profile.add_ua_features(tuple(key))
+        for language in data.get('languages', []):
+            profile.add_language(language)
+        return profile
+
+
+# ==============================================================================
+# 3. 프로필 저장소
+# ==============================================================================
+
+class UserProfileStore:
+    """사용자 ID -> UserProfile 저장소. JSON Lines 파일(한 줄에 사용자 한 명)로 저장/복원합니다."""
+
+    def __init__(self) -> None:
+        self.profiles: Dict[str, UserProfile] = {}
+
+    def __len__(self) -> int:
+        return len(self.profiles)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self.profiles
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.profiles)
+
+    def get(self, user_id: str) -> UserProfile:
+        """사용자 프로필을 반환합니다. 기록이 없는 사용자는 빈 프로필을 만들어 둡니다."""
+        profile = self.profiles.get(user_id)
+        if profile is None:
+            profile = self.profiles[user_id] = UserProfile()
+        return profile
+
+    def record_login(self, user_id: str, ip_address: str, ua_string: str, language: str) -> None:
+        """로그인 성공을 해당 사용자 프로필에 추가합니다."""
+        self.get(user_id).append(ip_address, ua_string, language)
+
+    def save(self, path: Path) -> None:
+        with open(path, 'w', encoding='utf-8') as file:
+            for user_id, profile in self.profiles.items():
+                record = {'user': user_id}
+                record.update(profile.to_dict())
+                file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    @classmethod
+    def load(cls, path: Path) -> 'UserProfileStore':
+        store = cls()
+        with open(path, 'r', encoding='utf-8') as file:
+            for line in file:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                store.profiles[record['user']] = UserProfile.from_dict(record)
+        return store
+
+
+# ==============================================================================
+# 4. 프로필 기반 통합 점수
+# ==============================================================================
+
+def calculate_profile_component_scores(
+        profile: UserProfile,
+        new_ip: str,
+        new_ua: str,
+        new_accept: str,
+        new_language: str,
+        new_referer: str,
+        new_sec_fetch_site: str,
+        new_sec_fetch_mode: str,
+        new_sec_fetch_dest: str,
+        new_sec_fetch_user: str
+) -> Dict[str, int]:
+    """
+    calculate_integrated_login_score 의 기록 리스트 대신 UserProfile 을 사용해 항목별 점수를 계산합니다.
+    반환 dict 의 키는 risk_score_log.txt 와 같습니다 (ip_score ... total_score).
+    """
+    rules = rule_table.ACTIVE_RULES
+    ua_features = get_ua_features(new_ua)
+    ip_score = profile.ip_score(new_ip, rules)
+    ua_score = profile.ua_score(new_ua, ua_features, rules)
+    language_score = profile.language_score(new_language, rules)
+    referer_score = calculate_referer_score(new_referer, rules)
+    accept_score = calculate_accept_score(new_accept, new_ua, ua_features, rules)
+    sec_fetch_score = calculate_sec_fetch_score(
+        new_ua, new_sec_fetch_site, new_sec_fetch_mode, new_sec_fetch_dest, new_sec_fetch_user, ua_features, rules
+    )
+    return {
+        'ip_score': ip_score,
+        'ua_score': ua_score,
+        'lang_score': language_score,
+        'referer_score': referer_score,
+        'accept_score': accept_score,
+        'sec_fetch_score': sec_fetch_score,
+        'total_score': ip_score + ua_score + language_score + referer_score + accept_score + sec_fetch_score,
+    }
+
+
+def calculate_profile_login_score(profile: UserProfile, *headers: str) -> int:
+    """calculate_profile_component_scores 의 총점만 반환합니다."""
+    return calculate_profile_component_scores(profile, *headers)['total_score']
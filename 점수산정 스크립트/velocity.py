@@ -0,0 +1,164 @@
+from typing import Dict, Hashable, List, Optional, Tuple
+from collections import OrderedDict, deque
+import threading
+import time
+
+# ==============================================================================
+# 1. 속도(빈도) 규칙
+# ==============================================================================
+# backend/login.php 의 analyzeIP 는 "최근 1분간 같은 IP 5회 이상 -> +3점" 을 DB COUNT(*) 로 검사합니다.
+# 같은 규칙을 메모리 슬라이딩 윈도우로 옮기고, 분산 IP 공격을 잡기 위해 /24, /16 대역과 대상 계정 기준을 추가합니다.
+# (차원, 윈도우 내 시도 횟수 임계값, 점수)
+VELOCITY_RULES: List[Tuple[str, int, int]] = [
+    ('ip', 5, 3),
+    ('subnet24', 20, 2),
+    ('subnet16', 50, 2),
+    ('account', 5, 3),
+]
+VELOCITY_MAX_SCORE = 10
+VELOCITY_WINDOW_SECONDS = 60
+VELOCITY_BUCKET_SECONDS = 5
+VELOCITY_MAX_KEYS = 200_000  # 차원별 최대 키 수 (초과 시 가장 오래 안 쓰인 키부터 제거)
+
+
+class _Window:
+    """키 하나의 (버킷 번호, 횟수) 목록과 윈도우 내 합계."""
+
+    __slots__ = ('buckets', 'total', 'last_bucket')
+
+    def __init__(self) -> None:
+        self.buckets: deque = deque()
+        self.total = 0
+        self.last_bucket = 0
+
+
+class SlidingWindowCounter:
+    """
+    시간 버킷 기반 슬라이딩 윈도우 카운터.
+    윈도우를 bucket_seconds 단위로 나누어 키마다 최근 버킷만 보관하므로, 갱신/조회가 상수 시간이고
+    키 수는 max_keys 로 제한됩니다. 최근에 갱신되지 않은 키는 LRU 순서의 앞쪽에서 자동으로 만료됩니다.
+    """
+
+    def __init__(
+            self,
+            window_seconds: float = VELOCITY_WINDOW_SECONDS,
+            bucket_seconds: float = VELOCITY_BUCKET_SECONDS,
+            max_keys: int = VELOCITY_MAX_KEYS
+    ) -> None:
+        self.bucket_seconds = bucket_seconds
+        self.bucket_span = max(1, int(round(window_seconds / bucket_seconds)))
+        self.max_keys = max_keys
+        self.windows: 'OrderedDict[Hashable, _Window]' = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self.windows)
+
+    def _bucket(self, now: float) -> int:
+        return int(now // self.bucket_seconds)
+
+    def _expire(self, window: _Window, bucket: int) -> None:
+        oldest = bucket - self.bucket_span
+        while window.buckets and window.buckets[0][0] <= oldest:
+            window.total -= window.buckets.popleft()[1]
+
+    def add(self, key: Hashable, now: float, amount: int = 1) -> int:
+        """키에 횟수를 더하고 윈도우 내 합계를 반환합니다."""
+        bucket = self._bucket(now)
+        window = self.windows.get(key)
+        if window is None:
+            window = self.windows[key] = _Window()
+        else:
+            self.windows.move_to_end(key)
+        self._expire(window, bucket)
+
+        if window.buckets and window.buckets[-1][0] == bucket:
+            window.buckets[-1][1] += amount
+        else:
+            window.buckets.append([bucket, amount])
+        window.total += amount
+        window.last_bucket = bucket
+
+        self._evict(bucket)
+        return window.total
+
+    def count(self, key: Hashable, now: float) -> int:
+        """키의 윈도우 내 합계를 반환합니다 (갱신하지 않음)."""
+        window = self.windows.get(key)
+        if window is None:
+            return 0
+        self._expire(window, self._bucket(now))
+        return window.total
+
+    def _evict(self, bucket: int) -> None:
+        """크기 제한을 넘었거나 윈도우 밖으로 밀려난 가장 오래된 키들을 제거합니다."""
+        oldest = bucket - self.bucket_span
+        while self.windows:
+            key, window = next(iter(self.windows.items()))
+            if len(self.windows) <= self.max_keys and window.last_bucket > oldest:
+                break
+            del self.windows[key]
+
+
+# ==============================================================================
+# 2. 속도 점수 단계
+# ==============================================================================
+
+def velocity_keys(ip_address: str, user_id: Optional[str]) -> Dict[str, Hashable]:
+    """요청 하나의 차원별 키를 만듭니다. 점 4조각 IP 가 아니면 대역 키는 만들지 않습니다."""
+    keys: Dict[str, Hashable] = {}
+    if ip_address:
+        keys['ip'] = ip_address
+        if isinstance(ip_address, str) and ip_address.count('.') == 3:
+            subnet24 = ip_address[:ip_address.rfind('.')]
+            keys['subnet24'] = subnet24
+            keys['subnet16'] = subnet24[:subnet24.rfind('.')]
+    if user_id:
+        keys['account'] = user_id
+    return keys
+
+
+class VelocityTracker:
+    """
+    IP, /24, /16, 대상 계정별 최근 시도 횟수를 추적해 속도 점수를 계산합니다.
+    DB 왕복 없이 메모리에서만 동작하므로 요청마다 상수 시간이며, 멀티스레드 서버에서 공유할 수 있습니다.
+    """
+
+    def __init__(
+            self,
+            rules: Optional[List[Tuple[str, int, int]]] = None,
+            window_seconds: float = VELOCITY_WINDOW_SECONDS,
+            bucket_seconds: float = VELOCITY_BUCKET_SECONDS,
+            max_keys: int = VELOCITY_MAX_KEYS,
+            max_score: int = VELOCITY_MAX_SCORE
+    ) -> None:
+        self.rules = rules if rules is not None else VELOCITY_RULES
+        self.max_score = max_score
+        self.counters: Dict[str, SlidingWindowCounter] = {
+            dimension: SlidingWindowCounter(window_seconds, bucket_seconds, max_keys)
+            for dimension, _, _ in self.rules
+        }
+        self.lock = threading.Lock()
+
+    def observe(self, ip_address: str, user_id: Optional[str] = None, now: Optional[float] = None) -> Tuple[int, List[str]]:
+        """
+        로그인 시도 한 건을 기록하고 (속도 점수, 사유 목록) 을 반환합니다.
+        점수는 임계값을 넘은 규칙 점수의 합이며 max_score 로 제한됩니다.
+        """
+        now = time.time() if now is None else now
+        keys = velocity_keys(ip_address, user_id)
+        score = 0
+        reasons = []
+        with self.lock:
+            for dimension, threshold, points in self.rules:
+                key = keys.get(dimension)
+                if key is None:
+                    continue
+                count = self.counters[dimension].add(key, now)
+                if count >= threshold:
+                    score += points
+                    reasons.append(f"{dimension} 단시간 다중 시도 ({count}회)")
+        return min(score, self.max_score), reasons
+
+    def memory_keys(self) -> Dict[str, int]:
+        """차원별 현재 보관 중인 키 수."""
+        return {dimension: len(counter) for dimension, counter in self.counters.items()}